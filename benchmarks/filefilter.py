@@ -0,0 +1,73 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+"""
+Compares the row-wise and the columnar (numpy) filtering of FileFilterNode.
+
+The resources are created with synthetic stat data, so only the filtering itself is measured.
+
+Usage: python benchmarks/filefilter.py [number of files ...]
+"""
+import os
+import random
+import sys
+import time
+from typing import Tuple
+
+from atraxiflow.base.filesystem import FileFilterNode
+from atraxiflow.base.resources import FilesystemResource
+from atraxiflow.core import Workflow
+
+FILTERS = [
+    ['file_size', '>', '120K'],
+    ['file_size', '<', '4M'],
+    ['date_modified', '>', '01.01.2019'],
+    ['type', '=', 'file'],
+    ['filename', 'endswith', '.txt']
+]
+
+
+def make_resources(count: int) -> list:
+    rnd = random.Random(count)
+    now = time.time()
+    resources = []
+
+    for n in range(count):
+        res = FilesystemResource('/data/file_%s.%s' % (n, rnd.choice(['txt', 'log'])))
+        mode = 0o100644 if rnd.random() > 0.1 else 0o40755
+        mtime = now - rnd.random() * 3 * 365 * 86400
+        res._stat = res._lstat = os.stat_result(
+            (mode, n, 1, 1, 0, 0, rnd.randint(0, 8 * 1024 * 1024), mtime, mtime, mtime))
+        res._stat_loaded = True
+        resources.append(res)
+
+    return resources
+
+
+def measure(func) -> Tuple[float, int]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, len(result)
+
+
+def main(sizes):
+    node = FileFilterNode({'filter': FILTERS})
+    node.ctx = Workflow().get_context()
+    plan = node.compile_filters()
+
+    print('{:>10} {:>12} {:>12} {:>8}'.format('files', 'rows (s)', 'columns (s)', 'speedup'))
+
+    for size in sizes:
+        resources = make_resources(size)
+        t_rows, n_rows = measure(lambda: list(node._filter_rows(resources, plan)))
+        t_columns, n_columns = measure(lambda: node._filter_columns(resources, plan))
+        assert n_rows == n_columns
+
+        print('{:>10} {:>12.3f} {:>12.3f} {:>7.1f}x'.format(size, t_rows, t_columns, t_rows / t_columns))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,77 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+"""
+Compares startup time and memory usage of running a workflow headless and with the Creator modules loaded,
+as before the node user interfaces were moved to UI adapters.
+
+Each case is run in a new interpreter. Memory is the peak resident set size (Unix only).
+
+Usage: python benchmarks/startup.py [runs]
+"""
+import json
+import os
+import subprocess
+import sys
+
+CASE_SCRIPT = '''
+import json
+import resource
+import sys
+import time
+
+start = time.perf_counter()
+{imports}
+from atraxiflow.base.common import NullNode
+from atraxiflow.base.filesystem import LoadFilesNode
+from atraxiflow.base.text import TextFileInputNode
+from atraxiflow.core import Workflow
+
+Workflow.create([NullNode(), NullNode()]).run()
+elapsed = time.perf_counter() - start
+
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# bytes on macOS, kilobytes elsewhere
+rss_mb = rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+print(json.dumps([elapsed, rss_mb, 'PySide2' in sys.modules and sys.modules['PySide2'] is not None]))
+'''
+
+CASES = [
+    ('headless', ''),
+    ('with Creator widgets', 'import atraxiflow.creator.widgets\nimport atraxiflow.base.filesystem_ui')
+]
+
+
+def run_case(imports: str):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+    result = subprocess.run([sys.executable, '-c', CASE_SCRIPT.format(imports=imports)], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, env=env, universal_newlines=True)
+
+    if result.returncode != 0:
+        return None
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int):
+    print('{:>22} {:>12} {:>10} {:>8}'.format('case', 'startup (s)', 'RSS (MB)', 'Qt'))
+
+    for name, imports in CASES:
+        results = [run_case(imports) for n in range(runs)]
+
+        if any(r is None for r in results):
+            print('{:>22} {:>12}'.format(name, 'failed (is PySide2 installed?)'))
+            continue
+
+        # the fastest run is the least disturbed one
+        elapsed = min(r[0] for r in results)
+        rss = min(r[1] for r in results)
+        print('{:>22} {:>12.3f} {:>10.1f} {:>8}'.format(name, elapsed, rss, 'yes' if results[0][2] else 'no'))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
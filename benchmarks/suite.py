@@ -0,0 +1,354 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+"""
+Benchmarks of the core engine and the base nodes.
+
+Each benchmark is run several times with fresh data, the fastest run is reported. Results can be saved as a
+baseline and later runs compared against it, failing if a benchmark got slower than the tolerance allows.
+By default, baselines are saved per machine and Python version in benchmarks/baselines/.
+
+Each run also times a fixed pure Python workload. Results are compared relative to it, so a baseline created
+on another machine (like the committed reference.json used by CI) can be used with a larger tolerance.
+Such comparisons only catch large regressions, the CI job is advisory and doesn't fail the build.
+
+Files are created on a RAM disk (/dev/shm) if available, so disk speed does not affect the results.
+
+Usage:
+    python benchmarks/suite.py [benchmark ...]              Run (some) benchmarks
+    python benchmarks/suite.py --save                       Run and save the results as baseline
+    python benchmarks/suite.py --compare [--tolerance 0.2]  Run and compare with the baseline
+    python benchmarks/suite.py --compare --baseline benchmarks/baselines/reference.json --tolerance 0.5
+"""
+import argparse
+import collections
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+from atraxiflow.base.common import NullNode
+from atraxiflow.base.filesystem import FileFilterNode, FSCopyNode, FSRenameNode, LoadFilesNode
+from atraxiflow.base.resources import FilesystemResource, TextResource
+from atraxiflow.base.text import TextValidatorNode
+from atraxiflow.core import Container, Workflow
+from atraxiflow.creator.wayfiles import Wayfile, WayNode, WayWorkflow
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+CALIBRATION_REPEAT = 3
+
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(name: str, repeat: int = 10):
+    """
+    Registers a benchmark. The decorated function prepares the data in the given directory and returns a
+    function to measure. If it returns a tuple, the first item is called before each run (untimed) and its
+    result is passed to the measured function.
+    """
+
+    def register(func):
+        BENCHMARKS[name] = (func, repeat)
+        return func
+
+    return register
+
+
+def create_tree(root: str, dirs: int, files: int, size: int = 0):
+    content = b'x' * size
+
+    for d in range(dirs):
+        path = os.path.join(root, 'dir_%s' % d)
+        os.makedirs(path)
+
+        for f in range(files):
+            with open(os.path.join(path, 'file_%s.%s' % (f, 'txt' if f % 4 else 'log')), 'wb') as fh:
+                fh.write(content)
+
+
+@benchmark('container_find')
+def container_find(workdir: str):
+    container = Container()
+
+    for n in range(100000):
+        container.add(TextResource(str(n)) if n % 2 else FilesystemResource('/data/%s' % n))
+
+    def run():
+        container.find('atraxiflow.FilesystemResource')
+        container.find('atraxiflow.*')
+
+    return run
+
+
+@benchmark('workflow_overhead')
+def workflow_overhead(workdir: str):
+    # 5000 nodes doing nothing
+    nodes = [NullNode() for n in range(5000)]
+    return lambda: Workflow.create(nodes).run()
+
+
+@benchmark('load_files_glob')
+def load_files_glob(workdir: str):
+    create_tree(workdir, 50, 200)
+
+    def run():
+        Workflow.create([LoadFilesNode({'paths': [os.path.join(workdir, '*', '*.txt')]})]).run()
+        Workflow.create([LoadFilesNode({'paths': [os.path.join(workdir, '**', '*.txt')], 'use_scanner': True})]).run()
+
+    return run
+
+
+@benchmark('file_filter')
+def file_filter(workdir: str):
+    rnd = random.Random(1)
+    now = time.time()
+    node = FileFilterNode({'filter': [
+        ['file_size', '>', '1K'],
+        ['file_size', '<', '4M'],
+        ['date_modified', '>', '01.01.2019'],
+        ['date_modified', '<', 'tomorrow'],
+        ['type', '=', 'file'],
+        ['filename', 'endswith', '.txt'],
+        ['filename', 'startswith', 'file_'],
+        ['filename', 'contains', '_1'],
+        ['filename', 'matches', re.compile(r'file_\d+\.txt')],
+        ['filedir', 'contains', 'data']
+    ]})
+
+    source = NullNode()
+    for n in range(50000):
+        res = FilesystemResource('/data/file_%s.%s' % (n, rnd.choice(['txt', 'log'])))
+        mode = 0o100644 if rnd.random() > 0.1 else 0o40755
+        mtime = now - rnd.random() * 3 * 365 * 86400
+        # synthetic file information, so only the filtering is measured
+        res._stat = res._lstat = os.stat_result(
+            (mode, n, 1, 1, 0, 0, rnd.randint(0, 8 * 1024 * 1024), mtime, mtime, mtime))
+        res._stat_loaded = True
+        source.output.add(res)
+
+    return lambda: Workflow.create([source, node]).run()
+
+
+@benchmark('fs_copy', repeat=3)
+def fs_copy(workdir: str):
+    src = os.path.join(workdir, 'src')
+    create_tree(src, 10, 100, 4096)
+    runs = []
+
+    def setup():
+        # the source folder is copied to the destination, which must not exist
+        dest = os.path.join(workdir, 'dest_%s' % len(runs))
+        runs.append(dest)
+        return dest
+
+    def run(dest: str):
+        Workflow.create([LoadFilesNode({'paths': [src]}), FSCopyNode({'dest': dest, 'workers': 4})]).run()
+
+    return setup, run
+
+
+@benchmark('fs_rename', repeat=3)
+def fs_rename(workdir: str):
+    runs = []
+
+    def setup():
+        root = os.path.join(workdir, 'rename_%s' % len(runs))
+        create_tree(root, 10, 100)
+        runs.append(root)
+        return root
+
+    def run(root: str):
+        Workflow.create([LoadFilesNode({'paths': [os.path.join(root, '*', '*')]}),
+                         FSRenameNode({'name': '{file.path}/{file.basename}_renamed.{file.extension}'})]).run()
+
+    return setup, run
+
+
+@benchmark('text_validator')
+def text_validator(workdir: str):
+    rnd = random.Random(1)
+    source = NullNode()
+
+    for n in range(100000):
+        source.output.add(TextResource(''.join(rnd.choice('abcdefgh ') for c in range(40))))
+
+    node = TextValidatorNode({'rules': {
+        'not_empty': {},
+        'max_len': {'length': 80},
+        'regex': {'pattern': re.compile(r'[a-h ]+$')}
+    }})
+
+    return lambda: Workflow.create([source, node]).run()
+
+
+@benchmark('wayfile_load')
+def wayfile_load(workdir: str):
+    wayfile = Wayfile()
+
+    for w in range(20):
+        workflow = WayWorkflow('Workflow %s' % w)
+
+        for n in range(50):
+            workflow.add_node(WayNode(LoadFilesNode({'paths': ['/data/%s/*' % n]})))
+            workflow.add_node(WayNode(FileFilterNode({'filter': [['filename', 'matches', re.compile(r'\d+')]]})))
+
+        wayfile.add_workflow(workflow)
+
+    filename = os.path.join(workdir, 'large.way')
+    wayfile.save(filename)
+
+    return lambda: Wayfile().load(filename)
+
+
+def time_runs(setup, run, repeat: int) -> float:
+    times = []
+
+    for n in range(repeat):
+        state = setup() if setup is not None else None
+
+        # like timeit, the garbage collector does not interfere with the measurement
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(state)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    return min(times)
+
+
+def measure(name: str) -> float:
+    func, repeat = BENCHMARKS[name]
+    workdir = tempfile.mkdtemp(prefix='axbench_', dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+    try:
+        prepared = func(workdir)
+        setup, run = prepared if isinstance(prepared, tuple) else (None, lambda state: prepared())
+        return time_runs(setup, run, repeat)
+    finally:
+        shutil.rmtree(workdir)
+
+
+def calibrate() -> float:
+    """
+    Times a workload of string formatting, dict and list operations, which does not use AtraxiFlow, as a
+    measure of the machine's speed
+    """
+
+    def run(state):
+        index = {}
+
+        for n in range(200000):
+            index.setdefault('key_%s' % (n % 1000), []).append(n)
+
+        sorted(index.items(), key=lambda item: len(item[1]))
+
+    return time_runs(None, run, CALIBRATION_REPEAT)
+
+
+def get_baseline_file(args) -> str:
+    if args.baseline is not None:
+        return args.baseline
+
+    return os.path.join(BASELINE_DIR, '%s-py%s.%s.json' % (platform.node(), *sys.version_info[:2]))
+
+
+def main(args):
+    names = args.benchmarks if len(args.benchmarks) > 0 else list(BENCHMARKS.keys())
+    baseline_file = get_baseline_file(args)
+    baseline = {}
+    scale = 1.0
+
+    for name in names:
+        if name not in BENCHMARKS:
+            print('Unknown benchmark "%s"' % name)
+            return 2
+
+    if args.compare:
+        if not os.path.exists(baseline_file):
+            print('No baseline found at %s, create one with --save.' % baseline_file)
+            return 2
+
+        with open(baseline_file, 'r') as f:
+            data = json.load(f)
+
+        baseline = data['results']
+
+    results = {}
+    # calibrated between the benchmarks, the fastest run is the least disturbed one like for the benchmarks
+    calibration = calibrate()
+
+    for name in names:
+        results[name] = measure(name)
+        calibration = min(calibration, calibrate())
+
+    if args.compare:
+        # baseline times are converted to the speed of this machine
+        scale = calibration / data['calibration']
+
+        # a slow run may be caused by other processes, regressions are only reported if they can be repeated
+        for retry in range(args.retries):
+            for name in names:
+                if name in baseline and results[name] / (baseline[name] * scale) - 1 > args.tolerance:
+                    results[name] = min(results[name], measure(name))
+
+        print('Baseline: %s (Python %s), this machine is %.2fx as fast\n' % (
+            data['machine'], data['python'], 1 / scale))
+
+    print('{:<20} {:>12} {:>12} {:>8}'.format('benchmark', 'time (s)', 'baseline', 'change'))
+    regressions = []
+
+    for name in names:
+        if name in baseline:
+            expected = baseline[name] * scale
+            change = results[name] / expected - 1
+            print('{:<20} {:>12.4f} {:>12.4f} {:>+7.1f}%'.format(name, results[name], expected, 100 * change))
+
+            if change > args.tolerance:
+                regressions.append(name)
+        else:
+            print('{:<20} {:>12.4f}'.format(name, results[name]))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_file)), exist_ok=True)
+        with open(baseline_file, 'w') as f:
+            json.dump({'machine': platform.node(), 'python': platform.python_version(), 'calibration': calibration,
+                       'results': results}, f, indent=2, sort_keys=True)
+
+        print('\nSaved baseline to %s' % baseline_file)
+
+    if len(regressions) > 0:
+        print('\nSlower than the baseline by more than {:.0f}%: {}'.format(100 * args.tolerance, ', '.join(regressions)))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs the AtraxiFlow benchmarks')
+    parser.add_argument('benchmarks', nargs='*', help='Benchmarks to run: %s' % ', '.join(BENCHMARKS.keys()))
+    parser.add_argument('--save', action='store_true', help='Save the results as baseline')
+    parser.add_argument('--compare', action='store_true', help='Compare the results with the baseline')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='Baseline file to use instead of the one of this machine and Python version')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Number of times a benchmark slower than the baseline is run again (default: 2)')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown compared to the baseline (default: 0.2 = 20%%)')
+
+    # only errors are shown
+    logging.disable(logging.WARNING)
+    sys.exit(main(parser.parse_args()))
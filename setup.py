@@ -34,6 +34,11 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     install_requires=requirements,
+    extras_require={
+        'creator': ['PySide2'],
+        'numpy': ['numpy'],
+        'zstd': ['zstandard'],
+    },
     python_requires='>=3.5',
 
     package_data={
@@ -5,6 +5,7 @@
 # For more information on licensing see LICENSE file
 #
 
+import json
 import logging
 import os
 
@@ -14,12 +15,12 @@ from contemply.cli import prompt, user_input
 from contemply.frontend import TemplateParser
 
 from atraxiflow import __version__ as ax_version
-from atraxiflow.core import WorkflowContext, Workflow
-from atraxiflow.creator import creator as ax_creator
+from atraxiflow.core import WorkflowContext, Workflow, run_concurrently
 from atraxiflow.creator.wayfiles import Wayfile, WayDefaultWorkflow
 from atraxiflow.exceptions import *
 from atraxiflow.logging import set_level
 from atraxiflow.preferences import PreferencesProvider
+from atraxiflow.profiling import format_profile, to_chrome_trace
 
 
 @click.group()
@@ -33,13 +34,24 @@ def creator(verbose):
     if verbose:
         set_level(logging.DEBUG)
 
+    # Qt is only imported when Creator is launched
+    try:
+        from atraxiflow.creator import creator as ax_creator
+    except ImportError:
+        print(colorama.Fore.RED + 'Error: Creator needs PySide2 (pip install atraxi-flow[creator]).' +
+              colorama.Fore.RESET)
+        return
+
     ax_creator.launch_app()
 
 
 @cli.command('run')
 @click.argument('filename', type=click.Path(exists=True))
 @click.option('--verbose', '-v', type=click.BOOL, is_flag=True, help='Increase verbosity')
-def run(filename, verbose):
+@click.option('--profile', type=click.BOOL, is_flag=True, help='Print the time and memory used by each node')
+@click.option('--trace', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Save the node profiles as Chrome trace events (JSON) to this file')
+def run(filename, verbose, profile, trace):
     if verbose:
         set_level(logging.DEBUG)
 
@@ -65,25 +77,57 @@ def run(filename, verbose):
         print(colorama.Fore.LIGHTYELLOW_EX + '[%s]' % (n + 1) + colorama.Fore.RESET + ' %s' % workflow.get_name())
 
     while True:
-        user_choice = user_input('\nRun workflow: ')
+        user_choice = user_input('\nRun workflow (separate numbers by comma to run concurrently): ')
 
         if user_choice == '':
             print('Quittting.')
             return
-        elif user_choice.isnumeric():
-            user_choice = int(user_choice)
 
-            if user_choice > 0 and user_choice <= len(choose):
-                nodes = [wf_node.node for wf_node in choose[user_choice - 1].nodes]
+        choices = [c.strip() for c in user_choice.split(',')]
+
+        if all(c.isnumeric() and 0 < int(c) <= len(choose) for c in choices):
+            shared_ctx = WorkflowContext()
+            run_workflows = []
 
+            for c in choices:
                 print('')
-                print('*' * 5 + ' ' + choose[user_choice - 1].get_name() + ' ' + '*' * 5)
-                run_workflow = Workflow(nodes)
-                run_workflow.run()
+                print('*' * 5 + ' ' + choose[int(c) - 1].get_name() + ' ' + '*' * 5)
+                run_workflow = Workflow([wf_node.node for wf_node in choose[int(c) - 1].nodes], shared_ctx)
+                run_workflow.set_profiling(profile or trace is not None)
+                run_workflows.append(run_workflow)
+
+            if len(run_workflows) == 1:
+                run_workflows[0].run()
+            else:
+                run_concurrently(run_workflows)
+
+            if profile or trace is not None:
+                report_profile([choose[int(c) - 1].get_name() for c in choices], run_workflows, profile, trace)
+
+            return
+
+        print('Please enter numbers between %s and %s' % (1, len(choose)))
+
+
+def report_profile(names: list, workflows: list, show_table: bool, trace_file: str):
+    records = []
+
+    for name, workflow in zip(names, workflows):
+        for record in workflow.get_profile():
+            record = dict(record)
+            record['category'] = name
+            records.append(record)
+
+        if show_table:
+            print('')
+            print('Profile of "%s":\n' % name)
+            print(format_profile(workflow.get_profile()))
 
-                return
+    if trace_file is not None:
+        with open(trace_file, 'w') as f:
+            json.dump(to_chrome_trace(records), f)
 
-        print('Please enter a number between %s and %s' % (1, len(choose)))
+        print(colorama.Fore.GREEN + '√ ' + colorama.Fore.RESET + 'Saved trace to %s' % trace_file)
 
 
 @cli.command('create')
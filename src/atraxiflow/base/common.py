@@ -5,72 +5,378 @@
 # For more information on licensing see LICENSE file
 #
 
+import asyncio
+import codecs
+import collections
+import concurrent.futures
 import os
 import platform
+import queue
+import re
+import selectors
 import shlex
 import subprocess
+import sys
+import threading
 import time
+from typing import Iterator, List, Tuple
 
-from atraxiflow.base.resources import TextResource
+from atraxiflow.base.resources import CommandResource, FilesystemResource, TextResource
 from atraxiflow.core import *
+from atraxiflow.exceptions import ExecutionException
 from atraxiflow.properties import Property
+from atraxiflow.template import Template, SYNTAX_NAME
 
 __all__ = ['NullNode', 'EchoOutputNode', 'DelayNode', 'CLIInputNode', 'ShellExecNode']
 
 
+class _LineBuffer:
+    """
+    Splits the output of a pipe into lines
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._pending = []
+
+    def feed(self, data: bytes) -> List[str]:
+        text = self._decoder.decode(data)
+        lines = text.split('\n')
+
+        if len(lines) == 1:
+            self._pending.append(text)
+            return []
+
+        self._pending.append(lines[0])
+        lines[0] = ''.join(self._pending)
+        self._pending = [lines.pop()]
+
+        return [line[:-1] if line.endswith('\r') else line for line in lines]
+
+    def flush(self) -> List[str]:
+        line = ''.join(self._pending) + self._decoder.decode(b'', final=True)
+        self._pending = []
+
+        return [] if line == '' else [line[:-1] if line.endswith('\r') else line]
+
+
 class ShellExecNode(Node):
     """
     @Name: Execute console command
     """
 
+    PIPE_STDOUT = 0
+    PIPE_STDERR = 1
+
+    READ_SIZE = 64 * 1024
+
+    ON_ERROR_FAIL_FAST = 'fail_fast'
+    ON_ERROR_COLLECT = 'collect'
+
     def __init__(self, properties: dict = None):
         node_properties = {
             'cmd': Property(expected_type=str, required=True, label='Command',
                             hint='Command to execute', default=''),
             'echo_cmd': Property(expected_type=bool, required=False, default=False, label='Echo command'),
-            'echo_output': Property(expected_type=bool, required=False, default=False, label='Echo output')
+            'echo_output': Property(expected_type=bool, required=False, default=False, label='Echo output'),
+            'output_lines': Property(expected_type=bool, required=False, default=False, label='Output lines',
+                                     hint='Outputs one resource per line of the standard output instead of one '
+                                          'resource for each stdout and stderr. Lines written to stderr are logged '
+                                          'as warnings.'),
+            'for_each': Property(expected_type=bool, required=False, default=False, label='Run for each input',
+                                 hint='Runs the command once for each input resource. The command can contain '
+                                      '{resource} and for files {file.filename}, {file.absolute_path}, '
+                                      '{file.basename}, {file.extension} and {file.path} (the folder). These and '
+                                      'context variables are shell-quoted, other text in curly braces is kept. '
+                                      'The output contains a CommandResource with exit code, stdout and stderr '
+                                      'per command.'),
+            'max_parallel': Property(expected_type=int, required=False, default=1, label='Parallel commands',
+                                     hint='Number of commands to run at the same time'),
+            'on_error': Property(expected_type=str, required=False, default=self.ON_ERROR_FAIL_FAST,
+                                 label='On error',
+                                 hint='fail_fast: stop all commands and fail if a command returns a non-zero exit '
+                                      'code, collect: run all commands and log failed commands as warnings')
         }
 
         super().__init__(node_properties, properties)
 
-    def run(self, ctx: WorkflowContext):
-        super().run(ctx)
+    def _read_pipes(self, proc: subprocess.Popen) -> Iterator[Tuple[int, bytes]]:
+        """
+        Reads stdout and stderr of the process as data arrives, so neither pipe can fill up and block the process.
 
-        cmd = ctx.process_str(self.property('cmd').value())
-        args = shlex.split(cmd)
+        :return: An iterator over (PIPE_STDOUT or PIPE_STDERR, data) tuples
+        """
+        if platform.system() == 'Windows':
+            # select() does not support pipes on windows
+            yield from self._read_pipes_threaded(proc)
+            return
 
-        stdout = ''
-        stderr = ''
+        with selectors.DefaultSelector() as selector:
+            selector.register(proc.stdout, selectors.EVENT_READ, self.PIPE_STDOUT)
+            selector.register(proc.stderr, selectors.EVENT_READ, self.PIPE_STDERR)
 
-        if self.property('echo_cmd').value() is True:
-            print(cmd)
+            while len(selector.get_map()) > 0:
+                for key, events in selector.select():
+                    data = os.read(key.fileobj.fileno(), self.READ_SIZE)
+
+                    if data == b'':
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                    else:
+                        yield key.data, data
+
+    def _read_pipes_threaded(self, proc: subprocess.Popen) -> Iterator[Tuple[int, bytes]]:
+        chunks = queue.Queue()
+
+        def read(pipe, pipe_id: int):
+            for data in iter(lambda: pipe.read1(self.READ_SIZE), b''):
+                chunks.put((pipe_id, data))
+
+            pipe.close()
+            chunks.put((pipe_id, None))
+
+        threads = [threading.Thread(target=read, args=(proc.stdout, self.PIPE_STDOUT), daemon=True),
+                   threading.Thread(target=read, args=(proc.stderr, self.PIPE_STDERR), daemon=True)]
+
+        for thread in threads:
+            thread.start()
+
+        running = len(threads)
+        while running > 0:
+            pipe_id, data = chunks.get()
+
+            if data is None:
+                running -= 1
+            else:
+                yield pipe_id, data
+
+    def _handle_line(self, ctx: WorkflowContext, pipe_id: int, line: str, echo: bool, output_lines: bool):
+        if echo:
+            print(line)
+
+        if output_lines:
+            if pipe_id == self.PIPE_STDOUT:
+                yield TextResource(line)
+            else:
+                ctx.get_logger().warning(line)
+
+    @staticmethod
+    def _start(cmd: str) -> subprocess.Popen:
+        args = shlex.split(cmd)
 
         if platform.system() == 'Windows':
             # this will invoke a system shell on windows and should not interfere with executing
             # other binaries.
-            result = subprocess.Popen(args, stderr=subprocess.PIPE, stdout=subprocess.PIPE, shell=True)
+            return subprocess.Popen(args, stderr=subprocess.PIPE, stdout=subprocess.PIPE, shell=True)
         else:
-            result = subprocess.Popen(args, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-
-        if self.property('echo_output').value() is True:
-            while result.poll() is None:
-                line = result.stdout.readline().decode('utf-8').replace(os.linesep, '')
-                if line != '':
-                    print(line)
-                    stdout += line
-
-                line = result.stderr.readline().decode('utf-8').replace(os.linesep, '')
-                if line != '':
-                    print(line)
-                    stderr += line
-        else:
-            stdout_raw, stderr_raw = result.communicate()
-            stdout = stdout_raw.decode("utf-8")
-            stderr = stderr_raw.decode("utf-8")
+            return subprocess.Popen(args, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        if platform.system() == 'Windows':
+            # the command is split like a POSIX command line, joined again by subprocess (quoting only arguments
+            # with whitespace) and run by cmd.exe, which can't escape quotes inside quoted arguments
+            if '"' in value:
+                raise ValueError('Values containing quotes can\'t be used in commands on Windows: ' + value)
+
+            if ' ' not in value and '\t' not in value:
+                # the argument is passed on unquoted, so the characters cmd.exe interprets are escaped
+                value = re.sub(r'([&|<>^%])', r'^\1', value)
+
+            return '"{0}"'.format(value.replace('\\', '\\\\'))
+
+        return shlex.quote(value)
+
+    def _get_variables(self, ctx: WorkflowContext, res: Resource) -> dict:
+        variables = {'resource': str(res.get_value())}
+
+        if isinstance(res, FilesystemResource):
+            variables['file.filename'] = res.get_filename()
+            variables['file.absolute_path'] = res.get_absolute_path()
+            variables['file.basename'] = res.get_basename()
+            variables['file.extension'] = res.get_extension()
+            variables['file.path'] = res.get_directory()
+
+        return self._quote_all(ctx, variables)
+
+    def _quote_all(self, ctx: WorkflowContext, variables: dict) -> dict:
+        # the values are inserted into a command line, so they have to be quoted
+        try:
+            return dict([(key, self._quote(str(value))) for key, value in variables.items()])
+        except ValueError as e:
+            ctx.get_logger().error(str(e))
+            raise ExecutionException(str(e))
+
+    def _fan_out(self, ctx: WorkflowContext, resources) -> Iterator[CommandResource]:
+        """
+        Runs the command for each resource and yields the results in the order of the resources
+        """
+        if self.property('on_error').value() not in (self.ON_ERROR_FAIL_FAST, self.ON_ERROR_COLLECT):
+            ctx.get_logger().error('Unknown value for on_error: "{0}"'.format(self.property('on_error').value()))
+            raise ExecutionException('Unknown value for on_error: "{0}"'.format(self.property('on_error').value()))
+
+        # context variables are the same for all commands, braces used by the shell or other programs
+        # (e.g. ${HOME} or awk '{print $1}') are not variables and kept as they are
+        template = Template.get(self.property('cmd').value(), SYNTAX_NAME).bind(
+            self._quote_all(ctx, ctx.get_symbols()))
+        max_parallel = max(1, self.property('max_parallel').value())
+        fail_fast = self.property('on_error').value() == self.ON_ERROR_FAIL_FAST
+        running = set()
+        lock = threading.Lock()
+        stopped = threading.Event()
+
+        def run_command(cmd: str, res: Resource) -> CommandResource:
+            with lock:
+                if stopped.is_set():
+                    return None
+
+                proc = self._start(cmd)
+                running.add(proc)
+
+            try:
+                stdout_raw, stderr_raw = proc.communicate()
+            finally:
+                with lock:
+                    running.discard(proc)
+
+            return CommandResource(cmd, proc.returncode, stdout_raw.decode('utf-8'), stderr_raw.decode('utf-8'), res)
+
+        def stop():
+            with lock:
+                stopped.set()
+
+                for proc in running:
+                    proc.kill()
+
+        pending = collections.deque()
+        resources = iter(resources)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_parallel) as pool:
+            try:
+                while True:
+                    res = next(resources, None)
+
+                    if res is not None:
+                        cmd = template.render(self._get_variables(ctx, res), lambda name: '{%s}' % name)
+
+                        if self.property('echo_cmd').value() is True:
+                            print(cmd)
+
+                        pending.append(pool.submit(run_command, cmd, res))
+
+                    # results are passed on in input order, only a few commands are queued ahead
+                    while len(pending) > 0 and (res is None or len(pending) >= max_parallel * 2):
+                        result = pending.popleft().result()
+
+                        if self.property('echo_output').value() is True:
+                            print(result.get_stdout(), end='')
+                            print(result.get_stderr(), end='')
+
+                        if result.get_exit_code() != 0:
+                            msg = 'Command failed with exit code {0}: {1}'.format(result.get_exit_code(),
+                                                                                  result.get_command())
+                            if fail_fast:
+                                ctx.get_logger().error(msg)
+                                raise ExecutionException(msg)
+
+                            ctx.get_logger().warning(msg)
+
+                        yield result
 
-        res_out = TextResource(stdout)
-        res_err = TextResource(stderr)
-        self.output = Container(res_out, res_err)
+                    if res is None:
+                        break
+            finally:
+                stop()
+
+    def stream(self, ctx: WorkflowContext):
+        if self.property('for_each').value() is True:
+            yield from self._fan_out(ctx, self.get_input().stream('*') if self.has_input() else [])
+            return
+
+        cmd = ctx.process_str(self.property('cmd').value())
+        echo = self.property('echo_output').value() is True
+        output_lines = self.property('output_lines').value() is True
+
+        if self.property('echo_cmd').value() is True:
+            print(cmd)
+
+        proc = self._start(cmd)
+
+        if not echo and not output_lines:
+            stdout_raw, stderr_raw = proc.communicate()
+            yield TextResource(stdout_raw.decode('utf-8'))
+            yield TextResource(stderr_raw.decode('utf-8'))
+            return
+
+        chunks = ([], [])
+        line_buffers = (_LineBuffer(), _LineBuffer())
+        finished = False
+
+        try:
+            for pipe_id, data in self._read_pipes(proc):
+                if not output_lines:
+                    chunks[pipe_id].append(data)
+
+                for line in line_buffers[pipe_id].feed(data):
+                    yield from self._handle_line(ctx, pipe_id, line, echo, output_lines)
+
+            for pipe_id in (self.PIPE_STDOUT, self.PIPE_STDERR):
+                for line in line_buffers[pipe_id].flush():
+                    yield from self._handle_line(ctx, pipe_id, line, echo, output_lines)
+
+            finished = True
+        finally:
+            # the workflow may stop consuming the output early
+            if not finished and proc.poll() is None:
+                proc.kill()
+
+            proc.wait()
+
+        if not output_lines:
+            yield TextResource(b''.join(chunks[self.PIPE_STDOUT]).decode('utf-8'))
+            yield TextResource(b''.join(chunks[self.PIPE_STDERR]).decode('utf-8'))
+
+    @staticmethod
+    def _can_watch_subprocesses() -> bool:
+        # before Python 3.8, only loops in the main thread can wait for subprocesses (see run_concurrently)
+        return sys.version_info >= (3, 8) or threading.current_thread() is threading.main_thread()
+
+    async def run_async(self, ctx: WorkflowContext):
+        # only a single command without echo is run in the event loop
+        if self.property('for_each').value() is True or self.property('echo_output').value() is True or \
+                self.property('output_lines').value() is True or platform.system() == 'Windows' or \
+                not self._can_watch_subprocesses():
+            return await super().run_async(ctx)
+
+        cmd = ctx.process_str(self.property('cmd').value())
+
+        if self.property('echo_cmd').value() is True:
+            print(cmd)
+
+        proc = await asyncio.create_subprocess_exec(*shlex.split(cmd), stdout=subprocess.PIPE,
+                                                    stderr=subprocess.PIPE)
+        stdout_raw, stderr_raw = await proc.communicate()
+        self.output = Container(TextResource(stdout_raw.decode('utf-8')), TextResource(stderr_raw.decode('utf-8')))
+
+        return True
+
+    def run(self, ctx: WorkflowContext):
+        super().run(ctx)
+
+        if self.property('for_each').value() is True:
+            self.output = Container()
+
+            try:
+                for result in self.stream(ctx):
+                    self.output.add(result)
+            except ExecutionException:
+                return False
+
+            return True
+
+        self.output = Container(list(self.stream(ctx)))
+
+        return True
 
 
 class EchoOutputNode(Node):
@@ -109,6 +415,16 @@ class DelayNode(Node):
         }
         super().__init__(node_properties, properties)
 
+    @staticmethod
+    def _can_watch_subprocesses() -> bool:
+        # before Python 3.8, only loops in the main thread can wait for subprocesses (see run_concurrently)
+        return sys.version_info >= (3, 8) or threading.current_thread() is threading.main_thread()
+
+    async def run_async(self, ctx: WorkflowContext):
+        await asyncio.sleep(int(self.property('time').value()))
+
+        return True
+
     def run(self, ctx: WorkflowContext):
         super().run(ctx)
         time.sleep(int(self.property('time').value()))
@@ -0,0 +1,588 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+"""
+File operations shared by the filesystem nodes.
+"""
+import concurrent.futures
+import errno
+import hashlib
+import os
+import shutil
+import stat
+from typing import Callable, List, Tuple
+
+from atraxiflow.exceptions import FilesystemException
+
+__all__ = ['copy_file_data', 'file_hash', 'needs_copy', 'CopyJob', 'CopyEngine', 'MoveEngine', 'RenamePlan']
+
+# errors telling us that a zero-copy function is not supported for the given files
+_ZERO_COPY_UNSUPPORTED = tuple([getattr(errno, name) for name in ('ENOSYS', 'EXDEV', 'EINVAL', 'EOPNOTSUPP',
+                                                                   'ENOTSUP', 'EBADF', 'ETXTBSY', 'EPERM')
+                                if hasattr(errno, name)])
+
+_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _zero_copy(fd_in: int, fd_out: int, size: int) -> bool:
+    """
+    Copies the data using copy_file_range() or sendfile(), so it does not have to pass through user space.
+    On some filesystems copy_file_range() will clone the data or copy it on the server side.
+
+    :return: False if neither function can be used for these files
+    """
+    for func in ('copy_file_range', 'sendfile'):
+        if not hasattr(os, func):
+            continue
+
+        copied = 0
+        try:
+            while True:
+                if func == 'copy_file_range':
+                    n = os.copy_file_range(fd_in, fd_out, _CHUNK_SIZE)
+                else:
+                    n = os.sendfile(fd_out, fd_in, copied, _CHUNK_SIZE)
+
+                if n == 0:
+                    break
+
+                copied += n
+        except OSError as e:
+            if copied == 0 and e.errno in _ZERO_COPY_UNSUPPORTED:
+                continue
+
+            raise
+
+        # some filesystems report 0 bytes for files with generated content (e.g. /proc), read those normally
+        if copied == 0 and size > 0:
+            continue
+
+        return True
+
+    return False
+
+
+def copy_file_data(src: str, dst: str, size: int = -1):
+    """
+    Copies the contents of src to dst, using zero-copy functions where available.
+
+    :param str src: The source file
+    :param str dst: The destination file
+    :param int size: The size of the source file, if known
+    """
+    with open(src, 'rb') as f_src, open(dst, 'wb') as f_dst:
+        if _zero_copy(f_src.fileno(), f_dst.fileno(), size):
+            return
+
+        f_src.seek(0)
+        f_dst.seek(0)
+        f_dst.truncate()
+        shutil.copyfileobj(f_src, f_dst, 1024 * 1024)
+
+
+def file_hash(path: str) -> str:
+    """
+    Calculates a hash of the file contents
+
+    :param str path: The file
+    :return: The hex digest
+    """
+    digest = hashlib.sha1()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def needs_copy(src: str, dst: str, compare_content: bool = False, src_stat: os.stat_result = None) -> bool:
+    """
+    Checks if dst is missing or differs from src. Files are considered equal if size and modification time (to
+    the second) match, or, if compare_content is True, if size and content match.
+
+    :param str src: The source file
+    :param str dst: The destination file
+    :param bool compare_content: Compare hashes of the file contents instead of modification times
+    :param os.stat_result src_stat: The result of os.stat() for src, if known
+    :return: True if the file has to be copied
+    """
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return True
+
+    if src_stat is None:
+        src_stat = os.stat(src)
+
+    if src_stat.st_size != dst_stat.st_size:
+        return True
+
+    if compare_content:
+        return file_hash(src) != file_hash(dst)
+
+    return int(src_stat.st_mtime) != int(dst_stat.st_mtime)
+
+
+class CopyJob:
+    """
+    A single file to copy
+    """
+
+    PRESERVE_MODE = 'mode'
+    PRESERVE_STAT = 'stat'
+
+    def __init__(self, src: str, dst: str, size: int, preserve: str = PRESERVE_MODE):
+        """
+
+        :param str src: The source file
+        :param str dst: The destination file
+        :param int size: The size of the source file
+        :param str preserve: PRESERVE_MODE copies permission bits (like shutil.copy), PRESERVE_STAT also copies
+                             timestamps and flags (like shutil.copy2)
+        """
+        self.src = src
+        self.dst = dst
+        self.size = size
+        self.preserve = preserve
+
+    def run(self):
+        if os.path.exists(self.dst) and os.path.samefile(self.src, self.dst):
+            raise shutil.SameFileError('{0} and {1} are the same file'.format(self.src, self.dst))
+
+        copy_file_data(self.src, self.dst, self.size)
+
+        if self.preserve == self.PRESERVE_STAT:
+            shutil.copystat(self.src, self.dst)
+        else:
+            shutil.copymode(self.src, self.dst)
+
+
+class CopyEngine:
+    """
+    Copies files using a pool of worker threads.
+
+    Large files are started first, so they do not end up running alone at the end. Small files are copied
+    in batches to keep the scheduling overhead low. The progress callback is called in the thread running
+    :py:meth:`run` after each file.
+
+    .. code-block:: python
+
+        engine = CopyEngine(workers=4)
+        engine.add('/data/big.iso', '/backup/big.iso')
+        engine.run()
+    """
+
+    SMALL_FILE_SIZE = 1024 * 1024
+    BATCH_FILES = 64
+
+    def __init__(self, workers: int = 1, on_progress: Callable = None):
+        """
+
+        :param int workers: Number of files to copy at the same time
+        :param callable on_progress: Called with the finished CopyJob and a dict containing files_done,
+                                     files_total, bytes_done and bytes_total
+        """
+        self._workers = max(1, workers)
+        self._on_progress = on_progress
+        self._jobs = []
+
+    def add(self, src: str, dst: str, preserve: str = CopyJob.PRESERVE_MODE, size: int = None):
+        """
+        Schedules a file for copying
+
+        :param str src: The source file
+        :param str dst: The destination file
+        :param str preserve: See :py:class:`CopyJob`
+        :param int size: The size of the source file, if known
+        """
+        self._jobs.append(CopyJob(src, dst, os.path.getsize(src) if size is None else size, preserve))
+
+    def get_jobs(self) -> List[CopyJob]:
+        return self._jobs
+
+    def _make_batches(self, jobs: List[CopyJob]) -> List[List[CopyJob]]:
+        jobs = sorted(jobs, key=lambda job: job.size, reverse=True)
+        batches = []
+        small = []
+
+        for job in jobs:
+            if job.size >= self.SMALL_FILE_SIZE:
+                batches.append([job])
+                continue
+
+            small.append(job)
+            if len(small) == self.BATCH_FILES:
+                batches.append(small)
+                small = []
+
+        if len(small) > 0:
+            batches.append(small)
+
+        return batches
+
+    @staticmethod
+    def _run_batch(batch: List[CopyJob]) -> List[CopyJob]:
+        for job in batch:
+            job.run()
+
+        return batch
+
+    def run(self):
+        """
+        Copies all scheduled files. If a copy fails, no new files are started and the error is raised once the
+        running copies have finished.
+        """
+        jobs = self._jobs
+        self._jobs = []
+
+        progress = {
+            'files_done': 0,
+            'files_total': len(jobs),
+            'bytes_done': 0,
+            'bytes_total': sum([job.size for job in jobs])
+        }
+
+        def finished(job: CopyJob):
+            progress['files_done'] += 1
+            progress['bytes_done'] += job.size
+
+            if self._on_progress is not None:
+                self._on_progress(job, dict(progress))
+
+        if self._workers == 1:
+            for job in jobs:
+                job.run()
+                finished(job)
+
+            return
+
+        batches = self._make_batches(jobs)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._workers) as pool:
+            futures = [pool.submit(self._run_batch, batch) for batch in batches]
+
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    for job in future.result():
+                        finished(job)
+            except Exception:
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+
+class MoveEngine:
+    """
+    Moves files and folders.
+
+    Within a filesystem the files are renamed. Files on a different filesystem than their destination are
+    copied using a :py:class:`CopyEngine` and removed right after they have been copied. Folders are created
+    before any file is copied and removed once all of their files have been moved.
+
+    .. code-block:: python
+
+        engine = MoveEngine(workers=4)
+        engine.add('/scratch/results', '/mnt/storage/results')
+        engine.run()
+    """
+
+    def __init__(self, workers: int = 1, on_progress: Callable = None):
+        """
+
+        :param int workers: Number of files to copy at the same time when moving across filesystems
+        :param callable on_progress: Called after each copied file, see :py:class:`CopyEngine`
+        """
+        self._workers = workers
+        self._on_progress = on_progress
+        self._moves = []
+
+    def add(self, src: str, dst: str):
+        """
+        Schedules a file or folder for moving
+
+        :param str src: The existing file or folder
+        :param str dst: The new path
+        """
+        self._moves.append((src, dst))
+
+    def run(self):
+        """
+        Moves all scheduled files and folders. Existing files are replaced, existing folders are not.
+        """
+        moves = self._moves
+        self._moves = []
+
+        devices = {}
+        copy_moves = []
+
+        for src, dst in moves:
+            dst_dir = os.path.dirname(os.path.abspath(dst))
+            if dst_dir not in devices:
+                devices[dst_dir] = os.stat(dst_dir).st_dev
+
+            if os.lstat(src).st_dev == devices[dst_dir]:
+                try:
+                    os.rename(src, dst)
+                    continue
+                except OSError as e:
+                    # e.g. different mount points of the same filesystem
+                    if e.errno != errno.EXDEV:
+                        raise
+
+            copy_moves.append((src, dst))
+
+        if len(copy_moves) > 0:
+            self._copy_and_remove(copy_moves)
+
+    def _copy_and_remove(self, moves: List[Tuple[str, str]]):
+        dirs = []
+        links = []
+
+        def copied(job: CopyJob, progress: dict):
+            os.unlink(job.src)
+
+            if self._on_progress is not None:
+                self._on_progress(job, progress)
+
+        engine = CopyEngine(self._workers, copied)
+
+        for src, dst in moves:
+            if os.path.islink(src):
+                links.append((src, dst))
+            elif not os.path.isdir(src):
+                engine.add(src, dst, CopyJob.PRESERVE_STAT)
+            elif os.path.lexists(dst):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+            else:
+                for root, dirnames, filenames in os.walk(src):
+                    dst_root = dst if root == src else os.path.join(dst, os.path.relpath(root, src))
+                    # keep the timestamps, removing the files changes them
+                    dirs.append((root, dst_root, os.stat(root)))
+
+                    # os.walk lists symlinks to folders as folders, but does not descend into them
+                    for name in dirnames:
+                        if os.path.islink(os.path.join(root, name)):
+                            links.append((os.path.join(root, name), os.path.join(dst_root, name)))
+
+                    for name in filenames:
+                        path = os.path.join(root, name)
+
+                        if os.path.islink(path):
+                            links.append((path, os.path.join(dst_root, name)))
+                        else:
+                            engine.add(path, os.path.join(dst_root, name), CopyJob.PRESERVE_STAT)
+
+        # create all folders before copying, parents come first
+        for src, dst, st in dirs:
+            os.mkdir(dst)
+
+        for src, dst in links:
+            if os.path.lexists(dst):
+                os.unlink(dst)
+
+            os.symlink(os.readlink(src), dst)
+            os.unlink(src)
+
+        engine.run()
+
+        # the folders are empty now, children come first
+        for src, dst, st in reversed(dirs):
+            os.chmod(dst, stat.S_IMODE(st.st_mode))
+            os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.rmdir(src)
+
+
+class RenamePlan:
+    """
+    Renames many files at once.
+
+    All renames are collected and checked before anything is changed on disk: targets used twice, existing
+    targets and missing folders are reported by :py:meth:`check`. Renames depending on each other (a -> b, b -> c)
+    are ordered and cycles (a -> b, b -> a) are resolved using a temporary name.
+
+    .. code-block:: python
+
+        plan = RenamePlan()
+        plan.add('/data/a.txt', '/data/b.txt')
+        plan.add('/data/b.txt', '/data/a.txt')
+        plan.execute()
+    """
+
+    TEMP_NAME = '.{0}.axrename{1}'
+
+    def __init__(self):
+        self._renames = []
+        self._groups = None
+
+    @staticmethod
+    def _key(path: str) -> str:
+        path = os.path.abspath(path)
+        return os.path.normcase(os.path.join(os.path.realpath(os.path.dirname(path)), os.path.basename(path)))
+
+    def add(self, src: str, dst: str):
+        """
+        Adds a rename to the plan
+
+        :param str src: The existing file or folder
+        :param str dst: The new path
+        """
+        self._renames.append((src, dst))
+        self._groups = None
+
+    def get_renames(self) -> List[Tuple[str, str]]:
+        return self._renames
+
+    def check(self) -> List[str]:
+        """
+        Checks the plan without changing anything on disk
+
+        :return: A list of problems, empty if the plan can be executed
+        """
+        problems = []
+        by_src = {}
+        by_dst = {}
+
+        for src, dst in self._renames:
+            src_key = self._key(src)
+            dst_key = self._key(dst)
+
+            if src_key == dst_key:
+                continue
+
+            if src_key in by_src:
+                problems.append('{0} is renamed twice'.format(src))
+            elif not os.path.lexists(src):
+                problems.append('{0} does not exist'.format(src))
+
+            if dst_key in by_dst:
+                problems.append('{0} and {1} are both renamed to {2}'.format(by_dst[dst_key][0], src, dst))
+            elif not os.path.isdir(os.path.dirname(os.path.abspath(dst))):
+                problems.append('Folder {0} does not exist'.format(os.path.dirname(dst)))
+
+            by_src[src_key] = (src, dst, dst_key)
+            by_dst[dst_key] = (src, dst)
+
+        for src_key, (src, dst, dst_key) in by_src.items():
+            # the target may exist, if it is renamed itself or only differs in case
+            if dst_key not in by_src and os.path.lexists(dst) and not self._same_file(src, dst):
+                problems.append('{0} already exists'.format(dst))
+
+        if len(problems) == 0:
+            self._groups = self._make_groups(by_src)
+
+        return problems
+
+    @staticmethod
+    def _same_file(path1: str, path2: str) -> bool:
+        try:
+            return os.path.samestat(os.lstat(path1), os.lstat(path2))
+        except OSError:
+            return False
+
+    def _temp_name(self, path: str) -> str:
+        n = 0
+        while True:
+            temp = os.path.join(os.path.dirname(path), self.TEMP_NAME.format(os.path.basename(path), n))
+            if not os.path.lexists(temp):
+                return temp
+
+            n += 1
+
+    def _make_groups(self, by_src: dict) -> List[List[Tuple[str, str]]]:
+        """
+        Orders the renames. Since every path is source and target of at most one rename, the renames form
+        independent chains and cycles.
+
+        :return: Lists of renames that have to be executed in the given order
+        """
+        blocked_by = {}
+        blocking = set()
+
+        for src_key, (src, dst, dst_key) in by_src.items():
+            if dst_key in by_src:
+                blocked_by[src_key] = dst_key
+                blocking.add(dst_key)
+
+        groups = []
+        done = set()
+
+        # chains start with a rename nothing else is waiting for, the end of the chain has to be renamed first
+        for src_key in by_src:
+            if src_key in blocking:
+                continue
+
+            chain = [src_key]
+            while chain[-1] in blocked_by:
+                chain.append(blocked_by[chain[-1]])
+
+            done.update(chain)
+            groups.append([by_src[key][0:2] for key in reversed(chain)])
+
+        # everything left is part of a cycle
+        for src_key in by_src:
+            if src_key in done:
+                continue
+
+            cycle = [src_key]
+            while blocked_by[cycle[-1]] != src_key:
+                cycle.append(blocked_by[cycle[-1]])
+
+            done.update(cycle)
+            first_src, first_dst = by_src[src_key][0:2]
+            temp = self._temp_name(first_src)
+
+            group = [(first_src, temp)]
+            group.extend([by_src[key][0:2] for key in reversed(cycle[1:])])
+            group.append((temp, first_dst))
+            groups.append(group)
+
+        return groups
+
+    @staticmethod
+    def _run_groups(groups: List[List[Tuple[str, str]]]):
+        for group in groups:
+            for src, dst in group:
+                os.rename(src, dst)
+
+    def execute(self, workers: int = 1):
+        """
+        Executes the plan. Groups of renames in different folders can be executed in parallel.
+
+        :param int workers: Number of folders to work on at the same time
+        :raises FilesystemException: If the plan is not valid
+        """
+        if self._groups is None:
+            problems = self.check()
+
+            if len(problems) > 0:
+                raise FilesystemException('Cannot rename files: ' + ', '.join(problems))
+
+        groups = self._groups
+        self._renames = []
+        self._groups = None
+
+        if workers <= 1:
+            self._run_groups(groups)
+            return
+
+        # renames in the same folder are not sped up by running them in parallel
+        by_folder = {}
+        for group in groups:
+            by_folder.setdefault(os.path.dirname(group[0][0]), []).append(group)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._run_groups, folder_groups) for folder_groups in by_folder.values()]
+
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+
+                raise
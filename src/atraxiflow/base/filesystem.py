@@ -5,19 +5,26 @@
 # For more information on licensing see LICENSE file
 #
 import glob
+import operator
 import os
 import re
 import shutil
+import stat
+from datetime import timedelta
 from pathlib import Path
+from typing import List
 
-from PySide2 import QtWidgets, QtCore, QtGui
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-from atraxiflow.base import assets
+from atraxiflow.base.fileops import CopyEngine, CopyJob, MoveEngine, RenamePlan, needs_copy
 from atraxiflow.base.resources import FilesystemResource
+from atraxiflow.base.scanner import DirectoryScanner
 from atraxiflow.core import *
-from atraxiflow.creator.widgets import AxListWidget, AxNodeWidget
 from atraxiflow.data import DatetimeProcessor, StringValueProcessor
-from atraxiflow.exceptions import FilesystemException
+from atraxiflow.exceptions import ExecutionException, FilesystemException
 from atraxiflow.properties import *
 
 
@@ -26,89 +33,120 @@ class LoadFilesNode(Node):
     @Name: Get files and folders
     """
 
+    UI_ADAPTER = 'atraxiflow.base.filesystem_ui.LoadFilesNodeUI'
+
     def __init__(self, properties: dict = None):
         node_properties = {
-            'paths': Property(expected_type=list, required=True)
+            'paths': Property(expected_type=list, required=True),
+            'use_scanner': Property(expected_type=bool, required=False, default=False, label='Use fast scanner',
+                                    hint='Find files using a directory scanner that supports recursive patterns '
+                                         '(**), exclusions and depth limits'),
+            'exclude': Property(expected_type=list, required=False, default=[], label='Exclude',
+                                hint='Names or relative paths (wildcards allowed) to skip when using the scanner'),
+            'max_depth': Property(expected_type=int, required=False, default=-1, label='Maximum depth',
+                                  hint='Maximum number of directory levels the scanner descends into (-1: no limit)'),
+            'follow_symlinks': Property(expected_type=bool, required=False, default=False, label='Follow symlinks',
+                                        hint='Lets the scanner descend into symlinked directories'),
+            'scan_threads': Property(expected_type=int, required=False, default=1, label='Scanner threads',
+                                     hint='Number of directories to scan in parallel (useful on network drives)')
         }
         super().__init__(node_properties, properties)
-        self.list_widget = None
 
     @staticmethod
     def get_name() -> str:
         return 'Get files and folders'
 
-    def run(self, ctx: WorkflowContext):
-        super().run(ctx)
-        self.output.clear()
-
-        expanded_paths = []
-        for path in self.property('paths').value():
-            # resolve wildcards
-            path_exp = glob.glob(path)
-
-            for sub_path in path_exp:
-                expanded_paths.append(os.path.realpath(sub_path))
-
-        for path in expanded_paths:
-            self.output.add(FilesystemResource(path))
+    def stream(self, ctx: WorkflowContext):
+        if self.property('use_scanner').value() is True:
+            scanner = DirectoryScanner(exclude=self.property('exclude').value(),
+                                       max_depth=self.property('max_depth').value(),
+                                       follow_symlinks=self.property('follow_symlinks').value(),
+                                       threads=self.property('scan_threads').value())
 
-    def apply_ui_data(self):
-        self.property('paths').set_value(self.list_widget.get_item_list())
+            for path in self.property('paths').value():
+                for res in scanner.scan(path):
+                    yield res
 
-    def load_ui_data(self):
-        if isinstance(self.property('paths').value(), MissingRequiredValue):
             return
 
-        for item in self.property('paths').value():
-            self.list_widget.get_list().addItem(item)
-
-    def add_path(self, lst: AxListWidget, mode='files'):
-        path = ''
-
-        if mode == 'text':
-            text = QtWidgets.QInputDialog.getText(lst, 'Add path', 'Enter a path, you may use wildcards (*)',
-                                                  QtWidgets.QLineEdit.Normal)
-
-            if text[1]:
-                path = [text[0]]
-
-        else:
-            dlg = QtWidgets.QFileDialog()
-
-            if mode == 'files':
-                dlg.setFileMode(QtWidgets.QFileDialog.ExistingFiles)
-            elif mode == 'folder':
-                dlg.setFileMode(QtWidgets.QFileDialog.DirectoryOnly)
-
-            dlg.setAcceptMode(QtWidgets.QFileDialog.AcceptOpen)
-            if not dlg.exec_():
-                return
-
-            path = dlg.selectedFiles()
+        for path in self.property('paths').value():
+            # resolve wildcards
+            for sub_path in glob.iglob(path):
+                yield FilesystemResource(os.path.realpath(sub_path))
 
-        self.list_widget.add_items(path)
+    def run(self, ctx: WorkflowContext):
+        super().run(ctx)
+        self.output.clear()
 
-    def get_ui(self, node_widget: AxNodeWidget) -> QtWidgets.QWidget:
-        self.list_widget = AxListWidget()
-        action_add_files = QtWidgets.QAction('Add file', self.list_widget.get_toolbar())
-        action_add_files.connect(QtCore.SIGNAL('triggered()'), lambda lst=self.list_widget: self.add_path(lst, 'file'))
-        action_add_files.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-file-50.png')))
+        for res in self.stream(ctx):
+            self.output.add(res)
 
-        action_add_folder = QtWidgets.QAction('Add folder', self.list_widget.get_toolbar())
-        action_add_folder.connect(QtCore.SIGNAL('triggered()'),
-                                  lambda lst=self.list_widget: self.add_path(lst, 'folder'))
-        action_add_folder.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-folder-50.png')))
 
-        action_add_string = QtWidgets.QAction('Add path pattern', self.list_widget.get_toolbar())
-        action_add_string.connect(QtCore.SIGNAL('triggered()'), lambda lst=self.list_widget: self.add_path(lst, 'text'))
-        action_add_string.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-text-50.png')))
+class FileFilter:
+    """
+    A compiled filter condition of FileFilterNode.
 
-        self.list_widget.add_toolbar_action(action_add_files)
-        self.list_widget.add_toolbar_action(action_add_folder)
-        self.list_widget.add_toolbar_action(action_add_string)
-        self.list_widget.list_changed.connect(node_widget.modified)
+    A filter either checks a numeric file attribute against a list of comparisons that all need to be true or
+    calls a predicate with the resource.
+    """
 
-        return self.list_widget
+    ATTR_SIZE = 'size'
+    ATTR_MODIFIED = 'modified'
+    ATTR_CREATED = 'created'
+    ATTR_IS_FOLDER = 'is_folder'
+
+    COST_STRING = 0
+    COST_REGEX = 1
+    COST_STAT = 2
+
+    GETTERS = {
+        ATTR_SIZE: lambda res: res.get_filesize(),
+        ATTR_MODIFIED: lambda res: res.get_stat().st_mtime,
+        ATTR_CREATED: lambda res: res.get_stat().st_ctime,
+        ATTR_IS_FOLDER: lambda res: res.is_folder()
+    }
+
+    # stat fields and numpy types used when filtering large inputs
+    STAT_FIELDS = {
+        ATTR_SIZE: ('st_size', 'int64'),
+        ATTR_MODIFIED: ('st_mtime', 'float64'),
+        ATTR_CREATED: ('st_ctime', 'float64'),
+        ATTR_IS_FOLDER: ('st_mode', 'int64')
+    }
+
+    def __init__(self, attribute: str = None, comparisons: list = None, negate: bool = False, predicate=None,
+                 cost: int = None):
+        """
+
+        :param str attribute: The attribute to compare (one of the ATTR_* constants)
+        :param list comparisons: A list of (operator function, value) tuples
+        :param bool negate: Negates the result of the comparisons
+        :param callable predicate: A function taking a FilesystemResource, used instead of attribute/comparisons
+        :param int cost: Used to order filters, defaults to COST_STRING for predicates and COST_STAT for attributes
+        """
+        self.attribute = attribute
+        self.comparisons = comparisons if comparisons is not None else []
+        self.negate = negate
+        self.predicate = predicate
+
+        if cost is None:
+            cost = self.COST_STRING if predicate is not None else self.COST_STAT
+
+        self.cost = cost
+
+    def matches(self, res: FilesystemResource) -> bool:
+        if self.predicate is not None:
+            return self.predicate(res)
+
+        value = self.GETTERS[self.attribute](res)
+        result = True
+
+        for op, right_val in self.comparisons:
+            if not op(value, right_val):
+                result = False
+                break
+
+        return result != self.negate
 
 
 class FileFilterNode(Node):
@@ -116,6 +154,20 @@ class FileFilterNode(Node):
     @Name: Filter files and folders
     """
 
+    UI_ADAPTER = 'atraxiflow.base.filesystem_ui.FileFilterNodeUI'
+
+    # Inputs of this size are filtered with numpy (if installed)
+    BATCH_THRESHOLD = 5000
+
+    OPERATORS = {
+        '<': operator.lt,
+        '>': operator.gt,
+        '=': operator.eq,
+        '<=': operator.le,
+        '>=': operator.ge,
+        '!=': operator.ne
+    }
+
     def __init__(self, properties: dict = None):
         node_properties = {
             'filter': Property(expected_type=list, required=True, hint='Filters filesystem resources')
@@ -126,7 +178,7 @@ class FileFilterNode(Node):
         matches = re.match(r"(\d+) *([MKGT]*)", str_size.lstrip(" ").rstrip(" "))
 
         if matches is None:
-            self.ctx.get_logger().log("Invalid filesize format: %s".format(str_size))
+            self.ctx.get_logger().error("Invalid filesize format: %s" % str_size)
             return 0
 
         if matches.group(2) == "":
@@ -144,307 +196,178 @@ class FileFilterNode(Node):
             elif ext == "T":
                 f = 1024 * 1024 * 1024 * 1024
             else:
-                self.ctx.get_logger().log("Invalid filesize format suffix: %s".format(matches.group(2)))
+                self.ctx.get_logger().error("Invalid filesize format suffix: %s" % matches.group(2))
 
             return int(matches.group(1)) * f
 
-    def _matches_filter(self, fsres: FilesystemResource, filter: dict) -> bool:
-        left_val = None
-        right_val = None
-
+    def _compile_date_filter(self, filter: list, attribute: str) -> FileFilter:
         dtp = DatetimeProcessor()
-
-        if filter[0] == "file_size":
-            left_val = fsres.get_filesize()
-            right_val = self._filesize_value_to_number(filter[2])
-
-        elif filter[0] == "date_created":
-            left_val = fsres.get_created()
-            right_val = dtp.process_string(filter[2])
-
-            if dtp.get_range() == DatetimeProcessor.RANGE_DATE:
-                left_val.replace(hour=0, minute=0, second=0, microsecond=0)
-                right_val.replace(hour=0, minute=0, second=0, microsecond=0)
-            elif dtp.get_range() == DatetimeProcessor.RANGE_DATETIME_SHORT:
-                left_val.replace(second=0, microsecond=0)
-                right_val.replace(second=0, microsecond=0)
-            elif dtp.get_range() == DatetimeProcessor.RANGE_DATETIME_LONG:
-                left_val.replace(microsecond=0)
-                right_val.replace(microsecond=0)
-
-        elif filter[0] == "date_modified":
-            left_val = fsres.get_last_modified()
-            right_val = dtp.process_string(filter[2])
-
-            if dtp.get_range() == DatetimeProcessor.RANGE_DATE:
-                left_val = left_val.replace(hour=0, minute=0, second=0, microsecond=0)
-                right_val = right_val.replace(hour=0, minute=0, second=0, microsecond=0)
-            elif dtp.get_range() == DatetimeProcessor.RANGE_DATETIME_SHORT:
-                left_val = left_val.replace(second=0, microsecond=0)
-                right_val = right_val.replace(second=0, microsecond=0)
-            elif dtp.get_range() == DatetimeProcessor.RANGE_DATETIME_LONG:
-                left_val = left_val.replace(microsecond=0)
-                right_val = right_val.replace(microsecond=0)
-
-        elif filter[0] == "type":
-            left_val = 'folder' if fsres.is_folder() else 'file'
-            right_val = filter[2]
-
-            if filter[1] != '=':
-                filter[1] = '='
-                self.ctx.get_logger().warning('Filter "type" only supports comparison "equal" (=)')
-
-        elif filter[0] == 'filename':
-
-            right_val = filter[2]
-            if filter[1] == 'contains':
-                return fsres.get_filename().find(right_val) > -1
-            elif filter[1] == 'startswith':
-                return fsres.get_filename().startswith(right_val)
-            elif filter[1] == 'endswith':
-                return fsres.get_filename().endswith(right_val)
-            elif filter[1] == 'matches':
-                if type(right_val) != type(re.compile('')):
-                    self.ctx.get_logger().error(
-                        'Value to compare needs to be a compiled regex when using "matches" operator.')
-                    raise Exception('Cannot continue due to previous errors. See log for details.')
-                return right_val.match(fsres.get_filename())
-            else:
+        right_val = dtp.process_string(filter[2])
+
+        # file dates are compared with the precision of the given date, so the date is turned into a
+        # time span [start, end) and the comparison is done on the file's timestamp
+        if dtp.get_range() == DatetimeProcessor.RANGE_DATE:
+            start = right_val.replace(hour=0, minute=0, second=0, microsecond=0)
+            end = start + timedelta(days=1)
+        elif dtp.get_range() == DatetimeProcessor.RANGE_DATETIME_SHORT:
+            start = right_val.replace(second=0, microsecond=0)
+            end = start + timedelta(minutes=1)
+        else:
+            start = right_val.replace(microsecond=0)
+            end = start + timedelta(seconds=1)
+
+        start = start.timestamp()
+        end = end.timestamp()
+
+        if filter[1] == '<':
+            return FileFilter(attribute, [(operator.lt, start)])
+        elif filter[1] == '>=':
+            return FileFilter(attribute, [(operator.ge, start)])
+        elif filter[1] == '>':
+            return FileFilter(attribute, [(operator.ge, end)])
+        elif filter[1] == '<=':
+            return FileFilter(attribute, [(operator.lt, end)])
+        elif filter[1] == '=':
+            return FileFilter(attribute, [(operator.ge, start), (operator.lt, end)])
+        elif filter[1] == '!=':
+            return FileFilter(attribute, [(operator.ge, start), (operator.lt, end)], negate=True)
+
+        self.ctx.get_logger().error("Invalid operator: %s" % filter[1])
+        return FileFilter(predicate=lambda res: False)
+
+    def _compile_string_filter(self, filter: list, getter) -> FileFilter:
+        right_val = filter[2]
+
+        if filter[1] == 'contains':
+            return FileFilter(predicate=lambda res: right_val in getter(res))
+        elif filter[1] == 'startswith':
+            return FileFilter(predicate=lambda res: getter(res).startswith(right_val))
+        elif filter[1] == 'endswith':
+            return FileFilter(predicate=lambda res: getter(res).endswith(right_val))
+        elif filter[1] == 'matches':
+            if type(right_val) != type(re.compile('')):
                 self.ctx.get_logger().error(
-                    'Filter "file_name" only supports operators: contain, startswith, endswith, matches (regex).')
+                    'Value to compare needs to be a compiled regex when using "matches" operator.')
                 raise Exception('Cannot continue due to previous errors. See log for details.')
-
+            return FileFilter(predicate=lambda res: right_val.match(getter(res)) is not None,
+                              cost=FileFilter.COST_REGEX)
+
+        self.ctx.get_logger().error(
+            'Filter "%s" only supports operators: contain, startswith, endswith, matches (regex).' % filter[0])
+        raise Exception('Cannot continue due to previous errors. See log for details.')
+
+    def _compile_filter(self, filter: list) -> FileFilter:
+        """
+        Parses a single filter, e.g. ['file_size', '>', '120K'], into a FileFilter
+
+        :param list filter: The filter to compile
+        :return: The compiled filter
+        """
+        if filter[0] == 'filename':
+            return self._compile_string_filter(filter, FilesystemResource.get_filename)
         elif filter[0] == 'filedir':
+            return self._compile_string_filter(filter, FilesystemResource.get_directory)
+        elif filter[0] == 'date_created':
+            return self._compile_date_filter(filter, FileFilter.ATTR_CREATED)
+        elif filter[0] == 'date_modified':
+            return self._compile_date_filter(filter, FileFilter.ATTR_MODIFIED)
+        elif filter[0] == 'type':
+            if filter[1] != '=':
+                self.ctx.get_logger().warning('Filter "type" only supports comparison "equal" (=)')
 
-            right_val = filter[2]
-            if filter[1] == 'contains':
-                return fsres.get_directory().find(right_val) > -1
-            elif filter[1] == 'startswith':
-                return fsres.get_directory().startswith(right_val)
-            elif filter[1] == 'endswith':
-                return fsres.get_directory().endswith(right_val)
-            elif filter[1] == 'matches':
-                if type(right_val) != type(re.compile('')):
-                    self.ctx.get_logger().error(
-                        'Value to compare needs to be a compiled regex when using "matches" operator.')
-                    raise Exception('Cannot continue due to previous errors. See log for details.')
-                return right_val.match(fsres.get_directory())
-            else:
-                self.ctx.get_logger().error(
-                    'Filter "file_name" only supports operators: contain, startswith, endswith, matches (regex).')
+            if filter[2] not in ('file', 'folder'):
+                self.ctx.get_logger().error('Filter "type" only supports the values "file" and "folder".')
                 raise Exception('Cannot continue due to previous errors. See log for details.')
 
-        if filter[1] == "<":
-            return left_val < right_val
-        elif filter[1] == ">":
-            return left_val > right_val
-        elif filter[1] == "=":
-            return left_val == right_val
-        elif filter[1] == "<=":
-            return left_val <= right_val
-        elif filter[1] == ">=":
-            return left_val >= right_val
-        elif filter[1] == "!=":
-            return left_val != right_val
-        else:
-            self.ctx.get_logger().error("Invalid operator: %s".format(filter[1]))
-            return False
-
-    def show_add_condition_dialog(self, condition_class=''):
-        dlg = QtWidgets.QDialog()
-        dlg.setWindowTitle('Add new condition')
-        dlg.setLayout(QtWidgets.QVBoxLayout())
-
-        h_layout = QtWidgets.QHBoxLayout()
-        label = QtWidgets.QLabel()
-        h_layout.addWidget(label)
-        combo_operator = QtWidgets.QComboBox()
-        combo_operator.setEditable(False)
-        h_layout.addWidget(combo_operator)
-
-        operator_map = {}
-
-        if condition_class in ('filename', 'dir'):
-            operator_map = {
-                'contains': 'contains',
-                'starts with': 'startswith',
-                'ends with': 'endswith',
-                'matches (RegEx)': 'matches'
-            }
-
-            label.setText('Filename' if condition_class == 'filename' else 'Directory name')
-            combo_operator.addItems(list(operator_map.keys()))
-            control = QtWidgets.QLineEdit()
-            h_layout.addWidget(control)
-
-        elif condition_class == 'type':
-            label.setText('Path is a ')
-            control = QtWidgets.QComboBox()
-            control.setEditable(False)
-            control.addItems(['file', 'folder'])
-            h_layout.addWidget(control)
-            h_layout.removeWidget(combo_operator)
-
-        elif condition_class in ('created', 'modified'):
-            operator_map = {
-                'less than': '<',
-                'more than': '>',
-                'equals': '=',
-                'less or equal': '<=',
-                'more or equal': '>=',
-                'not': '!='
-            }
-
-            label.setText('Date created is' if condition_class == 'created' else 'Date modified is')
-            combo_operator.addItems(list(operator_map.keys()))
-            control = QtWidgets.QComboBox()
-            control.setEditable(True)
-            control.addItems(['today', 'yesterday', 'tomorrow'])
-            control.setCurrentText('')
-            h_layout.addWidget(control)
-
-        elif condition_class == 'size':
-            operator_map = {
-                'less than': '<',
-                'more than': '>',
-                'equals': '=',
-                'less or equal': '<=',
-                'more or equal': '>=',
-                'not': '!='
-            }
-
-            unit_map = {
-                'Bytes': '',
-                'Kilobytes': 'K',
-                'Megabytes': 'M',
-                'Gigabytes': 'G',
-                'Terabytes': 'T'
-            }
-
-            label.setText('Filesize is')
-            combo_operator.addItems(list(operator_map.keys()))
-            control = QtWidgets.QSpinBox()
-            control.setRange(1, 9999999)
-            h_layout.addWidget(control)
-            combo_unit = QtWidgets.QComboBox()
-            combo_unit.setEditable(False)
-            combo_unit.addItems(list(unit_map.keys()))
-            h_layout.addWidget(combo_unit)
-
-        button_box = QtWidgets.QDialogButtonBox()
-        button_box.setStandardButtons(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
-        button_box.connect(QtCore.SIGNAL('accepted()'), dlg.accept)
-        button_box.connect(QtCore.SIGNAL('rejected()'), dlg.reject)
-
-        dlg.layout().addLayout(h_layout)
-        dlg.layout().addWidget(button_box)
-        if dlg.exec_() == QtWidgets.QDialog.Rejected:
-            return
+            return FileFilter(FileFilter.ATTR_IS_FOLDER, [(operator.eq, filter[2] == 'folder')])
+        elif filter[0] == 'file_size':
+            if filter[1] not in self.OPERATORS:
+                self.ctx.get_logger().error("Invalid operator: %s" % filter[1])
+                return FileFilter(predicate=lambda res: False)
+
+            return FileFilter(FileFilter.ATTR_SIZE,
+                              [(self.OPERATORS[filter[1]], self._filesize_value_to_number(filter[2]))])
+
+        self.ctx.get_logger().error('Unknown filter: "%s"' % filter[0])
+        raise Exception('Cannot continue due to previous errors. See log for details.')
+
+    def compile_filters(self) -> List[FileFilter]:
+        """
+        Compiles the node's filters. The result is sorted, so that filters that do not need to access the
+        filesystem are evaluated first.
+
+        :return: A list of compiled filters
+        """
+        plan = [self._compile_filter(filter) for filter in self.property('filter').value()]
+        # sorted() is stable, so filters of the same cost are evaluated in the given order
+        return sorted(plan, key=lambda f: f.cost)
+
+    def _filter_rows(self, resources, plan: List[FileFilter]):
+        for resource in resources:
+            if all(f.matches(resource) for f in plan):
+                yield resource
+
+    def _filter_columns(self, resources: list, plan: List[FileFilter]) -> list:
+        """
+        Filters the resources using numpy. The file attributes used by the filters are collected into arrays
+        and compared at once, filters using predicates are only evaluated for the remaining resources.
+        """
+        try:
+            stats = [res.get_stat() for res in resources]
+        except FileNotFoundError:
+            # missing files are handled like in small inputs: they are no folders, size and date filters
+            # raise an error unless a cheaper filter excluded the file before
+            return list(self._filter_rows(resources, plan))
+
+        columns = {}
+        mask = numpy.ones(len(resources), dtype=bool)
+
+        for f in plan:
+            if f.predicate is not None:
+                continue
+
+            if f.attribute not in columns:
+                field, dtype = FileFilter.STAT_FIELDS[f.attribute]
+                column = numpy.fromiter((getattr(st, field) for st in stats), dtype=dtype, count=len(stats))
+
+                if f.attribute == FileFilter.ATTR_IS_FOLDER:
+                    # 0o170000 masks the file type bits, like stat.S_IFMT()
+                    column = (column & 0o170000) == stat.S_IFDIR
+
+                columns[f.attribute] = column
+
+            f_mask = numpy.ones(len(resources), dtype=bool)
+            for op, right_val in f.comparisons:
+                f_mask &= op(columns[f.attribute], right_val)
+
+            mask &= ~f_mask if f.negate else f_mask
+
+        remaining = [resources[i] for i in numpy.flatnonzero(mask)]
+        return list(self._filter_rows(remaining, [f for f in plan if f.predicate is not None]))
+
+    def stream(self, ctx: WorkflowContext):
+        self.ctx = ctx
+        plan = self.compile_filters()
 
-        # Add list item
-        if condition_class in ('filename', 'dir'):
-            text = control.text()
-
-            if combo_operator.currentText() == 'matches (RegEx)':
-                text = re.compile(text)
-
-            label = '%s %s "%s"' % ('Filename' if condition_class == 'filename' else 'Directory name',
-                                    combo_operator.currentText(), control.text())
-            data = ['filename' if condition_class == 'filename' else 'filedir',
-                    operator_map[combo_operator.currentText()], control.text(), label]
-            item = QtWidgets.QListWidgetItem()
-            item.setData(QtCore.Qt.UserRole, data)
-            item.setText(label)
-            self.list_widget.add_item(item)
-
-        elif condition_class == 'type':
-            label = 'Path is a %s' % control.currentText()
-            data = ['type', '=', control.currentText(), label]
-            item = QtWidgets.QListWidgetItem()
-            item.setData(QtCore.Qt.UserRole, data)
-            item.setText(label)
-            self.list_widget.add_item(item)
-
-        elif condition_class in ('created', 'modified'):
-            label = '%s %s "%s"' % ('Date created' if condition_class == 'created' else 'Date modified',
-                                    combo_operator.currentText(), control.currentText())
-            data = ['date_created' if condition_class == 'created' else 'date_modified', combo_operator.currentText(),
-                    control.currentText(), label]
-            item = QtWidgets.QListWidgetItem()
-            item.setData(QtCore.Qt.UserRole, data)
-            item.setText(label)
-            self.list_widget.add_item(item)
-
-        elif condition_class == 'size':
-            label = 'File size %s %s %s' % (combo_operator.currentText(), control.text(), combo_unit.currentText())
-            data = ['file_size', combo_operator.currentText(), control.text() + combo_unit.currentText(), label]
-            item = QtWidgets.QListWidgetItem()
-            item.setData(QtCore.Qt.UserRole, data)
-            item.setText(label)
-            self.list_widget.add_item(item)
-
-    def apply_ui_data(self):
-        conditions = []
-        for n in range(0, self.list_widget.get_list().count()):
-            item = self.list_widget.get_list().item(n)
-            conditions.append(item.data(QtCore.Qt.UserRole))
-
-        self.property('filter').set_value(conditions)
-
-    def load_ui_data(self):
-        for data in self.property('filter').value():
-            item = QtWidgets.QListWidgetItem(data[3])
-            item.setData(QtCore.Qt.UserRole, data)
-            self.list_widget.add_item(item)
-
-    def get_ui(self, node_widget: AxNodeWidget) -> QtWidgets.QWidget:
-        self.list_widget = AxListWidget(show_edit_button=False)
-        self.list_widget.list_changed.connect(node_widget.modified)
-        btn_add_cond = QtWidgets.QPushButton()
-        btn_add_cond.setObjectName('ax_toolbar_pushbutton')
-        mnu_cond = QtWidgets.QMenu(btn_add_cond)
-
-        action_add_filename = QtWidgets.QAction('Filter by filename', mnu_cond)
-        action_add_filename.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('filename'))
-        action_add_dir = QtWidgets.QAction('Filter by directory', mnu_cond)
-        action_add_dir.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('dir'))
-        action_add_type = QtWidgets.QAction('Filter by file type', mnu_cond)
-        action_add_type.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('type'))
-        action_add_created = QtWidgets.QAction('Filter by date created', mnu_cond)
-        action_add_created.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('created'))
-        action_add_modified = QtWidgets.QAction('Filter by date modified', mnu_cond)
-        action_add_modified.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('modified'))
-        action_add_size = QtWidgets.QAction('Filter by file size', mnu_cond)
-        action_add_size.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('size'))
-        mnu_cond.addAction(action_add_filename)
-        mnu_cond.addAction(action_add_dir)
-        mnu_cond.addAction(action_add_type)
-        mnu_cond.addAction(action_add_created)
-        mnu_cond.addAction(action_add_modified)
-        mnu_cond.addAction(action_add_size)
-
-        btn_add_cond.setIconSize(QtCore.QSize(20, 20))
-        btn_add_cond.setFlat(True)
-        btn_add_cond.setMenu(mnu_cond)
-        btn_add_cond.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-file-50.png')))
-
-        self.list_widget.add_toolbar_widget(btn_add_cond)
-
-        return self.list_widget
+        for resource in self._filter_rows(self.get_input().stream('atraxiflow.FilesystemResource'), plan):
+            yield resource
 
     def run(self, ctx: WorkflowContext):
         super().run(ctx)
         self.output.clear()
         self.ctx = ctx
 
-        for resource in self.get_input().find('atraxiflow.FilesystemResource'):
-            passed = True
+        plan = self.compile_filters()
+        resources = self.get_input().find('atraxiflow.FilesystemResource')
 
-            for filter in self.property("filter").value():
-                passed = passed and self._matches_filter(resource, filter)
+        if numpy is not None and len(resources) >= self.BATCH_THRESHOLD and \
+                any(f.predicate is None for f in plan):
+            filtered = self._filter_columns(resources, plan)
+        else:
+            filtered = self._filter_rows(resources, plan)
 
-            if passed:
-                self.output.add(resource)
+        for resource in filtered:
+            self.output.add(resource)
 
         return True
 
@@ -461,11 +384,32 @@ class FSCopyNode(Node):
             'create_if_missing': Property(expected_type=bool, required=False, label='Create missing folders',
                                           hint='Creates the destination path if it is missing', default=True),
             'dry': Property(expected_type=bool, required=False, default=False, label='Dry run',
-                            hint='If true no files/folders will be copied, only a message in the log will be created')
+                            hint='If true no files/folders will be copied, only a message in the log will be created'),
+            'workers': Property(expected_type=int, required=False, default=1, label='Parallel copies',
+                                hint='Number of files to copy at the same time'),
+            'incremental': Property(expected_type=bool, required=False, default=False, label='Only copy changes',
+                                    hint='Skips files that exist in the destination with the same size and '
+                                         'modification time. Folders are merged into existing folders.'),
+            'compare_content': Property(expected_type=bool, required=False, default=False, label='Compare contents',
+                                        hint='Incremental mode: compare file contents instead of modification '
+                                             'times (slower)')
         }
         super().__init__(node_properties, properties)
 
-    def _do_copy(self, src: str, dest: str) -> bool:
+    def _create_engine(self, ctx: WorkflowContext) -> CopyEngine:
+        def on_progress(job: CopyJob, progress: dict):
+            progress['source'] = job.src
+            progress['dest'] = job.dst
+            ctx.report_progress(self, progress)
+
+        return CopyEngine(self.property('workers').value(), on_progress)
+
+    def _plan_copy(self, engine: CopyEngine, src: str, dest: str) -> FilesystemResource:
+        """
+        Checks source and destination and adds the files to copy to the engine. Folders are created right away.
+
+        :return: The resource that will exist after the engine has run or None if the source can't be copied
+        """
         # check if src and dest exist
         src_p = Path(src)
         dest_p = Path(dest)
@@ -482,24 +426,124 @@ class FSCopyNode(Node):
             elif not dest_p.exists() and self.property("create_if_missing").value() is True:
                 os.makedirs(str(dest_p.absolute()))
 
-            self._ctx.get_logger().debug("Copying file: {0} -> {1}".format(src_p, dest_p))
-            shutil.copy(str(src_p.absolute()), str(dest_p.absolute()))
-            self.output.add(FilesystemResource(os.path.join(str(dest_p.absolute()), str(src_p.name))))
+            target = os.path.join(str(dest_p.absolute()), str(src_p.name))
+
+            if self.property('incremental').value() is True:
+                self._update_file(engine, str(src_p.absolute()), target)
+            else:
+                self._ctx.get_logger().debug("Copying file: {0} -> {1}".format(src_p, dest_p))
+                engine.add(str(src_p.absolute()), target)
+
+            return FilesystemResource(target)
 
         elif src_p.is_dir():
+            if self.property('incremental').value() is True:
+                self._ctx.get_logger().debug("Updating directory: {0} -> {1}".format(src_p, dest_p))
+                self._update_tree(engine, str(src_p.absolute()), str(dest_p.absolute()))
+                return FilesystemResource(str(dest_p.absolute()))
+
             if dest_p.exists():
                 self._ctx.get_logger().error("Destination directory already exists")
-                return False
+                return None
 
             self._ctx.get_logger().debug("Copying directory: {0} -> {1}".format(src_p, dest_p))
-            shutil.copytree(str(src_p.absolute()), str(dest_p.absolute()))
-            self.output.add(FilesystemResource(str(dest_p.absolute())))
 
+            # copytree only creates the folders, the files are copied by the engine
+            src_dirs = []
+
+            def add_dir(src_dir: str, names: list) -> list:
+                src_dirs.append(src_dir)
+                return []
+
+            def add_file(src_file: str, dest_file: str):
+                engine.add(src_file, dest_file, CopyJob.PRESERVE_STAT)
+
+            shutil.copytree(str(src_p.absolute()), str(dest_p.absolute()), copy_function=add_file,
+                            ignore=add_dir)
+
+            for src_dir in reversed(src_dirs):
+                self._copied_dirs.append(
+                    (src_dir, os.path.join(str(dest_p.absolute()), os.path.relpath(src_dir, str(src_p.absolute())))))
+
+            return FilesystemResource(str(dest_p.absolute()))
+
+        return None
+
+    def _update_file(self, engine: CopyEngine, src: str, dest: str, src_stat: os.stat_result = None) -> bool:
+        """
+        Adds the file to the engine if the destination is missing or has changed
+
+        :return: True if the file will be copied
+        """
+        if not needs_copy(src, dest, self.property('compare_content').value(), src_stat):
+            self._ctx.get_logger().debug("Skipping unchanged file: {0}".format(src))
+            return False
+
+        self._ctx.get_logger().debug("Copying file: {0} -> {1}".format(src, dest))
+        # keep the modification time, so the file is recognized as unchanged next time
+        engine.add(src, dest, CopyJob.PRESERVE_STAT, None if src_stat is None else src_stat.st_size)
         return True
 
+    def _update_tree(self, engine: CopyEngine, src: str, dest: str):
+        changed_dirs = []
+
+        for root, dirs, files in os.walk(src, followlinks=True):
+            dest_root = os.path.join(dest, os.path.relpath(root, src))
+            changed = False
+
+            if not os.path.isdir(dest_root):
+                os.makedirs(dest_root)
+                changed = True
+
+            for file in files:
+                src_file = os.path.join(root, file)
+                try:
+                    src_stat = os.stat(src_file)
+                except FileNotFoundError:
+                    # broken symlink
+                    continue
+
+                if self._update_file(engine, src_file, os.path.join(dest_root, file), src_stat):
+                    changed = True
+
+            # folders with new files need the timestamps of their source again after copying
+            if changed:
+                changed_dirs.append((root, dest_root))
+
+        self._copied_dirs.extend(reversed(changed_dirs))
+
+    def _run_engine(self, engine: CopyEngine):
+        engine.run()
+
+        # copying the files changed the modification times of the new folders
+        for src_dir, dest_dir in self._copied_dirs:
+            shutil.copystat(src_dir, dest_dir)
+
+        self._copied_dirs = []
+
+    def stream(self, ctx: WorkflowContext):
+        self._ctx = ctx
+        self._copied_dirs = []
+        dest = ctx.process_str(self.property('dest').value())
+        engine = self._create_engine(ctx)
+
+        for res in self.get_input().stream('atraxiflow.FilesystemResource'):
+            if self.property('dry').value() is True:
+                ctx.get_logger().info("DRY RUN: Copy {0} -> {1}".format(res.get_absolute_path(), dest))
+                continue
+
+            copied = self._plan_copy(engine, res.get_absolute_path(), dest)
+            if copied is None:
+                # the error has been logged, the node fails like in run()
+                raise ExecutionException('Could not copy {0}'.format(res.get_absolute_path()))
+
+            self._run_engine(engine)
+            yield copied
+
     def run(self, ctx: WorkflowContext):
         super().run(ctx)
         self._ctx = ctx
+        self._copied_dirs = []
         self.output.clear()
 
         resources = self.get_input().find('atraxiflow.FilesystemResource')
@@ -508,13 +552,24 @@ class FSCopyNode(Node):
             ctx.get_logger().warning('No resources found for copying.')
 
         dest = ctx.process_str(self.property('dest').value())
+        engine = self._create_engine(ctx)
+        copied_resources = []
+
         for res in resources:
             if self.property('dry').value() is True:
                 ctx.get_logger().info("DRY RUN: Copy {0} -> {1}".format(res.get_absolute_path(), dest))
             else:
-                if self._do_copy(res.get_absolute_path(), dest) is not True:
+                copied = self._plan_copy(engine, res.get_absolute_path(), dest)
+                if copied is None:
                     return False
 
+                copied_resources.append(copied)
+
+        self._run_engine(engine)
+
+        for copied in copied_resources:
+            self.output.add(copied)
+
         return True
 
 
@@ -529,7 +584,9 @@ class FSMoveNode(Node):
                                  display_options={'role': 'folder'}),
             'create_dirs': Property(expected_type=bool, required=False, label='Create destination directories',
                                     hint='Create missing destination paths', default=False),
-            'dry': Property(expected_type=bool, required=False, label='Dry', hint='Simulate file operation', default=False)
+            'dry': Property(expected_type=bool, required=False, label='Dry', hint='Simulate file operation', default=False),
+            'workers': Property(expected_type=int, required=False, default=1, label='Parallel copies',
+                                hint='Number of files to copy at the same time when moving to another filesystem')
         }
         super().__init__(node_properties, properties)
 
@@ -539,24 +596,38 @@ class FSMoveNode(Node):
         # In case the node is run multiple times, we will empty the output container
         self.output.clear()
 
-        if self.property('create_dirs').value() and not os.path.exists(self.property('dest').value()):
-            ctx.get_logger().debug('Creating missing destination directory "%s"' % self.property('dest').value())
-            os.makedirs(self.property('dest').value())
+        dest = self.property('dest').value()
+
+        if self.property('create_dirs').value() and not os.path.exists(dest):
+            ctx.get_logger().debug('Creating missing destination directory "%s"' % dest)
+            os.makedirs(dest)
+
+        def on_progress(job: CopyJob, progress: dict):
+            progress['source'] = job.src
+            progress['dest'] = job.dst
+            ctx.report_progress(self, progress)
+
+        engine = MoveEngine(self.property('workers').value(), on_progress)
 
         resources = self.get_input().find('atraxiflow.FilesystemResource')
         for res in resources:
             assert isinstance(res, FilesystemResource)  # helps with autocompletion
 
-            dest_name = os.path.join(self.property('dest').value(), res.get_filename())
+            dest_name = os.path.join(dest, res.get_filename())
 
             if self.property('dry').value():
                 ctx.get_logger().debug('DRY RUN: Moving file "%s" -> "%s"' % (res.get_absolute_path(), dest_name))
             else:
                 ctx.get_logger().debug('Moving file "%s" -> "%s"' % (res.get_absolute_path(), dest_name))
-                os.rename(res.get_absolute_path(), dest_name)
+                engine.add(res.get_absolute_path(), dest_name)
 
             self.output.add(FilesystemResource(dest_name))
 
+        engine.run()
+
+        for res in resources:
+            res.invalidate()
+
         return True
 
 
@@ -565,6 +636,8 @@ class FSRenameNode(Node):
     @Name: Rename files and folders
     """
 
+    UI_ADAPTER = 'atraxiflow.base.filesystem_ui.FSRenameNodeUI'
+
     def __init__(self, properties: dict = None):
         node_properties = {
             'name': Property(expected_type=str, required=False, label='Target name',
@@ -572,140 +645,22 @@ class FSRenameNode(Node):
             'replace': Property(expected_type=dict, required=False, default={}, label='Replace',
                                 hint='A list of strings to replace. The key can be a compiled regular expression.'),
             'dry': Property(expected_type=bool, required=False, default=False, label='Dry run',
-                            hint='If true no files/folders will be renamed, only a message in the log will be created')
+                            hint='If true no files/folders will be renamed, only a message in the log will be created'),
+            'workers': Property(expected_type=int, required=False, default=1, label='Parallel folders',
+                                hint='Number of folders to rename files in at the same time')
         }
         super().__init__(node_properties, properties)
 
-    def show_add_replace_dialog(self):
-        dlg = QtWidgets.QDialog()
-        dlg.setWindowTitle('Add string to replace')
-        dlg.setLayout(QtWidgets.QVBoxLayout())
-
-        form_layout = QtWidgets.QFormLayout()
-        line_search = QtWidgets.QLineEdit()
-        line_replace = QtWidgets.QLineEdit()
-
-        form_layout.addRow('Search', line_search)
-        form_layout.addRow('Replace', line_replace)
-        btn_box = QtWidgets.QDialogButtonBox()
-        btn_box.setStandardButtons(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
-        btn_box.connect(QtCore.SIGNAL('accepted()'), dlg.accept)
-        btn_box.connect(QtCore.SIGNAL('rejected()'), dlg.reject)
-        dlg.layout().addLayout(form_layout)
-        dlg.layout().addWidget(btn_box)
-
-        result = dlg.exec_()
-
-        if result == QtWidgets.QDialog.Accepted:
-            item = QtWidgets.QListWidgetItem()
-            item.setData(QtCore.Qt.UserRole, [line_search.text(), line_replace.text()])
-            item.setText('{} -> {}'.format(line_search.text(), line_replace.text()))
-            self.replace_list.add_item(item)
-
-    def get_ui(self, node_widget: AxNodeWidget) -> QtWidgets.QWidget:
-
-        def toggle_children(parent: QtWidgets.QWidget, state: bool):
-            for child in parent.children():
-                if isinstance(child, QtWidgets.QWidget):
-                    child.setEnabled(state)
-
-        def append_to_rename(txt: str):
-            self.line_target_name.setText(self.line_target_name.text() + txt)
-
-        widget = QtWidgets.QWidget()
-        widget.setLayout(QtWidgets.QVBoxLayout())
-
-        variables = {
-            'File basename': '{file.basename}',
-            'File extension': '{file.extension}',
-            'File path': '{file.path}',
-        }
+    def _compile_replace(self, svp: StringValueProcessor) -> list:
+        rules = []
 
-        # Rename
-        self.group_rename = QtWidgets.QGroupBox()
-        self.group_rename.setTitle('Rename')
-        self.group_rename.setCheckable(True)
-        self.group_rename.setChecked(True)
-        self.group_rename.connect(QtCore.SIGNAL('toggled(bool)'), lambda on: toggle_children(self.group_rename, on))
-        self.group_rename.setLayout(QtWidgets.QVBoxLayout())
-
-        ctx_target_name = QtWidgets.QMenu()
-        for lbl, var in variables.items():
-            action = QtWidgets.QAction(ctx_target_name)
-            action.setText(lbl)
-            action.connect(QtCore.SIGNAL('triggered()'), lambda var=var: append_to_rename(var))
-            ctx_target_name.addAction(action)
-
-        self.line_target_name = QtWidgets.QLineEdit()
-        self.line_target_name.connect(QtCore.SIGNAL('textChanged(QString)'), lambda s: node_widget.modified)
-        self.line_target_name.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        self.line_target_name.connect(QtCore.SIGNAL('customContextMenuRequested(QPoint)'),
-                                      lambda pos: ctx_target_name.exec_(self.line_target_name.mapToGlobal(pos)))
-
-        rename_text = QtWidgets.QLabel('The new name will be applied to the whole path (so if you change the ' + \
-                                       'directory part <strong>the files will be moved</strong>). There are a number ' + \
-                                       'of variables available, take a look at the context menu for a list.')
-        rename_text.setWordWrap(True)
-        self.group_rename.layout().addWidget(rename_text)
-        self.group_rename.layout().addWidget(self.line_target_name)
-
-        # Replace
-        self.group_replace = QtWidgets.QGroupBox()
-        self.group_replace.setTitle('Replace')
-        self.group_replace.setCheckable(True)
-        self.group_replace.setChecked(False)
-        self.group_replace.connect(QtCore.SIGNAL('toggled(bool)'), lambda on: toggle_children(self.group_replace, on))
-        self.group_replace.setLayout(QtWidgets.QVBoxLayout())
-
-        self.replace_list = AxListWidget(show_edit_button=False)
-        self.replace_list.list_changed.connect(node_widget.modified)
-        self.replace_list.layout().setContentsMargins(0, 0, 0, 0)
-        action_add = QtWidgets.QAction('Add replacement rule', self.replace_list.get_toolbar())
-        action_add.connect(QtCore.SIGNAL('triggered()'), self.show_add_replace_dialog)
-        action_add.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-text-50.png')))
-        self.replace_list.add_toolbar_action(action_add)
-        self.group_replace.layout().addWidget(self.replace_list)
-        toggle_children(self.replace_list, False)
-
-        self.check_dry = QtWidgets.QCheckBox()
-        self.check_dry.setText('Dry run')
-
-        widget.layout().addWidget(self.group_rename)
-        widget.layout().addWidget(self.group_replace)
-        widget.layout().addWidget(self.check_dry)
-
-        return widget
-
-    def apply_ui_data(self):
-
-        if self.group_rename.isChecked():
-            self.property('name').set_value(self.line_target_name.text())
-
-        if self.group_replace.isChecked():
-
-            repl_list = {}
-            for n in range(0, self.replace_list.get_list().count()):
-                item = self.replace_list.get_list().item(n)
-                data = item.data(QtCore.Qt.UserRole)
-                assert isinstance(data, list)
-
-                repl_list[data[0]] = data[1]
-
-            self.property('replace').set_value(repl_list)
-
-        self.property('dry').set_value(self.check_dry.isChecked())
-
-    def load_ui_data(self):
-        self.group_rename.setChecked(self.property('name').value() != '')
-        self.group_replace.setChecked(len(self.property('replace').value()) > 0)
-        self.check_dry.setChecked(self.property('dry').value())
-        self.line_target_name.setText(self.property('name').value())
-
-        for find, repl in self.property('replace').value().items():
-            item = QtWidgets.QListWidgetItem()
-            item.setText('%s -> %s' % (find, repl))
-            item.setData(QtCore.Qt.UserRole, [find, repl])
-            self.replace_list.add_item(item)
+        for key, val in self.property('replace').value().items():
+            # since py > 3.7 returns 're.Pattern' as result of re.compile and
+            # other versions _sre.SRE_PATTERN, we use a little workaround here instead of using the actual
+            # object
+            rules.append((key, isinstance(key, type(re.compile(''))), svp.compile(val)))
+
+        return rules
 
     def run(self, ctx: WorkflowContext):
         super().run(ctx)
@@ -715,36 +670,57 @@ class FSRenameNode(Node):
 
         resources = self.get_input().find('atraxiflow.FilesystemResource')
 
+        # parse name and replacements only once
+        svp = StringValueProcessor(ctx)
+        name = None if self.property('name').value() == '' else svp.compile(self.property('name').value())
+        rules = [] if self.property('replace').value() is None else self._compile_replace(svp)
+
+        plan = RenamePlan()
+        new_names = []
+
         for res in resources:
             assert isinstance(res, FilesystemResource)  # helps with autocompletion
 
             new_name = res.get_absolute_path()
-            svp = StringValueProcessor(ctx)
+            variables = {
+                'file.basename': res.get_basename(),
+                'file.extension': res.get_extension(),
+                'file.path': res.get_directory()
+            }
+
+            if name is not None:
+                new_name = name(variables)
 
-            if self.property('name').value() != '':
-                svp.add_variable('file.basename', res.get_basename())
-                svp.add_variable('file.extension', res.get_extension())
-                svp.add_variable('file.path', res.get_directory())
+            for key, is_regex, val in rules:
+                if is_regex:
+                    new_name = key.sub(val(variables), new_name)
+                else:
+                    new_name = new_name.replace(key, val(variables))
 
-                new_name = svp.parse(self.property('name').value())
+            plan.add(res.get_absolute_path(), new_name)
+            new_names.append(new_name)
 
-            if self.property('replace').value() is not None:
-                for key, val in self.property('replace').value().items():
+        # nothing is renamed if any of the files can't be renamed
+        problems = plan.check()
+        for problem in problems:
+            ctx.get_logger().error(problem)
 
-                    # since py > 3.7 returns 're.Pattern' as result of re.compile and
-                    # other versions _sre.SRE_PATTERN, we use a little workaround here instead of using the actual
-                    # object
-                    if isinstance(key, type(re.compile(''))):
-                        new_name = key.sub(svp.parse(val), new_name)
-                    else:
-                        new_name = new_name.replace(key, svp.parse(val))
+        if len(problems) > 0:
+            return False
 
+        for src, dst in plan.get_renames():
             if self.property('dry').value() is True:
-                ctx.get_logger().debug("DRY RUN: Rename {0} -> {1}".format(res.get_absolute_path(), new_name))
-                self.output.add(FilesystemResource(new_name))
+                ctx.get_logger().debug("DRY RUN: Rename {0} -> {1}".format(src, dst))
             else:
-                os.rename(res.get_absolute_path(), new_name)
-                self.output.add(FilesystemResource(new_name))
-                ctx.get_logger().debug("Renamed {0} to {1}".format(res.get_absolute_path(), new_name))
+                ctx.get_logger().debug("Renaming {0} to {1}".format(src, dst))
+
+        if self.property('dry').value() is not True:
+            plan.execute(self.property('workers').value())
+
+            for res in resources:
+                res.invalidate()
+
+        for new_name in new_names:
+            self.output.add(FilesystemResource(new_name))
 
         return True
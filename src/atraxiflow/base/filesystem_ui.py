@@ -0,0 +1,401 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+"""
+User interfaces of the filesystem nodes in Creator, see :py:class:`atraxiflow.core.NodeUIAdapter`
+"""
+import re
+
+from PySide2 import QtWidgets, QtCore, QtGui
+
+from atraxiflow.base import assets
+from atraxiflow.core import NodeUIAdapter
+from atraxiflow.creator.widgets import AxListWidget, AxNodeWidget
+from atraxiflow.properties import MissingRequiredValue
+
+
+class LoadFilesNodeUI(NodeUIAdapter):
+
+    def __init__(self, node):
+        super().__init__(node)
+        self.list_widget = None
+
+    def apply_ui_data(self):
+        self.node.property('paths').set_value(self.list_widget.get_item_list())
+
+    def load_ui_data(self):
+        if isinstance(self.node.property('paths').value(), MissingRequiredValue):
+            return
+
+        for item in self.node.property('paths').value():
+            self.list_widget.get_list().addItem(item)
+
+    def add_path(self, lst: AxListWidget, mode='files'):
+        path = ''
+
+        if mode == 'text':
+            text = QtWidgets.QInputDialog.getText(lst, 'Add path', 'Enter a path, you may use wildcards (*)',
+                                                  QtWidgets.QLineEdit.Normal)
+
+            if text[1]:
+                path = [text[0]]
+
+        else:
+            dlg = QtWidgets.QFileDialog()
+
+            if mode == 'files':
+                dlg.setFileMode(QtWidgets.QFileDialog.ExistingFiles)
+            elif mode == 'folder':
+                dlg.setFileMode(QtWidgets.QFileDialog.DirectoryOnly)
+
+            dlg.setAcceptMode(QtWidgets.QFileDialog.AcceptOpen)
+            if not dlg.exec_():
+                return
+
+            path = dlg.selectedFiles()
+
+        self.list_widget.add_items(path)
+
+    def get_ui(self, node_widget: AxNodeWidget) -> QtWidgets.QWidget:
+        self.list_widget = AxListWidget()
+        action_add_files = QtWidgets.QAction('Add file', self.list_widget.get_toolbar())
+        action_add_files.connect(QtCore.SIGNAL('triggered()'), lambda lst=self.list_widget: self.add_path(lst, 'file'))
+        action_add_files.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-file-50.png')))
+
+        action_add_folder = QtWidgets.QAction('Add folder', self.list_widget.get_toolbar())
+        action_add_folder.connect(QtCore.SIGNAL('triggered()'),
+                                  lambda lst=self.list_widget: self.add_path(lst, 'folder'))
+        action_add_folder.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-folder-50.png')))
+
+        action_add_string = QtWidgets.QAction('Add path pattern', self.list_widget.get_toolbar())
+        action_add_string.connect(QtCore.SIGNAL('triggered()'), lambda lst=self.list_widget: self.add_path(lst, 'text'))
+        action_add_string.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-text-50.png')))
+
+        self.list_widget.add_toolbar_action(action_add_files)
+        self.list_widget.add_toolbar_action(action_add_folder)
+        self.list_widget.add_toolbar_action(action_add_string)
+        self.list_widget.list_changed.connect(node_widget.modified)
+
+        return self.list_widget
+
+
+class FileFilterNodeUI(NodeUIAdapter):
+
+    def show_add_condition_dialog(self, condition_class=''):
+        dlg = QtWidgets.QDialog()
+        dlg.setWindowTitle('Add new condition')
+        dlg.setLayout(QtWidgets.QVBoxLayout())
+
+        h_layout = QtWidgets.QHBoxLayout()
+        label = QtWidgets.QLabel()
+        h_layout.addWidget(label)
+        combo_operator = QtWidgets.QComboBox()
+        combo_operator.setEditable(False)
+        h_layout.addWidget(combo_operator)
+
+        operator_map = {}
+
+        if condition_class in ('filename', 'dir'):
+            operator_map = {
+                'contains': 'contains',
+                'starts with': 'startswith',
+                'ends with': 'endswith',
+                'matches (RegEx)': 'matches'
+            }
+
+            label.setText('Filename' if condition_class == 'filename' else 'Directory name')
+            combo_operator.addItems(list(operator_map.keys()))
+            control = QtWidgets.QLineEdit()
+            h_layout.addWidget(control)
+
+        elif condition_class == 'type':
+            label.setText('Path is a ')
+            control = QtWidgets.QComboBox()
+            control.setEditable(False)
+            control.addItems(['file', 'folder'])
+            h_layout.addWidget(control)
+            h_layout.removeWidget(combo_operator)
+
+        elif condition_class in ('created', 'modified'):
+            operator_map = {
+                'less than': '<',
+                'more than': '>',
+                'equals': '=',
+                'less or equal': '<=',
+                'more or equal': '>=',
+                'not': '!='
+            }
+
+            label.setText('Date created is' if condition_class == 'created' else 'Date modified is')
+            combo_operator.addItems(list(operator_map.keys()))
+            control = QtWidgets.QComboBox()
+            control.setEditable(True)
+            control.addItems(['today', 'yesterday', 'tomorrow'])
+            control.setCurrentText('')
+            h_layout.addWidget(control)
+
+        elif condition_class == 'size':
+            operator_map = {
+                'less than': '<',
+                'more than': '>',
+                'equals': '=',
+                'less or equal': '<=',
+                'more or equal': '>=',
+                'not': '!='
+            }
+
+            unit_map = {
+                'Bytes': '',
+                'Kilobytes': 'K',
+                'Megabytes': 'M',
+                'Gigabytes': 'G',
+                'Terabytes': 'T'
+            }
+
+            label.setText('Filesize is')
+            combo_operator.addItems(list(operator_map.keys()))
+            control = QtWidgets.QSpinBox()
+            control.setRange(1, 9999999)
+            h_layout.addWidget(control)
+            combo_unit = QtWidgets.QComboBox()
+            combo_unit.setEditable(False)
+            combo_unit.addItems(list(unit_map.keys()))
+            h_layout.addWidget(combo_unit)
+
+        button_box = QtWidgets.QDialogButtonBox()
+        button_box.setStandardButtons(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        button_box.connect(QtCore.SIGNAL('accepted()'), dlg.accept)
+        button_box.connect(QtCore.SIGNAL('rejected()'), dlg.reject)
+
+        dlg.layout().addLayout(h_layout)
+        dlg.layout().addWidget(button_box)
+        if dlg.exec_() == QtWidgets.QDialog.Rejected:
+            return
+
+        # Add list item
+        if condition_class in ('filename', 'dir'):
+            text = control.text()
+
+            if combo_operator.currentText() == 'matches (RegEx)':
+                text = re.compile(text)
+
+            label = '%s %s "%s"' % ('Filename' if condition_class == 'filename' else 'Directory name',
+                                    combo_operator.currentText(), control.text())
+            data = ['filename' if condition_class == 'filename' else 'filedir',
+                    operator_map[combo_operator.currentText()], control.text(), label]
+            item = QtWidgets.QListWidgetItem()
+            item.setData(QtCore.Qt.UserRole, data)
+            item.setText(label)
+            self.list_widget.add_item(item)
+
+        elif condition_class == 'type':
+            label = 'Path is a %s' % control.currentText()
+            data = ['type', '=', control.currentText(), label]
+            item = QtWidgets.QListWidgetItem()
+            item.setData(QtCore.Qt.UserRole, data)
+            item.setText(label)
+            self.list_widget.add_item(item)
+
+        elif condition_class in ('created', 'modified'):
+            label = '%s %s "%s"' % ('Date created' if condition_class == 'created' else 'Date modified',
+                                    combo_operator.currentText(), control.currentText())
+            data = ['date_created' if condition_class == 'created' else 'date_modified', combo_operator.currentText(),
+                    control.currentText(), label]
+            item = QtWidgets.QListWidgetItem()
+            item.setData(QtCore.Qt.UserRole, data)
+            item.setText(label)
+            self.list_widget.add_item(item)
+
+        elif condition_class == 'size':
+            label = 'File size %s %s %s' % (combo_operator.currentText(), control.text(), combo_unit.currentText())
+            data = ['file_size', combo_operator.currentText(), control.text() + combo_unit.currentText(), label]
+            item = QtWidgets.QListWidgetItem()
+            item.setData(QtCore.Qt.UserRole, data)
+            item.setText(label)
+            self.list_widget.add_item(item)
+
+    def apply_ui_data(self):
+        conditions = []
+        for n in range(0, self.list_widget.get_list().count()):
+            item = self.list_widget.get_list().item(n)
+            conditions.append(item.data(QtCore.Qt.UserRole))
+
+        self.node.property('filter').set_value(conditions)
+
+    def load_ui_data(self):
+        for data in self.node.property('filter').value():
+            item = QtWidgets.QListWidgetItem(data[3])
+            item.setData(QtCore.Qt.UserRole, data)
+            self.list_widget.add_item(item)
+
+    def get_ui(self, node_widget: AxNodeWidget) -> QtWidgets.QWidget:
+        self.list_widget = AxListWidget(show_edit_button=False)
+        self.list_widget.list_changed.connect(node_widget.modified)
+        btn_add_cond = QtWidgets.QPushButton()
+        btn_add_cond.setObjectName('ax_toolbar_pushbutton')
+        mnu_cond = QtWidgets.QMenu(btn_add_cond)
+
+        action_add_filename = QtWidgets.QAction('Filter by filename', mnu_cond)
+        action_add_filename.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('filename'))
+        action_add_dir = QtWidgets.QAction('Filter by directory', mnu_cond)
+        action_add_dir.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('dir'))
+        action_add_type = QtWidgets.QAction('Filter by file type', mnu_cond)
+        action_add_type.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('type'))
+        action_add_created = QtWidgets.QAction('Filter by date created', mnu_cond)
+        action_add_created.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('created'))
+        action_add_modified = QtWidgets.QAction('Filter by date modified', mnu_cond)
+        action_add_modified.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('modified'))
+        action_add_size = QtWidgets.QAction('Filter by file size', mnu_cond)
+        action_add_size.connect(QtCore.SIGNAL('triggered()'), lambda: self.show_add_condition_dialog('size'))
+        mnu_cond.addAction(action_add_filename)
+        mnu_cond.addAction(action_add_dir)
+        mnu_cond.addAction(action_add_type)
+        mnu_cond.addAction(action_add_created)
+        mnu_cond.addAction(action_add_modified)
+        mnu_cond.addAction(action_add_size)
+
+        btn_add_cond.setIconSize(QtCore.QSize(20, 20))
+        btn_add_cond.setFlat(True)
+        btn_add_cond.setMenu(mnu_cond)
+        btn_add_cond.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-file-50.png')))
+
+        self.list_widget.add_toolbar_widget(btn_add_cond)
+
+        return self.list_widget
+
+
+class FSRenameNodeUI(NodeUIAdapter):
+
+    def show_add_replace_dialog(self):
+        dlg = QtWidgets.QDialog()
+        dlg.setWindowTitle('Add string to replace')
+        dlg.setLayout(QtWidgets.QVBoxLayout())
+
+        form_layout = QtWidgets.QFormLayout()
+        line_search = QtWidgets.QLineEdit()
+        line_replace = QtWidgets.QLineEdit()
+
+        form_layout.addRow('Search', line_search)
+        form_layout.addRow('Replace', line_replace)
+        btn_box = QtWidgets.QDialogButtonBox()
+        btn_box.setStandardButtons(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        btn_box.connect(QtCore.SIGNAL('accepted()'), dlg.accept)
+        btn_box.connect(QtCore.SIGNAL('rejected()'), dlg.reject)
+        dlg.layout().addLayout(form_layout)
+        dlg.layout().addWidget(btn_box)
+
+        result = dlg.exec_()
+
+        if result == QtWidgets.QDialog.Accepted:
+            item = QtWidgets.QListWidgetItem()
+            item.setData(QtCore.Qt.UserRole, [line_search.text(), line_replace.text()])
+            item.setText('{} -> {}'.format(line_search.text(), line_replace.text()))
+            self.replace_list.add_item(item)
+
+    def get_ui(self, node_widget: AxNodeWidget) -> QtWidgets.QWidget:
+
+        def toggle_children(parent: QtWidgets.QWidget, state: bool):
+            for child in parent.children():
+                if isinstance(child, QtWidgets.QWidget):
+                    child.setEnabled(state)
+
+        def append_to_rename(txt: str):
+            self.line_target_name.setText(self.line_target_name.text() + txt)
+
+        widget = QtWidgets.QWidget()
+        widget.setLayout(QtWidgets.QVBoxLayout())
+
+        variables = {
+            'File basename': '{file.basename}',
+            'File extension': '{file.extension}',
+            'File path': '{file.path}',
+        }
+
+        # Rename
+        self.group_rename = QtWidgets.QGroupBox()
+        self.group_rename.setTitle('Rename')
+        self.group_rename.setCheckable(True)
+        self.group_rename.setChecked(True)
+        self.group_rename.connect(QtCore.SIGNAL('toggled(bool)'), lambda on: toggle_children(self.group_rename, on))
+        self.group_rename.setLayout(QtWidgets.QVBoxLayout())
+
+        ctx_target_name = QtWidgets.QMenu()
+        for lbl, var in variables.items():
+            action = QtWidgets.QAction(ctx_target_name)
+            action.setText(lbl)
+            action.connect(QtCore.SIGNAL('triggered()'), lambda var=var: append_to_rename(var))
+            ctx_target_name.addAction(action)
+
+        self.line_target_name = QtWidgets.QLineEdit()
+        self.line_target_name.connect(QtCore.SIGNAL('textChanged(QString)'), lambda s: node_widget.modified)
+        self.line_target_name.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.line_target_name.connect(QtCore.SIGNAL('customContextMenuRequested(QPoint)'),
+                                      lambda pos: ctx_target_name.exec_(self.line_target_name.mapToGlobal(pos)))
+
+        rename_text = QtWidgets.QLabel('The new name will be applied to the whole path (so if you change the ' + \
+                                       'directory part <strong>the files will be moved</strong>). There are a number ' + \
+                                       'of variables available, take a look at the context menu for a list.')
+        rename_text.setWordWrap(True)
+        self.group_rename.layout().addWidget(rename_text)
+        self.group_rename.layout().addWidget(self.line_target_name)
+
+        # Replace
+        self.group_replace = QtWidgets.QGroupBox()
+        self.group_replace.setTitle('Replace')
+        self.group_replace.setCheckable(True)
+        self.group_replace.setChecked(False)
+        self.group_replace.connect(QtCore.SIGNAL('toggled(bool)'), lambda on: toggle_children(self.group_replace, on))
+        self.group_replace.setLayout(QtWidgets.QVBoxLayout())
+
+        self.replace_list = AxListWidget(show_edit_button=False)
+        self.replace_list.list_changed.connect(node_widget.modified)
+        self.replace_list.layout().setContentsMargins(0, 0, 0, 0)
+        action_add = QtWidgets.QAction('Add replacement rule', self.replace_list.get_toolbar())
+        action_add.connect(QtCore.SIGNAL('triggered()'), self.show_add_replace_dialog)
+        action_add.setIcon(QtGui.QIcon(assets.get_asset('icons8-add-text-50.png')))
+        self.replace_list.add_toolbar_action(action_add)
+        self.group_replace.layout().addWidget(self.replace_list)
+        toggle_children(self.replace_list, False)
+
+        self.check_dry = QtWidgets.QCheckBox()
+        self.check_dry.setText('Dry run')
+
+        widget.layout().addWidget(self.group_rename)
+        widget.layout().addWidget(self.group_replace)
+        widget.layout().addWidget(self.check_dry)
+
+        return widget
+
+    def apply_ui_data(self):
+
+        if self.group_rename.isChecked():
+            self.node.property('name').set_value(self.line_target_name.text())
+
+        if self.group_replace.isChecked():
+
+            repl_list = {}
+            for n in range(0, self.replace_list.get_list().count()):
+                item = self.replace_list.get_list().item(n)
+                data = item.data(QtCore.Qt.UserRole)
+                assert isinstance(data, list)
+
+                repl_list[data[0]] = data[1]
+
+            self.node.property('replace').set_value(repl_list)
+
+        self.node.property('dry').set_value(self.check_dry.isChecked())
+
+    def load_ui_data(self):
+        self.group_rename.setChecked(self.node.property('name').value() != '')
+        self.group_replace.setChecked(len(self.node.property('replace').value()) > 0)
+        self.check_dry.setChecked(self.node.property('dry').value())
+        self.line_target_name.setText(self.node.property('name').value())
+
+        for find, repl in self.node.property('replace').value().items():
+            item = QtWidgets.QListWidgetItem()
+            item.setText('%s -> %s' % (find, repl))
+            item.setData(QtCore.Qt.UserRole, [find, repl])
+            self.replace_list.add_item(item)
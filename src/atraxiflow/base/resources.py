@@ -4,7 +4,10 @@
 # Copyright (C) 2019  Sean Mertiens
 # For more information on licensing see LICENSE file
 #
+import errno
+import mmap
 import os
+import stat
 from datetime import datetime
 
 from atraxiflow.core import Resource
@@ -13,15 +16,87 @@ from atraxiflow.core import Resource
 class TextResource(Resource):
     '''
     A resource holding a text
+
+    Resources created with :py:meth:`from_file` map the file into memory instead of reading it. The text is
+    decoded each time :py:meth:`get_value` is called, consumers able to work on bytes can use
+    :py:meth:`get_buffer` instead.
     '''
 
     def __init__(self, value: str):
         self._value = value
+        self._buffer = None
+        self._filename = None
+        self._encoding = None
         self.id = '%s.%s' % ('atraxiflow', self.__class__.__name__)
 
+    @staticmethod
+    def from_file(filename: str, encoding: str = 'utf-8') -> 'TextResource':
+        '''
+        Creates a resource backed by a read-only memory map of the file
+
+        :param str filename: The file to map
+        :param str encoding: The encoding of the file
+        :return: The new resource
+        '''
+        res = TextResource(None)
+        res._filename = filename
+        res._encoding = encoding
+        res._map()
+
+        return res
+
+    def _map(self):
+        with open(self._filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # empty files can't be mapped
+                self._buffer = b''
+            else:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_value(self) -> str:
+        if self._buffer is not None:
+            return str(self._buffer, self._encoding)
+
+        return self._value
+
+    def get_buffer(self):
+        '''
+        Returns the encoded text of memory-mapped resources
+
+        :return: A bytes-like object or None, if the resource holds a str
+        '''
+        return self._buffer
+
+    def get_encoding(self) -> str:
+        '''
+
+        :return: The encoding of the buffer or None, if the resource holds a str
+        '''
+        return self._encoding
+
+    def __getstate__(self):
+        # memory maps can't be pickled, the file is mapped again instead
+        state = self.__dict__.copy()
+        state['_buffer'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        if self._filename is not None:
+            self._map()
+
     def __str__(self):
         show_chars = 60
 
+        if self._buffer is not None:
+            # decode only the beginning, a character takes at most 4 bytes
+            value = str(self._buffer[:show_chars * 4], self._encoding, 'ignore')[:show_chars]
+            if len(self._buffer) > len(value.encode(self._encoding)):
+                return value + '... (%s bytes)' % len(self._buffer)
+
+            return value
+
         if len(self._value) > show_chars:
             return self._value[:show_chars] + '... (%s more)' % (len(self._value) - show_chars)
         else:
@@ -31,12 +106,137 @@ class TextResource(Resource):
         return self.__str__()
 
 
+class CommandResource(Resource):
+    """
+    The result of a command run by ShellExecNode for an input resource
+    """
+
+    def __init__(self, cmd: str = '', exit_code: int = 0, stdout: str = '', stderr: str = '',
+                 resource: Resource = None):
+        self.id = '%s.%s' % ('atraxiflow', self.__class__.__name__)
+        self._cmd = cmd
+        self._exit_code = exit_code
+        self._stdout = stdout
+        self._stderr = stderr
+        self._resource = resource
+
+    def get_value(self) -> str:
+        return self._stdout
+
+    def get_command(self) -> str:
+        return self._cmd
+
+    def get_exit_code(self) -> int:
+        return self._exit_code
+
+    def get_stdout(self) -> str:
+        return self._stdout
+
+    def get_stderr(self) -> str:
+        return self._stderr
+
+    def get_resource(self) -> Resource:
+        """
+
+        :return: The resource the command was run for
+        """
+        return self._resource
+
+    def __str__(self):
+        return '{0} (exit code {1})'.format(self._cmd, self._exit_code)
+
+    def __repr__(self):
+        return self.__str__()
+
+
 class FilesystemResource(Resource):
+    """
+    A resource pointing to a file or folder.
+
+    File information (type, size, dates) is read with a single stat call when it is first requested and
+    cached afterwards. Call :py:meth:`invalidate` after changing the file on disk to read it again.
+    """
 
     def __init__(self, new_path: str = ''):
         self.id = '%s.%s' % ('atraxiflow', self.__class__.__name__)
         self.path = new_path
 
+    @staticmethod
+    def from_dir_entry(entry: 'os.DirEntry') -> 'FilesystemResource':
+        """
+        Creates a new resource from a directory entry returned by os.scandir(), reusing the file
+        information the entry already holds.
+
+        :param os.DirEntry entry: The directory entry
+        :return: The new resource
+        """
+        res = FilesystemResource(entry.path)
+
+        try:
+            res._lstat = entry.stat(follow_symlinks=False)
+
+            if entry.is_symlink():
+                res._stat = entry.stat()
+            else:
+                res._stat = res._lstat
+        except OSError:
+            res._stat = None
+
+        res._stat_loaded = True
+        return res
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, new_path: str):
+        self._path = new_path
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drops the cached file information, so it will be read again on next access.
+        """
+        self._stat = None
+        self._lstat = None
+        self._stat_loaded = False
+        self._realpath = None
+
+    def _load_stat(self):
+        if self._stat_loaded:
+            return
+
+        try:
+            self._lstat = os.lstat(self.path)
+        except (OSError, ValueError):
+            self._lstat = None
+
+        if self._lstat is not None and stat.S_ISLNK(self._lstat.st_mode):
+            try:
+                self._stat = os.stat(self.path)
+            except (OSError, ValueError):
+                # broken link
+                self._stat = None
+        else:
+            self._stat = self._lstat
+
+        self._stat_loaded = True
+
+    def get_stat(self) -> os.stat_result:
+        """
+        Returns the cached result of os.stat() for this path.
+
+        :return: The file information
+        :raises FileNotFoundError: If the path does not exist
+        """
+        self._load_stat()
+
+        if self._stat is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.path)
+
+        return self._stat
+
     def __str__(self):
         return self.path
 
@@ -47,16 +247,20 @@ class FilesystemResource(Resource):
         return self.path
 
     def exists(self) -> bool:
-        return os.path.exists(self.path)
+        self._load_stat()
+        return self._stat is not None
 
     def is_file(self) -> bool:
-        return os.path.isfile(self.path)
+        self._load_stat()
+        return self._stat is not None and stat.S_ISREG(self._stat.st_mode)
 
     def is_folder(self) -> bool:
-        return os.path.isdir(self.path)
+        self._load_stat()
+        return self._stat is not None and stat.S_ISDIR(self._stat.st_mode)
 
     def is_symlink(self) -> bool:
-        return os.path.islink(self.path)
+        self._load_stat()
+        return self._lstat is not None and stat.S_ISLNK(self._lstat.st_mode)
 
     def get_filename(self) -> str:
         return os.path.basename(self.path)
@@ -74,19 +278,22 @@ class FilesystemResource(Resource):
         return os.path.dirname(self.path)
 
     def get_absolute_path(self) -> str:
-        return os.path.realpath(self.path)
+        if self._realpath is None:
+            self._realpath = os.path.realpath(self.path)
+
+        return self._realpath
 
     def get_basename(self) -> str:
         return os.path.splitext(self.get_filename())[0]
 
     def get_filesize(self) -> int:
-        return os.path.getsize(self.path)
+        return self.get_stat().st_size
 
     def get_last_modified(self) -> datetime:
-        return datetime.fromtimestamp(os.path.getmtime(self.path))
+        return datetime.fromtimestamp(self.get_stat().st_mtime)
 
     def get_last_accessed(self) -> datetime:
-        return datetime.fromtimestamp(os.path.getatime(self.path))
+        return datetime.fromtimestamp(self.get_stat().st_atime)
 
     def get_created(self) -> datetime:
-        return datetime.fromtimestamp(os.path.getctime(self.path))
+        return datetime.fromtimestamp(self.get_stat().st_ctime)
@@ -0,0 +1,234 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+import collections
+import concurrent.futures
+import fnmatch
+import os
+import re
+from typing import Iterator, List
+
+from atraxiflow.base.resources import FilesystemResource
+
+__all__ = ['DirectoryScanner']
+
+
+class DirectoryScanner:
+    """
+    Finds files and folders matching a glob pattern using os.scandir().
+
+    Patterns support the usual wildcards (\\*, ?, [...]) and \\*\\* to match any number of directories.
+    Only directories that can still lead to a match are descended into. As with glob, wildcards do not
+    match names starting with a period, unless the pattern does.
+
+    .. code-block:: python
+
+        scanner = DirectoryScanner(exclude=['.git', '*.tmp'], max_depth=3)
+        for res in scanner.scan('/home/user/documents/**/*.txt'):
+            print(res.get_absolute_path())
+    """
+
+    def __init__(self, exclude: List[str] = None, max_depth: int = -1, follow_symlinks: bool = False,
+                 threads: int = 1):
+        """
+
+        :param list exclude: Glob patterns for names or paths (relative to the first directory containing a
+                             wildcard) to skip. Excluded directories are not descended into.
+        :param int max_depth: Maximum number of directory levels to descend into (-1: no limit)
+        :param bool follow_symlinks: If True, symlinks to directories are descended into
+        :param int threads: Number of threads scanning directories in parallel
+        """
+        self._exclude = [self._compile(pattern) for pattern in (exclude if exclude is not None else [])]
+        self._max_depth = max_depth
+        self._follow_symlinks = follow_symlinks
+        self._threads = max(1, threads)
+
+    @staticmethod
+    def _compile(pattern: str):
+        flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+        return re.compile(fnmatch.translate(pattern), flags)
+
+    @staticmethod
+    def _has_magic(segment: str) -> bool:
+        return re.search(r'[*?\[]', segment) is not None
+
+    def _split_pattern(self, pattern: str):
+        """
+        Splits a pattern into the directory to start scanning at and the remaining segments.
+        """
+        pattern = os.path.normpath(pattern)
+        drive, rest = os.path.splitdrive(pattern)
+        segments = re.split(r'[\\/]+' if os.sep == '\\' else r'/+', rest)
+
+        root_parts = []
+        while len(segments) > 0 and not self._has_magic(segments[0]):
+            root_parts.append(segments.pop(0))
+
+        root = drive + os.sep.join(root_parts)
+        if root == drive and rest.startswith(os.sep):
+            root = drive + os.sep
+        elif root == '':
+            root = os.curdir
+
+        compiled = []
+        for segment in segments:
+            if segment == '**':
+                compiled.append(None)
+            else:
+                compiled.append((self._compile(segment), segment.startswith('.')))
+
+        return os.path.realpath(root), compiled
+
+    @staticmethod
+    def _closure(segments: list, states: set) -> frozenset:
+        # "**" may match zero directories, so the following segment is active as well
+        result = set(states)
+        pending = list(states)
+
+        while len(pending) > 0:
+            i = pending.pop()
+            if i < len(segments) and segments[i] is None and i + 1 not in result:
+                result.add(i + 1)
+                pending.append(i + 1)
+
+        return frozenset(result)
+
+    def _advance(self, segments: list, states: frozenset, name: str) -> frozenset:
+        hidden = name.startswith('.')
+        next_states = set()
+
+        for i in states:
+            if i >= len(segments):
+                continue
+
+            if segments[i] is None:
+                if not hidden:
+                    next_states.add(i)
+            else:
+                regex, allow_hidden = segments[i]
+                if (allow_hidden or not hidden) and regex.match(name):
+                    next_states.add(i + 1)
+
+        return self._closure(segments, next_states)
+
+    def _is_excluded(self, name: str, rel_path: str) -> bool:
+        for regex in self._exclude:
+            if regex.match(name) or regex.match(rel_path):
+                return True
+
+        return False
+
+    def _scan_dir(self, segments: list, path: str, rel_path: str, states: frozenset, depth: int):
+        """
+        Scans a single directory.
+
+        :return: A list of matching resources and a list of subdirectories to scan next
+        """
+        matches = []
+        subdirs = []
+
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return matches, subdirs
+
+        for entry in entries:
+            entry_rel_path = entry.name if rel_path == '' else rel_path + '/' + entry.name
+
+            if self._is_excluded(entry.name, entry_rel_path):
+                continue
+
+            entry_states = self._advance(segments, states, entry.name)
+            if len(entry_states) == 0:
+                continue
+
+            if len(segments) in entry_states:
+                matches.append(FilesystemResource.from_dir_entry(entry))
+
+            if self._max_depth >= 0 and depth + 1 > self._max_depth:
+                continue
+
+            # descend only if there are segments left to match
+            if any(i < len(segments) for i in entry_states):
+                try:
+                    if entry.is_dir(follow_symlinks=self._follow_symlinks):
+                        subdirs.append((entry.path, entry_rel_path, entry_states, depth + 1))
+                except OSError:
+                    pass
+
+        return matches, subdirs
+
+    def _dir_key(self, path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        return st.st_dev, st.st_ino
+
+    def scan(self, pattern: str) -> Iterator[FilesystemResource]:
+        """
+        Yields all files and folders matching the pattern
+
+        :param str pattern: A path, optionally containing wildcards
+        :return: An iterator over the matching resources
+        """
+        root, segments = self._split_pattern(pattern)
+
+        if not os.path.lexists(root):
+            return
+
+        states = self._closure(segments, {0})
+
+        if len(segments) in states:
+            yield FilesystemResource(root)
+
+        if len(segments) == 0 or not os.path.isdir(root):
+            return
+
+        visited = set()
+
+        def should_visit(path: str) -> bool:
+            if not self._follow_symlinks:
+                return True
+
+            # prevent endless loops caused by symlinks
+            key = self._dir_key(path)
+            if key is None or key in visited:
+                return False
+
+            visited.add(key)
+            return True
+
+        should_visit(root)
+        todo = collections.deque([(root, '', states, 0)])
+
+        if self._threads == 1:
+            while len(todo) > 0:
+                matches, subdirs = self._scan_dir(segments, *todo.popleft())
+
+                for res in matches:
+                    yield res
+
+                todo.extend([subdir for subdir in subdirs if should_visit(subdir[0])])
+
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._threads) as pool:
+            running = {pool.submit(self._scan_dir, segments, *todo.popleft())}
+
+            while len(running) > 0:
+                done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    matches, subdirs = future.result()
+
+                    for subdir in subdirs:
+                        if should_visit(subdir[0]):
+                            running.add(pool.submit(self._scan_dir, segments, *subdir))
+
+                    for res in matches:
+                        yield res
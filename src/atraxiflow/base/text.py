@@ -4,34 +4,138 @@
 # Copyright (C) 2019  Sean Mertiens
 # For more information on licensing see LICENSE file
 #
+import codecs
+import collections
+import concurrent.futures
+import functools
+import gzip
+import itertools
+import locale
+import os
 import re
+import shutil
+from typing import Dict, List
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 from atraxiflow.base.resources import TextResource
 from atraxiflow.core import *
+from atraxiflow.exceptions import FilesystemException, ValueException
 from atraxiflow.properties import *
 
+# parts of regular expressions that may match differently on encoded bytes: any character, classes and escapes
+# like \w or \b
+_BYTES_UNSAFE_SYNTAX = re.compile(r'[.\[]|\\[A-Za-z]')
+
 
 class TextFileInputNode(Node):
     """
     @Name: Load textfile
     """
 
+    SPLIT_FILE = 'file'
+    SPLIT_LINES = 'lines'
+    SPLIT_BYTES = 'bytes'
+
     def __init__(self, properties: dict = None):
         node_properties = {
             'filename': Property(expected_type=str, required=True, label='Filename', hint='The filename to read from',
-                                 display_options={'role': 'file'})
+                                 display_options={'role': 'file'}),
+            'split': Property(expected_type=str, required=False, default=self.SPLIT_FILE, label='Split into',
+                              hint='file: one resource for the whole file, lines: one resource per chunk_size lines '
+                                   '(without the last line break), bytes: one resource per chunk_size bytes'),
+            'chunk_size': Property(expected_type=int, required=False, default=1, label='Chunk size',
+                                   hint='Number of lines or bytes per resource'),
+            'encoding': Property(expected_type=str, required=False, default='', label='Encoding',
+                                 hint='The encoding of the file (empty: system default)'),
+            'buffering': Property(expected_type=int, required=False, default=-1, label='Buffer size',
+                                  hint='Size of the read buffer in bytes (-1: system default, 0: unbuffered, only '
+                                       'when splitting into bytes)'),
+            'mmap': Property(expected_type=bool, required=False, default=False, label='Memory-map file',
+                             hint='Maps the file into memory instead of reading it. The text is decoded only when '
+                                  'needed, simple regular expressions are matched against the bytes if that gives '
+                                  'the same result. Used if the file is not split.')
         }
         super().__init__(node_properties, properties)
 
-    def run(self, ctx: WorkflowContext):
-        super().run(ctx)
+    def _get_encoding(self) -> str:
+        if self.property('encoding').value() == '':
+            return locale.getpreferredencoding(False)
+
+        return self.property('encoding').value()
+
+    def _read_lines(self, f, chunk_size: int):
+        lines = []
+
+        for line in f:
+            lines.append(line[:-1] if line.endswith('\n') else line)
+
+            if len(lines) == chunk_size:
+                yield TextResource('\n'.join(lines))
+                lines = []
+
+        if len(lines) > 0:
+            yield TextResource('\n'.join(lines))
+
+    def _read_bytes(self, f, chunk_size: int):
+        # multibyte characters may be split between chunks, the decoder keeps the incomplete bytes
+        decoder = codecs.getincrementaldecoder(self._get_encoding())()
+
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            text = decoder.decode(chunk)
+            if text != '':
+                yield TextResource(text)
+
+        text = decoder.decode(b'', final=True)
+        if text != '':
+            yield TextResource(text)
+
+    def stream(self, ctx: WorkflowContext):
+        filename = self.property('filename').value()
+        split = self.property('split').value()
+        chunk_size = max(1, self.property('chunk_size').value())
+        buffering = self.property('buffering').value()
+
+        if split not in (self.SPLIT_FILE, self.SPLIT_LINES, self.SPLIT_BYTES):
+            ctx.get_logger().error('Unknown split mode "{0}"'.format(split))
+            raise ValueException('Unknown split mode "{0}"'.format(split))
+
+        if buffering == 0 and split != self.SPLIT_BYTES:
+            # text files can't be read unbuffered
+            ctx.get_logger().error('Buffer size 0 is only supported when splitting into bytes')
+            raise ValueException('Buffer size 0 is only supported when splitting into bytes')
 
         try:
-            with open(self.property('filename').value(), 'r') as f:
-                self.output.add(TextResource(f.read()))
+            if split == self.SPLIT_FILE and self.property('mmap').value() is True:
+                yield TextResource.from_file(filename, self._get_encoding())
+                return
 
+            if split == self.SPLIT_BYTES:
+                f = open(filename, 'rb', buffering=buffering)
+            else:
+                f = open(filename, 'r', buffering=buffering, encoding=self._get_encoding())
         except IOError:
-            ctx.get_logger().error('Could not open file "{0}"'.format(self.property('filename').value()))
+            ctx.get_logger().error('Could not open file "{0}"'.format(filename))
+            raise FilesystemException('Could not open file "{0}"'.format(filename))
+
+        with f:
+            if split == self.SPLIT_FILE:
+                yield TextResource(f.read())
+            elif split == self.SPLIT_LINES:
+                yield from self._read_lines(f, chunk_size)
+            else:
+                yield from self._read_bytes(f, chunk_size)
+
+    def run(self, ctx: WorkflowContext):
+        super().run(ctx)
+
+        try:
+            for res in self.stream(ctx):
+                self.output.add(res)
+        except (FilesystemException, ValueException):
             return False
 
         return True
@@ -42,33 +146,152 @@ class TextFileOutputNode(Node):
     @Name: Write to textfile
     """
 
+    COMPRESSION_NONE = ''
+    COMPRESSION_GZIP = 'gzip'
+    COMPRESSION_ZSTD = 'zstd'
+
     def __init__(self, properties: dict = None):
         node_properties = {
             'filename': Property(expected_type=str, label='Filename', required=True, hint='The filename to write to',
                                  display_options={'role': 'file', 'role_file_mode': 'save_file'}),
             'newline_per_res': Property(expected_type=bool, label='Newline after each resource', required=False,
                                         default=True,
-                                        hint='When writing multiple resources, a newline will be added after each resources output')
+                                        hint='When writing multiple resources, a newline will be added after each resources output'),
+            'append': Property(expected_type=bool, label='Append', required=False, default=False,
+                               hint='Appends to the file instead of replacing it'),
+            'atomic': Property(expected_type=bool, label='Atomic write', required=False, default=False,
+                               hint='Writes to a temporary file that replaces the file when all resources have '
+                                    'been written'),
+            'compression': Property(expected_type=str, label='Compression', required=False,
+                                    default=self.COMPRESSION_NONE,
+                                    hint='Compresses the file (empty, gzip or zstd). zstd requires the zstandard '
+                                         'package.'),
+            'encoding': Property(expected_type=str, required=False, default='', label='Encoding',
+                                 hint='The encoding of the file (empty: system default)'),
+            'buffer_size': Property(expected_type=int, label='Buffer size', required=False, default=1024 * 1024,
+                                    hint='Number of characters to collect before writing them to the file')
         }
         super().__init__(node_properties, properties)
 
-    def run(self, ctx: WorkflowContext):
-        super().run(ctx)
-        try:
-            with open(self.property('filename').value(), 'w') as f:
-                resources = self.get_input().find('atraxiflow.TextResource')
+    def _open(self, filename: str, mode: str):
+        encoding = None if self.property('encoding').value() == '' else self.property('encoding').value()
+        compression = self.property('compression').value()
 
-                for res in resources:
-                    f.write(res.get_value())
-                    if self.property('newline_per_res').value() is True:
-                        f.write('\n')
+        if compression == self.COMPRESSION_GZIP:
+            return gzip.open(filename, mode + 't', encoding=encoding)
+        elif compression == self.COMPRESSION_ZSTD:
+            return zstandard.open(filename, mode + 't', encoding=encoding)
 
-        except IOError:
-            ctx.get_logger().error('Could not open file "{0}"'.format(self.property('filename').value()))
+        return open(filename, mode, encoding=encoding)
+
+    def _get_temp_name(self, filename: str) -> str:
+        n = 0
+        while True:
+            temp = os.path.join(os.path.dirname(filename), '.{0}.{1}.tmp'.format(os.path.basename(filename), n))
+
+            try:
+                # the file is created with the default permissions, unlike files created by tempfile
+                open(temp, 'xb').close()
+                return temp
+            except FileExistsError:
+                n += 1
+
+    def _write_buffered(self, f, resources):
+        newline = self.property('newline_per_res').value() is True
+        buffer_size = self.property('buffer_size').value()
+        buffer = []
+        buffered = 0
+
+        for res in resources:
+            value = res.get_value()
+            buffer.append(value)
+            buffered += len(value)
+
+            if newline:
+                buffer.append('\n')
+                buffered += 1
+
+            if buffered >= buffer_size:
+                f.write(''.join(buffer))
+                buffer = []
+                buffered = 0
+
+        if len(buffer) > 0:
+            f.write(''.join(buffer))
+
+    def _write(self, ctx: WorkflowContext, resources) -> bool:
+        filename = self.property('filename').value()
+        compression = self.property('compression').value()
+        mode = 'a' if self.property('append').value() is True else 'w'
+
+        if compression not in (self.COMPRESSION_NONE, self.COMPRESSION_GZIP, self.COMPRESSION_ZSTD):
+            ctx.get_logger().error('Unknown compression "{0}"'.format(compression))
+            return False
+
+        if compression == self.COMPRESSION_ZSTD and zstandard is None:
+            ctx.get_logger().error('zstd compression requires the zstandard package (pip install atraxi-flow[zstd])')
             return False
 
+        target = filename
+
+        try:
+            if self.property('atomic').value() is True:
+                target = self._get_temp_name(filename)
+
+                if os.path.exists(filename):
+                    shutil.copymode(filename, target)
+
+                    # compressed files can be appended to as well, they simply contain multiple frames
+                    if mode == 'a':
+                        shutil.copyfile(filename, target)
+
+            with self._open(target, mode) as f:
+                self._write_buffered(f, resources)
+
+        except Exception as e:
+            if target != filename:
+                os.unlink(target)
+
+            if isinstance(e, IOError):
+                ctx.get_logger().error('Could not open file "{0}"'.format(filename))
+                return False
+
+            raise
+
+        if target != filename:
+            os.replace(target, filename)
+
         return True
 
+    def stream(self, ctx: WorkflowContext):
+        if not self._write(ctx, self.get_input().stream('atraxiflow.TextResource')):
+            raise FilesystemException('Could not write file "{0}"'.format(self.property('filename').value()))
+
+        # like run(), this node has no output
+        yield from ()
+
+    def run(self, ctx: WorkflowContext):
+        super().run(ctx)
+        return self._write(ctx, self.get_input().find('atraxiflow.TextResource'))
+
+
+class ValidationRule:
+    """
+    A compiled rule of TextValidatorNode
+    """
+
+    def __init__(self, name: str, check, check_buffer=None):
+        """
+
+        :param str name: The name of the rule
+        :param callable check: A function taking the text, returning True if it is valid
+        :param callable check_buffer: A function taking the buffer and encoding of a memory-mapped resource, used
+                                      instead of check to avoid decoding the text
+        """
+        self.name = name
+        self.check = check
+        self.check_buffer = check_buffer
+
 
 class TextValidatorNode(Node):
     """
@@ -80,89 +303,261 @@ class TextValidatorNode(Node):
 
         node_properties = {
             'rules': Property(expected_type=dict, label='Rules', required=False, hint='A list of validation rules',
-                              default={})
+                              default={}),
+            'processes': Property(expected_type=int, label='Processes', required=False, default=1,
+                                  hint='Number of processes validating resources in parallel'),
+            'parallel_threshold': Property(expected_type=int, label='Parallel threshold', required=False,
+                                           default=10000,
+                                           hint='Smaller inputs are validated in a single process, since starting '
+                                                'the processes takes longer')
         }
 
         super().__init__(node_properties, properties)
+        self._failures = {}
+        self._quiet = False
 
-    def _rule_not_empty(self, text, params=None):
-        if text == '' or text is None:
-            return False
+    def _rule_error(self, msg: str):
+        # rules are compiled again in each worker process, the errors have been logged already
+        if not self._quiet:
+            self._ctx.get_logger().error(msg)
 
-        return True
+    def _compile_not_empty(self, params: dict) -> ValidationRule:
+        return ValidationRule('not_empty', lambda text: text != '' and text is not None,
+                              lambda buffer, encoding: len(buffer) > 0)
 
-    def _rule_min_len(self, text, params=None):
-        params = [] if params is None else params
+    def _compile_min_len(self, params: dict) -> ValidationRule:
         if not 'length' in params:
-            self._ctx.get_logger().error('Rule min_len: Missing parameter "length"')
-            return False
+            self._rule_error('Rule min_len: Missing parameter "length"')
+            return ValidationRule('min_len', lambda text: False)
 
         length = int(params['length'])
-        return len(text) >= length
+        return ValidationRule('min_len', lambda text: len(text) >= length)
 
-    def _rule_max_len(self, text, params=None):
-        params = [] if params is None else params
+    def _compile_max_len(self, params: dict) -> ValidationRule:
         if not 'length' in params:
-            self._ctx.get_logger().error('Rule max_len: Missing parameter "length"')
-            return False
+            self._rule_error('Rule max_len: Missing parameter "length"')
+            return ValidationRule('max_len', lambda text: False)
 
         length = int(params['length'])
-        return len(text) <= length
+        return ValidationRule('max_len', lambda text: len(text) <= length)
 
-    def _rule_regex(self, text, params=None):
-        params = [] if params is None else params
+    def _compile_regex(self, params: dict) -> ValidationRule:
         if not 'pattern' in params:
-            self._ctx.get_logger().error('Rule regex: Missing parameter "pattern"')
-            return False
+            self._rule_error('Rule regex: Missing parameter "pattern"')
+            return ValidationRule('regex', lambda text: False)
 
-        mode = ''
         pattern = params['pattern']
-        if not 'mode' in params:
-            mode = 'must_match'
-        else:
-            mode = params['mode']
+        mode = params['mode'] if 'mode' in params else 'must_match'
 
-        if mode == 'must_match':
-            if not re.match(pattern, text):
-                return False
-        elif mode == 'must_not_match':
-            if re.match(pattern, text):
-                return False
-        return True
+        if mode not in ('must_match', 'must_not_match'):
+            self._rule_error('Rule regex: Unknown mode "{0}"'.format(mode))
+            return ValidationRule('regex', lambda text: True)
+
+        regex = re.compile(pattern)
+        must_match = mode == 'must_match'
+        encoded = {}
+
+        def check_buffer(buffer, encoding: str) -> bool:
+            # search the memory-mapped bytes without decoding them
+            if encoding not in encoded:
+                encoded[encoding] = self._encode_pattern(regex, encoding)
+
+            if encoded[encoding] is None:
+                return (regex.match(str(buffer, encoding)) is not None) == must_match
+
+            return (encoded[encoding].match(buffer) is not None) == must_match
+
+        return ValidationRule('regex', lambda text: (regex.match(text) is not None) == must_match, check_buffer)
+
+    @staticmethod
+    def _encode_pattern(pattern, encoding: str):
+        """
+        Converts a pattern for matching bytes in the given encoding. This is only done if the pattern is known to
+        match the bytes like the decoded text: it consists of ASCII literals, anchors, groups and quantifiers only
+        (no ".", classes or escapes like \\w) without ignoring case, and the encoding is UTF-8 or an ASCII-based
+        single-byte encoding, so ASCII bytes always stand for ASCII characters.
+
+        :return: The pattern or None, if the bytes have to be decoded for matching
+        """
+        if not isinstance(pattern.pattern, str):
+            return pattern
+
+        if any(ord(c) > 127 for c in pattern.pattern) or _BYTES_UNSAFE_SYNTAX.search(pattern.pattern) or \
+                pattern.flags & re.IGNORECASE or not TextValidatorNode._is_ascii_safe_encoding(encoding):
+            return None
 
-    def _validate(self, text, rules):
-        '''
-        Validates the string using the given rule
+        # re.UNICODE is set for all str patterns, but can't be used with bytes
+        return re.compile(pattern.pattern.encode('ascii'), pattern.flags & ~re.UNICODE)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _is_ascii_safe_encoding(encoding: str) -> bool:
+        try:
+            info = codecs.lookup(encoding)
+        except LookupError:
+            return False
+
+        if info.name == 'utf-8':
+            # bytes of multibyte characters are never in the ASCII range
+            return True
+
+        if bytes(range(128)).decode(info.name, 'replace') != ''.join(chr(c) for c in range(128)):
+            return False
+
+        # in single-byte encodings every byte is a character on its own, while multibyte encodings (e.g.
+        # Shift JIS, which uses ASCII bytes in multibyte characters) wait for the next byte
+        decoder = info.incrementaldecoder('replace')
+        return all(decoder.decode(bytes([b])) != '' for b in range(256))
+
+    def compile_rules(self) -> List[ValidationRule]:
+        """
+        Compiles the node's rules
 
         Accepted rules are:
 
             not_empty
-            min_length - Takes one more item: length
-            max_length - Takes one more item: length
+            min_len - Takes one more item: length
+            max_len - Takes one more item: length
             regex - Takes two more items: pattern, mode (must_match, must_not_match)
 
-        :param text: str
-        :param rules: list
-        :return: boolean
-        '''
+        :return: A list of compiled rules
+        """
+        compiled = []
 
-        for rule, params in rules.items():
-            if not "_rule_{0}".format(rule) in dir(self):
-                self._ctx.get_logger().error('Unrecognized rule: "{0}"'.format(rule))
+        for rule, params in self.property('rules').value().items():
+            compile_rule = getattr(self, '_compile_{0}'.format(rule), None)
+
+            if compile_rule is None:
+                self._rule_error('Unrecognized rule: "{0}"'.format(rule))
+            else:
+                compiled.append(compile_rule({} if params is None else params))
+
+        return compiled
+
+    def _validate(self, res: TextResource, rules: List[ValidationRule]) -> bool:
+        """
+        Checks the resource against all rules and counts the failures per rule.
+        Memory-mapped resources are only decoded if a rule needs the text.
+        """
+        buffer = res.get_buffer()
+        text = None if buffer is not None else res.get_value()
+        valid = True
+
+        for rule in rules:
+            if buffer is not None and rule.check_buffer is not None:
+                rule_valid = rule.check_buffer(buffer, res.get_encoding())
             else:
-                f = getattr(self, "_rule_{0}".format(rule))
-                if f(text, params) is False:
-                    return False
+                if text is None:
+                    text = res.get_value()
 
-        return True
+                rule_valid = rule.check(text)
+
+            if not rule_valid:
+                self._failures[rule.name] += 1
+                valid = False
+
+        return valid
+
+    def _validate_serial(self, resources, rules: List[ValidationRule]):
+        for res in resources:
+            yield res, self._validate(res, rules)
+
+    def _validate_parallel(self, resources, rules: List[ValidationRule], processes: int):
+        threshold = self.property('parallel_threshold').value()
+        resources = iter(resources)
+        first = list(itertools.islice(resources, threshold))
+
+        if len(first) < threshold:
+            yield from self._validate_serial(first, rules)
+            return
+
+        resources = itertools.chain(first, resources)
+        shard_size = max(1, threshold // (processes * 4))
+        pending = collections.deque()
+
+        def merge(done_shard: list, future: concurrent.futures.Future):
+            failures, invalid = future.result()
+
+            for rule, count in failures.items():
+                self._failures[rule] += count
+
+            invalid = set(invalid)
+            for i, res in enumerate(done_shard):
+                yield res, i not in invalid
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as pool:
+            while True:
+                shard = list(itertools.islice(resources, shard_size))
+
+                if len(shard) == 0:
+                    break
+
+                pending.append((shard, pool.submit(_validate_shard, self.property('rules').value(), shard)))
+
+                # results are merged in input order, only a few shards are kept in memory
+                if len(pending) >= processes * 2:
+                    yield from merge(*pending.popleft())
+
+            while len(pending) > 0:
+                yield from merge(*pending.popleft())
+
+    def _validate_all(self, ctx: WorkflowContext, resources) -> bool:
+        self._ctx = ctx
+        rules = self.compile_rules()
+        self._failures = dict([(rule.name, 0) for rule in rules])
+        total = 0
+        failed = 0
+
+        processes = self.property('processes').value()
+        if processes > 1:
+            results = self._validate_parallel(resources, rules, processes)
+        else:
+            results = self._validate_serial(resources, rules)
+
+        for res, valid in results:
+            total += 1
+
+            if not valid:
+                failed += 1
+                ctx.get_logger().debug('Validation failed: {0}'.format(res))
+
+        for rule, count in self._failures.items():
+            if count > 0:
+                ctx.get_logger().error('Rule {0} failed for {1} of {2} resources'.format(rule, count, total))
+
+        return failed == 0
+
+    def get_failures(self) -> Dict[str, int]:
+        """
+        Returns the number of resources that failed each rule in the last run
+
+        :return: A dict with the rule names as keys
+        """
+        return self._failures
+
+    def stream(self, ctx: WorkflowContext):
+        if not self._validate_all(ctx, self.get_input().stream('atraxiflow.TextResource')):
+            raise ValueException('Validation failed')
+
+        # like run(), this node has no output
+        yield from ()
 
     def run(self, ctx: WorkflowContext):
         super().run(ctx)
-        self._ctx = ctx
-        resources = self.get_input().find('atraxiflow.TextResource')
+        return self._validate_all(ctx, self.get_input().find('atraxiflow.TextResource'))
 
-        for res in resources:
-            if not self._validate(res.get_value(), self.property('rules').value()):
-                return False
 
-        return True
+def _validate_shard(rules: dict, resources: list) -> tuple:
+    """
+    Validates a part of the input of a TextValidatorNode inside a worker process
+
+    :return: The failures per rule and the positions of the invalid resources
+    """
+    node = TextValidatorNode({'rules': rules})
+    node._quiet = True
+
+    compiled = node.compile_rules()
+    node._failures = dict([(rule.name, 0) for rule in compiled])
+    invalid = [i for i, res in enumerate(resources) if not node._validate(res, compiled)]
+
+    return node._failures, invalid
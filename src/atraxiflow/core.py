@@ -5,22 +5,29 @@
 # For more information on licensing see LICENSE file
 #
 
+import asyncio
+import concurrent.futures
+import copy
+import heapq
 import importlib
 import inspect
 import logging
+import os
 import pkgutil
-import re
-from typing import List, Any, Dict
-
-from PySide2 import QtWidgets
+import sys
+import threading
+from typing import List, Any, Dict, Iterator
 
 from atraxiflow.events import EventObject
 from atraxiflow.exceptions import *
 from atraxiflow.preferences import PreferencesProvider
+from atraxiflow.profiling import Measurement, measure
 from atraxiflow.properties import Property, MissingRequiredValue
+from atraxiflow.registry import get_registry
+from atraxiflow.template import Template
 
-__all__ = ['Node', 'Resource', 'Container', 'Workflow', 'WorkflowContext', 'get_node_info', 'run',
-           'MissingRequiredValue']
+__all__ = ['Node', 'NodeUIAdapter', 'Resource', 'Container', 'Workflow', 'WorkflowContext', 'get_node_info', 'run',
+           'run_concurrently', 'MissingRequiredValue']
 
 
 class Resource:
@@ -50,22 +57,77 @@ class Resource:
 class Container:
     """
     A container holds different resources and is used as the standard output of nodes.
-    The content of a container can be queried using :py:meth:`find`.
+    The content of a container can be queried using :py:meth:`find`. Resources are indexed by their id, so
+    queries only touch the matching resources.
+
+    Containers created with :py:meth:`from_iterable` pull their resources lazily from an iterator. Such a
+    container can be read item by item using :py:meth:`stream`, which does not keep the resources in memory.
+    All other methods will read the remaining resources from the iterator and store them in the container.
     """
 
     def __init__(self, *kwargs):
         self._items = []
+        # maps resource ids to the positions of the resources in self._items
+        self._index = {}
+        # caches the ids matching a wildcard query, cleared when a new id is added
+        self._query_cache = {}
+        self._source = None
 
         for item in kwargs:
-            self._items.append(item)
+            if isinstance(item, (list, tuple)):
+                for sub_item in item:
+                    self.add(sub_item)
+            else:
+                self.add(item)
+
+    @staticmethod
+    def from_iterable(iterable) -> 'Container':
+        """
+        Creates a container that lazily pulls its resources from the given iterable (e.g. a generator)
+
+        :param iterable: The iterable providing the resources
+        :return: The new container
+        """
+        container = Container()
+        container._source = iter(iterable)
+        return container
+
+    def is_streaming(self) -> bool:
+        """
+
+        :return: True if there are resources left that have not been pulled from the containers iterator
+        """
+        return self._source is not None
+
+    def _materialize(self):
+        if self._source is None:
+            return
+
+        source = self._source
+        self._source = None
+
+        for item in source:
+            self.add(item)
 
     def clear(self):
         self._items.clear()
+        self._index.clear()
+        self._query_cache.clear()
+        self._source = None
 
     def add(self, item: Resource):
+        positions = self._index.get(item.id)
+
+        if positions is None:
+            positions = []
+            self._index[item.id] = positions
+            self._query_cache.clear()
+
+        positions.append(len(self._items))
         self._items.append(item)
 
     def items(self) -> List[Resource]:
+        self._materialize()
         return self._items
 
     def first(self) -> Resource:
@@ -74,14 +136,55 @@ class Container:
 
         :return: The first item in the container
         """
+        self._materialize()
+
         if len(self._items) == 0:
             raise IndexError()
 
         return self._items[0]
 
     def size(self) -> int:
+        self._materialize()
         return len(self._items)
 
+    @staticmethod
+    def _matches(resource_id: str, query: str) -> bool:
+        if not '*' in query:
+            return resource_id == query
+        elif query == '*':
+            return True
+        elif query.startswith('*'):
+            return resource_id.endswith(query[1:])
+        elif query.endswith('*'):
+            return resource_id.startswith(query[:-1])
+
+        return False
+
+    def _matching_ids(self, query: str) -> List[str]:
+        if query not in self._query_cache:
+            self._query_cache[query] = [res_id for res_id in self._index if self._matches(res_id, query)]
+
+        return self._query_cache[query]
+
+    def _find(self, query: str) -> List[Resource]:
+        if query == '*':
+            return self._items
+
+        if not '*' in query:
+            positions = self._index.get(query, [])
+        else:
+            ids = self._matching_ids(query)
+
+            if len(ids) == 0:
+                return []
+            elif len(ids) == 1:
+                positions = self._index[ids[0]]
+            else:
+                # keep the order in which the resources were added
+                positions = heapq.merge(*[self._index[res_id] for res_id in ids])
+
+        return [self._items[pos] for pos in positions]
+
     def find(self, query: str) -> List[Resource]:
         """
         Finds resources in the current container.
@@ -97,19 +200,29 @@ class Container:
         :return: Resources
         :rtype: list
         """
+        self._materialize()
+        return self._find(query)
 
-        result = []
-        if not '*' in query:
-            result = [item for item in self._items if item.id == query]
-        else:
-            if query == '*':
-                result = self._items
-            elif query.startswith('*'):
-                result = [item for item in self._items if item.id.endswith(query[1:])]
-            elif query.endswith('*'):
-                result = [item for item in self._items if item.id.startswith(query[:-1])]
+    def stream(self, query: str = '*') -> Iterator[Resource]:
+        """
+        Yields the resources matching the query (see :py:meth:`find`) one by one. Resources pulled from the
+        containers iterator are not stored, so a streaming container can only be streamed once.
 
-        return result
+        :param str query: Query string
+        :return: An iterator over the matching resources
+        """
+        for item in list(self._find(query)):
+            yield item
+
+        while self._source is not None:
+            try:
+                item = next(self._source)
+            except StopIteration:
+                self._source = None
+                break
+
+            if self._matches(item.id, query):
+                yield item
 
     def __str__(self):
         lines = ['\t' + x.__class__.__name__ + ': ' + str(x) for x in self._items]
@@ -136,15 +249,28 @@ class Node:
     directives:
 
     @Name: Sets the node name as shown in Creator
+
+    The user interface of a node in Creator is created by a :py:class:`NodeUIAdapter`. Set UI_ADAPTER to the
+    adapter's full class name, so the module containing the Qt code is only imported when running in Creator.
     """
 
+    #: Full name (module.Class) of the node's :py:class:`NodeUIAdapter`
+    UI_ADAPTER = None
+
     def __init__(self, node_properties: Dict, user_properties: Dict, id: str = ''):
-        self._input = None
+        self._inputs = []
         self.id = id if id != '' else '%s.%s' % (self.__module__, self.__class__.__name__)
         self.output = Container()
         self.properties = node_properties
+        self._ui_adapter = None
         self.apply_properties(user_properties)
 
+    def __getstate__(self):
+        # the user interface stays in the calling process
+        state = self.__dict__.copy()
+        state.pop('_ui_adapter', None)
+        return state
+
     def serialize_properties(self) -> dict:
         """
 
@@ -156,39 +282,60 @@ class Node:
 
         return result
 
+    def get_ui_adapter(self) -> 'NodeUIAdapter':
+        """
+        Returns the adapter creating the node's user interface, importing it on first use
+
+        :return: The adapter or None, if the node uses Creator's default fields
+        """
+        # nodes not calling Node.__init__ don't have the attribute
+        if getattr(self, '_ui_adapter', None) is None and self.UI_ADAPTER is not None:
+            modname, _, clsname = self.UI_ADAPTER.rpartition('.')
+            self._ui_adapter = getattr(importlib.import_module(modname), clsname)(self)
+
+        return getattr(self, '_ui_adapter', None)
+
     def apply_ui_data(self):
         """
         This function is executed before the "run()" method in Creator. It should be used to write data from ui
         widgets to the properties of an underlying node object.
         """
-        pass
+        if self.get_ui_adapter() is not None:
+            self.get_ui_adapter().apply_ui_data()
 
     def load_ui_data(self):
         """
         This function is executed after the NodeWidget has been created from existing data (e.g. when loaded
         from a file). It can be used to fill custom widgets.
         """
-        pass
+        if self.get_ui_adapter() is not None:
+            self.get_ui_adapter().load_ui_data()
 
-    def get_ui(self, node_widget) -> QtWidgets.QWidget:
+    def get_ui(self, node_widget):
         """
         Override this function to create the user interface of your node in Creator completely by yourself.
         Remember to also override :py:meth:`apply_ui_data` and :py:meth:`load_ui_data` to keep node properties
-        and user interface in sync.
+        and user interface in sync. Nodes with a :py:class:`NodeUIAdapter` get the adapter's user interface.
 
         :param AxNodeWidget node_widget: The parent widget of the node's ui
-        :return: The node's user interface
+        :return: The node's user interface (QWidget)
         """
+        if self.get_ui_adapter() is not None:
+            return self.get_ui_adapter().get_ui(node_widget)
+
         return None
 
-    def get_field_ui(self, field_name: str, node_widget) -> QtWidgets.QWidget:
+    def get_field_ui(self, field_name: str, node_widget):
         """
         Overrides Creators default field for a property.
 
         :param str field_name: The name of the property whose ui is requested
         :param AxNodeWidget node_widget: The parent widget of the node's ui
-        :return: Returns the ui for a single field
+        :return: Returns the ui for a single field (QWidget)
         """
+        if self.get_ui_adapter() is not None:
+            return self.get_ui_adapter().get_field_ui(field_name, node_widget)
+
         return None
 
     def get_properties(self) -> Dict[str, Property]:
@@ -237,41 +384,172 @@ class Node:
         """
         return True
 
+    async def run_async(self, ctx) -> bool:
+        """
+        Runs the node in an asyncio event loop (see :py:attr:`Workflow.EXECUTOR_ASYNCIO`). Override this
+        function if the node can wait for I/O without blocking the event loop. The default implementation
+        runs :py:meth:`run` in the loop's executor.
+
+        :param WorkflowContext ctx: The current WorkflowContext
+        :return: True if node execution was successful, False otherwise
+        """
+        return await asyncio.get_event_loop().run_in_executor(None, self.run, ctx)
+
+    def stream(self, ctx) -> Iterator[Resource]:
+        """
+        Override this function to support streaming workflows (see :py:meth:`Workflow.set_streaming`).
+        It should read its input using :py:meth:`Container.stream` and yield the output resources one at a time,
+        instead of filling the output container. To report a failure like returning False from :py:meth:`run`,
+        log the error and raise an ExecutionException. Other exceptions stop the workflow as unexpected errors.
+
+        :param WorkflowContext ctx: The current WorkflowContext
+        :return: An iterator over the output resources
+        """
+        raise NotImplementedError()
+
+    def supports_streaming(self) -> bool:
+        """
+
+        :return: True if the node implements :py:meth:`stream`
+        """
+        return type(self).stream is not Node.stream
+
     def set_input(self, node):
-        self._input = node
+        """
+        Replaces all connected input nodes with the given node.
+
+        :param Node node: The upstream node
+        """
+        self._inputs = [node]
+
+    def add_input(self, node):
+        """
+        Connects an additional upstream node. When the workflow is run with a parallel executor, the node will
+        not be started before all of its inputs have finished.
+
+        :param Node node: The upstream node
+        """
+        if node not in self._inputs:
+            self._inputs.append(node)
+
+    def get_inputs(self) -> list:
+        """
+
+        :return: All connected input nodes
+        :rtype: list
+        """
+        return self._inputs
 
     def get_input(self) -> Container:
         """
+        If more than one input node is connected, their outputs are merged into a new container
+        (in the order the inputs were added).
 
-        :return: The output of the connected input node
+        :return: The output of the connected input node(s)
         :rtype: Container
         """
-        if isinstance(self._input, Node):
-            return self._input.get_output()
-        else:
+        for node in self._inputs:
+            if not isinstance(node, Node):
+                raise ValueError('Input has to be a node')
+
+        if len(self._inputs) == 0:
             raise ValueError('Input has to be a node')
+        elif len(self._inputs) == 1:
+            return self._inputs[0].get_output()
+
+        merged = Container()
+        for node in self._inputs:
+            for item in node.get_output().items():
+                merged.add(item)
+
+        return merged
 
     def has_input(self) -> bool:
-        return self._input is not None
+        return len(self._inputs) > 0
 
     def get_output(self) -> Container:
         return self.output
 
 
-class WorkflowContext:
+class NodeUIAdapter:
+    """
+    Creates the user interface of a node in Creator and keeps it in sync with the node's properties.
+
+    Adapters are kept in separate modules that may import Qt and are referenced by :py:attr:`Node.UI_ADAPTER`,
+    so workflows can be run without PySide2 installed.
+    """
+
+    def __init__(self, node: Node):
+        self.node = node
+
+    def get_ui(self, node_widget):
+        """
+        See :py:meth:`Node.get_ui`
+        """
+        return None
+
+    def get_field_ui(self, field_name: str, node_widget):
+        """
+        See :py:meth:`Node.get_field_ui`
+        """
+        return None
+
+    def apply_ui_data(self):
+        """
+        See :py:meth:`Node.apply_ui_data`
+        """
+        pass
+
+    def load_ui_data(self):
+        """
+        See :py:meth:`Node.load_ui_data`
+        """
+        pass
+
+
+class WorkflowContext(EventObject):
     """
     Holds information about the current workflow environment.
-    It also takes care of extensions loading.
+    It also takes care of extensions loading. Extensions are loaded when the nodes are requested for the first
+    time (see :py:meth:`get_nodes`).
+
+    A context can be shared by many workflows (see :py:meth:`derive`), so settings are read only once.
     """
 
-    def __init__(self):
-        self.preferences = PreferencesProvider()
+    def __init__(self, preferences: PreferencesProvider = None):
+        """
+
+        :param PreferencesProvider preferences: Already loaded preferences to use instead of reading the settings
+        """
+        self._listeners = {}
+        self.preferences = PreferencesProvider() if preferences is None else preferences
         self._nodes = {}
+        self._extensions_loaded = False
         self._symbol_table = {}
         self.ui_env = False
-        self.load_extensions()
         self.collected_core_commands = {}
 
+    def __getstate__(self):
+        # listeners are bound to the calling process and are not passed on to worker processes
+        state = self.__dict__.copy()
+        state['_listeners'] = {}
+        return state
+
+    def derive(self) -> 'WorkflowContext':
+        """
+        Creates a context for a single workflow. Preferences, published nodes and ui_env are shared with this
+        context, symbols are copied. Core commands and listeners of the new context start empty, so changes made
+        by a workflow don't affect other workflows.
+
+        :return: The new context
+        """
+        ctx = copy.copy(self)
+        ctx._listeners = {}
+        ctx._symbol_table = dict(self._symbol_table)
+        ctx.collected_core_commands = {}
+
+        return ctx
+
     def get_collected_core_commands(self):
         return self.collected_core_commands
 
@@ -285,6 +563,18 @@ class WorkflowContext:
 
         self.collected_core_commands[cmd] = args
 
+    def report_progress(self, node: Node, data: dict):
+        """
+        Lets nodes report the progress of long running operations. The workflow passes the data on to its
+        listeners as EVENT_NODE_PROGRESS.
+
+        :param Node node: The reporting node
+        :param dict data: Node specific progress information
+        """
+        event_data = {'node': node}
+        event_data.update(data)
+        self.fire_event(Workflow.EVENT_NODE_PROGRESS, event_data)
+
     def autodiscover_nodes(self, root_package: str) -> list:
         """
         This function will return a list of node classes from a given python package/module.
@@ -330,6 +620,19 @@ class WorkflowContext:
         self._nodes[group_name] = nodes
 
     def get_nodes(self) -> Dict[str, list]:
+        """
+        Returns the nodes published by the registered extensions and by calls to :py:meth:`publish_nodes`.
+        The extensions' nodes are shared by all contexts and cached across processes, so the extensions are only
+        booted if their files changed. All published node classes are imported when calling this method.
+
+        :return: The published node groups
+        """
+        if not self._extensions_loaded:
+            self._extensions_loaded = True
+            nodes = get_registry().get_nodes(self)
+            nodes.update(self._nodes)
+            self._nodes = nodes
+
         return self._nodes
 
     def has_symbol(self, name: str) -> bool:
@@ -348,21 +651,18 @@ class WorkflowContext:
         return self._symbol_table
 
     def process_str(self, string: str) -> str:
-        regex = re.compile(r'\{(?P<varname>[\w@]+)\}', re.MULTILINE)
-        matches = regex.finditer(string)
-
-        if matches is None:
-            return string
-
-        for match in matches:
-            varname = match.group('varname')
+        """
+        Replaces symbols in curly braces, unknown symbols are logged and kept as they are
 
-            if self.has_symbol(varname):
-                string = string.replace('{%s}' % varname, self.get_symbol(varname))
-            else:
-                logging.getLogger('core').error('Unknown variable: %s' % varname)
+        :param str string: The string containing symbols
+        :return: The string with all known symbols replaced
+        """
+        return Template.get(string).render(self._symbol_table, self._unknown_symbol)
 
-        return string
+    @staticmethod
+    def _unknown_symbol(name: str) -> str:
+        logging.getLogger('core').error('Unknown variable: %s' % name)
+        return '{%s}' % name
 
     def get_registered_extensions(self):
         return self.preferences.get('extensions', ['atraxiflow.base'])
@@ -391,13 +691,17 @@ class WorkflowContext:
 
         return mod
 
-    def load_extensions(self):
+    def load_extensions(self, extensions: list = None):
         """
-        Loads all reqistered extensions.
+        Loads all reqistered extensions. Usually called by the node registry only, if the extensions' nodes are
+        not cached yet.
+
+        :param list extensions: The extensions to load instead of the registered ones
         """
+        self._extensions_loaded = True
         self.get_logger().debug('Loading extensions...')
 
-        for ext in self.get_registered_extensions():
+        for ext in self.get_registered_extensions() if extensions is None else extensions:
             mod = self.get_extension_module(ext)
 
             logging.getLogger('core').debug('Booting "%s"...' % ext)
@@ -409,13 +713,31 @@ class Workflow(EventObject):
     EVENT_RUN_FINISHED = "EVENT_RUN_FINISHED"
     EVENT_NODE_RUN_STARTED = "EVENT_NODE_RUN_STARTED"
     EVENT_NODE_RUN_FINISHED = "EVENT_NODE_RUN_FINISHED"
+    EVENT_NODE_PROGRESS = "EVENT_NODE_PROGRESS"
 
     CORE_CMD_GOTO_NODE = 'goto_node'
 
-    def __init__(self, nodes: List[Node] = None):
+    EXECUTOR_SEQUENTIAL = 'sequential'
+    EXECUTOR_THREADS = 'threads'
+    EXECUTOR_PROCESSES = 'processes'
+    EXECUTOR_ASYNCIO = 'asyncio'
+
+    def __init__(self, nodes: List[Node] = None, ctx: WorkflowContext = None):
+        """
+
+        :param list nodes: The nodes to run
+        :param WorkflowContext ctx: A context shared by several workflows, the workflow runs in a context derived
+                                    from it (see :py:meth:`WorkflowContext.derive`)
+        """
         self._nodes = nodes if isinstance(nodes, list) else []
-        self._ctx = WorkflowContext()
+        self._ctx = WorkflowContext() if ctx is None else ctx.derive()
         self._listeners = {}
+        self._ctx.add_listener(self.EVENT_NODE_PROGRESS, lambda data: self.fire_event(self.EVENT_NODE_PROGRESS, data))
+        self._executor = self.EXECUTOR_SEQUENTIAL
+        self._max_workers = None
+        self._streaming = False
+        self._profiling = False
+        self._profile = []
 
     def get_nodes(self):
         return self._nodes
@@ -427,9 +749,142 @@ class Workflow(EventObject):
         self._nodes.append(node)
 
     @staticmethod
-    def create(nodes: List[Node] = None):
+    def create(nodes: List[Node] = None, ctx: WorkflowContext = None):
         """ Convenience function to create a new stream """
-        return Workflow(nodes)
+        return Workflow(nodes, ctx)
+
+    def set_executor(self, executor: str, max_workers: int = None):
+        """
+        Sets the way nodes are executed.
+
+        With the sequential executor (default) nodes run one after another, each node receiving the output
+        of the previous one as input. The threads and processes executors build a dependency graph from the
+        nodes' inputs (see :py:meth:`Node.add_input`) and run independent branches concurrently. If no node of
+        the workflow has a connected input, each node is connected to the previous one like with the sequential
+        executor. Otherwise the connections are used as they are and nodes without inputs start right away,
+        wherever they are in the list of nodes.
+
+        When using the processes executor, each node is copied to a worker process together with its input
+        resources (but not the upstream nodes). The node's output, symbols set on the context and core commands
+        are transferred back, so nodes and resources need to be picklable. Other changes a node makes to the
+        context or to itself are lost, events fired in the worker are not passed to the listeners.
+
+        The asyncio executor runs the graph in an event loop using :py:meth:`run_async`. Nodes implementing
+        :py:meth:`Node.run_async` wait for I/O in the loop, all other nodes run in a thread pool.
+
+        :param str executor: One of EXECUTOR_SEQUENTIAL, EXECUTOR_THREADS, EXECUTOR_PROCESSES, EXECUTOR_ASYNCIO
+        :param int max_workers: The maximum number of nodes to run at the same time (None: let the pool decide).
+                                For the asyncio executor: the number of threads for nodes without async support.
+        """
+        if executor not in (self.EXECUTOR_SEQUENTIAL, self.EXECUTOR_THREADS, self.EXECUTOR_PROCESSES,
+                            self.EXECUTOR_ASYNCIO):
+            raise ValueError('Unknown executor "%s"' % executor)
+
+        self._executor = executor
+        self._max_workers = max_workers
+
+    def get_executor(self) -> str:
+        return self._executor
+
+    def set_streaming(self, streaming: bool):
+        """
+        Enables streaming mode (only supported by the sequential executor).
+
+        In streaming mode, nodes implementing :py:meth:`Node.stream` pass their resources on to the next node
+        one at a time, so consecutive streaming nodes work on the resources simultaneously and memory usage does
+        not depend on the number of resources. The output of a streaming node is passed on as a whole if the
+        next node does not support streaming. The output of the last node is consumed and not kept. If a
+        streaming node does not read all of its input, the rest is consumed after the node has finished, so all
+        nodes run completely.
+
+        :param bool streaming: True to enable streaming
+        """
+        self._streaming = streaming
+
+    def is_streaming(self) -> bool:
+        return self._streaming
+
+    def set_profiling(self, profiling: bool):
+        """
+        Enables profiling. The data passed with EVENT_NODE_RUN_FINISHED then contains a dict "profile" with:
+
+        * node, name: The node and its class name
+        * wall_time: Time in seconds spent in the node (for streaming nodes without the time spent in the nodes
+          they get their resources from)
+        * cpu_time: CPU time in seconds of the node's thread (None for the asyncio executor and Python < 3.7)
+        * memory_delta: Bytes the node increased the peak memory (RSS) of the process it ran in by (None on
+          Windows)
+        * inputs, outputs: The number of resources the node received and returned (None if unknown)
+        * started, pid, thread_id: When (time.perf_counter()) and where the node was started
+
+        See :py:mod:`atraxiflow.profiling` to create reports from the profiles.
+
+        :param bool profiling: True to enable profiling
+        """
+        self._profiling = profiling
+
+    def is_profiling(self) -> bool:
+        return self._profiling
+
+    def get_profile(self) -> List[dict]:
+        """
+
+        :return: The profiles of the nodes processed in the last run, in order of completion
+        """
+        return self._profile
+
+    def _node_finished_data(self, node: Node, measurement: Measurement = None, outputs: int = None) -> dict:
+        data = {'node': node}
+
+        if measurement is None:
+            return data
+
+        if outputs is None and not node.get_output().is_streaming():
+            outputs = node.get_output().size()
+
+        profiled = {record['node']: record for record in self._profile}
+        inputs = 0
+        for inp in node.get_inputs():
+            if inp in profiled and profiled[inp]['outputs'] is not None:
+                inputs += profiled[inp]['outputs']
+            elif not inp.get_output().is_streaming():
+                inputs += inp.get_output().size()
+            else:
+                inputs = None
+                break
+
+        profile = measurement.to_dict()
+        profile.update({'node': node, 'name': node.__class__.__name__, 'inputs': inputs, 'outputs': outputs})
+        self._profile.append(profile)
+        data['profile'] = profile
+
+        return data
+
+    def _stream_node(self, node: Node, measurement: Measurement = None) -> Iterator[Resource]:
+        resources = iter(node.stream(self._ctx))
+        count = 0
+
+        while True:
+            if measurement is not None:
+                measurement.start()
+
+            try:
+                res = next(resources)
+            except StopIteration:
+                break
+            finally:
+                if measurement is not None:
+                    measurement.stop()
+
+            count += 1
+            yield res
+
+        # inputs the node did not (completely) read are run to the end, so their nodes are not skipped
+        for inp in node.get_inputs():
+            for _ in inp.get_output().stream():
+                pass
+
+        self.fire_event(self.EVENT_NODE_RUN_FINISHED, self._node_finished_data(node, measurement, count))
 
     def __rshift__(self, node):
         """
@@ -451,8 +906,21 @@ class Workflow(EventObject):
 
         :return: bool - If false, errors have occured while processing the stream
         """
+        if self._executor == self.EXECUTOR_ASYNCIO:
+            return run_concurrently([self], self._max_workers)[0]
+
         self._ctx.get_logger().info("Starting processing")
+        # core commands of a previous, failed run are dropped
+        self._ctx.reset_collected_core_commands()
+
+        if self._executor == self.EXECUTOR_SEQUENTIAL:
+            return self._run_sequential()
+        else:
+            return self._run_graph()
+
+    def _run_sequential(self) -> bool:
         self.fire_event(self.EVENT_RUN_STARTED)
+        self._profile = []
         self._pos = -1
         nodes_processed = 0
         prev_node = None
@@ -472,8 +940,25 @@ class Workflow(EventObject):
                 node.apply_ui_data()
 
             logging.getLogger('core').debug("Running node {0}...".format(node.__class__.__name__))
+            streamed = self._streaming and node.supports_streaming()
+            measurement = Measurement() if self._profiling else None
             try:
-                res = node.run(self._ctx)
+                if streamed:
+                    # the node is run while the next node (or the workflow) consumes its output
+                    node.output = Container.from_iterable(self._stream_node(node, measurement))
+                    res = True
+                else:
+                    if prev_node is not None and prev_node.get_output().is_streaming():
+                        # make sure the previous node has finished before running a non-streaming node
+                        prev_node.get_output().items()
+
+                    if measurement is not None:
+                        res, measurement = measure(node.run, self._ctx)
+                    else:
+                        res = node.run(self._ctx)
+            except ExecutionException:
+                # a streaming node failed while its output was read
+                return self._stream_failed(nodes_processed)
             except Exception as e:
                 logging.getLogger('core').error(e.__class__.__name__ + ': ' + str(e))
                 self.fire_event(self.EVENT_RUN_FINISHED, {'errors': True, 'nodes_processed': nodes_processed})
@@ -505,7 +990,8 @@ class Workflow(EventObject):
             # clear command list on context
             self._ctx.reset_collected_core_commands()
 
-            self.fire_event(self.EVENT_NODE_RUN_FINISHED, {'node': node})
+            if not streamed:
+                self.fire_event(self.EVENT_NODE_RUN_FINISHED, self._node_finished_data(node, measurement))
 
             prev_node = node
             nodes_processed += 1
@@ -518,10 +1004,339 @@ class Workflow(EventObject):
 
                 return False
 
+        if prev_node is not None and prev_node.get_output().is_streaming():
+            try:
+                for _ in prev_node.get_output().stream():
+                    pass
+            except ExecutionException:
+                return self._stream_failed(nodes_processed)
+            except Exception as e:
+                logging.getLogger('core').error(e.__class__.__name__ + ': ' + str(e))
+                self.fire_event(self.EVENT_RUN_FINISHED, {'errors': True, 'nodes_processed': nodes_processed})
+                logging.getLogger('core').error('Stopping workflow execution due to an unexpected exception.')
+                return False
+
         logging.getLogger('core').info("Finished processing {0}/{1} nodes".format(nodes_processed, len(self._nodes)))
         self.fire_event(self.EVENT_RUN_FINISHED, {'errors': False, 'nodes_processed': nodes_processed})
         return True
 
+    def _stream_failed(self, nodes_processed: int) -> bool:
+        logging.getLogger('core').warning("Node failed.")
+        logging.getLogger('core').info("Finished processing {0}/{1} nodes".format(nodes_processed, len(self._nodes)))
+        self.fire_event(self.EVENT_RUN_FINISHED, {'errors': True, 'nodes_processed': nodes_processed})
+
+        return False
+
+    def _build_graph(self) -> Dict[Node, List[Node]]:
+        """
+        Connects each node to its predecessor, if no node has a connected input, and checks the resulting
+        graph for unknown inputs and cycles.
+
+        :return: A dictionary mapping every node to the nodes it depends on
+        """
+        graph = {}
+        prev_node = None
+        # nodes of explicitly connected workflows are not chained, so independent roots don't wait
+        chained = not any(node.has_input() for node in self._nodes)
+
+        for node in self._nodes:
+            if chained and prev_node is not None:
+                node.set_input(prev_node)
+
+            for inp in node.get_inputs():
+                if inp not in self._nodes:
+                    raise ExecutionException(
+                        'Input {0} of node {1} is not part of the workflow.'.format(inp.__class__.__name__,
+                                                                                  node.__class__.__name__))
+
+            graph[node] = list(node.get_inputs())
+            prev_node = node
+
+        # Kahn's algorithm: if not every node can be sorted, the graph contains a cycle
+        pending = {node: len(deps) for node, deps in graph.items()}
+        ready = [node for node, count in pending.items() if count == 0]
+        sorted_count = 0
+
+        while len(ready) > 0:
+            node = ready.pop()
+            sorted_count += 1
+
+            for other, deps in graph.items():
+                if node in deps:
+                    pending[other] -= 1
+                    if pending[other] == 0:
+                        ready.append(other)
+
+        if sorted_count != len(graph):
+            raise ExecutionException('Workflow contains a cycle.')
+
+        return graph
+
+    def _run_graph(self) -> bool:
+        self.fire_event(self.EVENT_RUN_STARTED)
+        self._profile = []
+        nodes_processed = 0
+
+        if self._streaming:
+            logging.getLogger('core').warning(
+                'Streaming is not supported by the "%s" executor, running nodes normally.' % self._executor)
+
+        try:
+            graph = self._build_graph()
+        except ExecutionException as e:
+            logging.getLogger('core').error(str(e))
+            self.fire_event(self.EVENT_RUN_FINISHED, {'errors': True, 'nodes_processed': nodes_processed})
+            return False
+
+        dependents = {node: [] for node in graph}
+        for node, deps in graph.items():
+            for dep in deps:
+                dependents[dep].append(node)
+
+        pending = {node: len(deps) for node, deps in graph.items()}
+        ready = [node for node in self._nodes if pending[node] == 0]
+        running = {}
+        errors = False
+
+        if self._executor == self.EXECUTOR_PROCESSES:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=self._max_workers)
+        else:
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers)
+
+        with pool:
+            while (len(ready) > 0 and not errors) or len(running) > 0:
+                while len(ready) > 0 and not errors:
+                    node = ready.pop(0)
+
+                    self.fire_event(self.EVENT_NODE_RUN_STARTED, {'node': node})
+                    if self.get_context().ui_env:
+                        logging.getLogger('core').debug(
+                            'Workflow started in UI environment, running apply_ui_data() on node...')
+                        node.apply_ui_data()
+
+                    logging.getLogger('core').debug("Running node {0}...".format(node.__class__.__name__))
+                    if self._executor == self.EXECUTOR_PROCESSES:
+                        isolated, inputs = _isolate_node(node)
+                        running[pool.submit(_run_node_isolated, isolated, inputs, self._ctx, self._profiling)] = node
+                    elif self._profiling:
+                        running[pool.submit(measure, node.run, self._ctx)] = node
+                    else:
+                        running[pool.submit(node.run, self._ctx)] = node
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    node = running.pop(future)
+
+                    try:
+                        res = future.result()
+                    except Exception as e:
+                        logging.getLogger('core').error(e.__class__.__name__ + ': ' + str(e))
+                        logging.getLogger('core').error(
+                            'Stopping workflow execution due to an unexpected exception.')
+                        errors = True
+                        continue
+
+                    measurement = None
+                    if self._executor == self.EXECUTOR_PROCESSES:
+                        res, node.output, measurement, symbols, core_commands = res
+                        self._ctx._symbol_table.update(symbols)
+                        self._ctx.collected_core_commands.update(core_commands)
+                    elif self._profiling:
+                        res, measurement = res
+
+                    if len(self._ctx.get_collected_core_commands()) > 0:
+                        logging.getLogger('core').error(
+                            'Core commands are not supported by the "%s" executor.' % self._executor)
+                        self._ctx.reset_collected_core_commands()
+
+                    self.fire_event(self.EVENT_NODE_RUN_FINISHED, self._node_finished_data(node, measurement))
+                    nodes_processed += 1
+
+                    if res is False:
+                        logging.getLogger('core').warning("Node failed.")
+                        errors = True
+                        continue
+
+                    for dependent in dependents[node]:
+                        pending[dependent] -= 1
+                        if pending[dependent] == 0:
+                            ready.append(dependent)
+
+        logging.getLogger('core').info("Finished processing {0}/{1} nodes".format(nodes_processed, len(self._nodes)))
+        self.fire_event(self.EVENT_RUN_FINISHED, {'errors': errors, 'nodes_processed': nodes_processed})
+        return not errors
+
+    async def run_async(self) -> bool:
+        """
+        Runs the workflow in the current asyncio event loop. Nodes are run as soon as all of their inputs
+        have finished (see :py:meth:`set_executor`), independent branches run concurrently.
+
+        :return: bool - If false, errors have occured while processing the stream
+        """
+        self._ctx.get_logger().info("Starting processing")
+        self._ctx.reset_collected_core_commands()
+        self.fire_event(self.EVENT_RUN_STARTED)
+        self._profile = []
+        state = {'errors': False, 'nodes_processed': 0}
+
+        if self._streaming:
+            logging.getLogger('core').warning(
+                'Streaming is not supported by the "%s" executor, running nodes normally.' % self.EXECUTOR_ASYNCIO)
+
+        try:
+            graph = self._build_graph()
+        except ExecutionException as e:
+            logging.getLogger('core').error(str(e))
+            self.fire_event(self.EVENT_RUN_FINISHED, {'errors': True, 'nodes_processed': 0})
+            return False
+
+        tasks = {}
+
+        def get_task(node: Node) -> asyncio.Future:
+            if node not in tasks:
+                tasks[node] = asyncio.ensure_future(run_node(node))
+
+            return tasks[node]
+
+        async def run_node(node: Node) -> bool:
+            inputs_ok = await asyncio.gather(*[get_task(dep) for dep in graph[node]])
+
+            # no new nodes are started once a node has failed
+            if not all(inputs_ok) or state['errors']:
+                return False
+
+            self.fire_event(self.EVENT_NODE_RUN_STARTED, {'node': node})
+            if self.get_context().ui_env:
+                logging.getLogger('core').debug(
+                    'Workflow started in UI environment, running apply_ui_data() on node...')
+                node.apply_ui_data()
+
+            logging.getLogger('core').debug("Running node {0}...".format(node.__class__.__name__))
+            measurement = Measurement() if self._profiling else None
+            try:
+                if measurement is not None:
+                    # other nodes run in the event loop's thread in the meantime
+                    measurement.start(shared_thread=True)
+
+                res = await node.run_async(self._ctx)
+
+                if measurement is not None:
+                    measurement.stop()
+            except Exception as e:
+                logging.getLogger('core').error(e.__class__.__name__ + ': ' + str(e))
+                logging.getLogger('core').error('Stopping workflow execution due to an unexpected exception.')
+                state['errors'] = True
+                return False
+
+            if len(self._ctx.get_collected_core_commands()) > 0:
+                logging.getLogger('core').error(
+                    'Core commands are not supported by the "%s" executor.' % self.EXECUTOR_ASYNCIO)
+                self._ctx.reset_collected_core_commands()
+
+            self.fire_event(self.EVENT_NODE_RUN_FINISHED, self._node_finished_data(node, measurement))
+            state['nodes_processed'] += 1
+
+            if res is False:
+                logging.getLogger('core').warning("Node failed.")
+                state['errors'] = True
+                return False
+
+            return True
+
+        await asyncio.gather(*[get_task(node) for node in self._nodes])
+
+        logging.getLogger('core').info(
+            "Finished processing {0}/{1} nodes".format(state['nodes_processed'], len(self._nodes)))
+        self.fire_event(self.EVENT_RUN_FINISHED, state)
+        return not state['errors']
+
+
+def run_concurrently(workflows: List[Workflow], max_workers: int = None) -> List[bool]:
+    """
+    Runs several workflows at the same time in a new asyncio event loop (see :py:meth:`Workflow.run_async`).
+
+    :param list workflows: The workflows to run
+    :param int max_workers: The number of threads for running nodes without async support (None: default)
+    :return: The results of the workflows' runs
+    """
+    async def run_all():
+        return await asyncio.gather(*[wf.run_async() for wf in workflows])
+
+    loop = asyncio.new_event_loop()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    loop.set_default_executor(executor)
+
+    # before Python 3.8, child processes are watched by the current loop of the main thread only
+    switch_loop = _needs_child_watcher() and threading.current_thread() is threading.main_thread()
+    previous_loop = None
+
+    if switch_loop:
+        previous_loop = asyncio.get_event_loop()
+        asyncio.set_event_loop(loop)
+        asyncio.get_child_watcher().attach_loop(loop)
+
+    try:
+        return loop.run_until_complete(run_all())
+    finally:
+        if switch_loop:
+            asyncio.set_event_loop(previous_loop)
+            asyncio.get_child_watcher().attach_loop(previous_loop)
+
+        loop.close()
+        executor.shutdown()
+
+
+def _needs_child_watcher() -> bool:
+    # Python 3.8 added a child watcher working with loops in all threads
+    return sys.version_info < (3, 8) and os.name == 'posix'
+
+
+class _InputNode(Node):
+    """
+    Stands in for the upstream nodes of a node run in a worker process, holding only their output
+    """
+
+    def __init__(self, output: Container):
+        super().__init__({}, {})
+        self.output = output
+
+
+def _isolate_node(node: Node):
+    """
+    Copies a node for running it in a worker process without its upstream nodes, which would be copied
+    along with it otherwise.
+
+    :return: The copy and the node's input resources (None, if it has no input)
+    """
+    isolated = copy.copy(node)
+    isolated._inputs = []
+    isolated.output = Container()
+
+    return isolated, node.get_input() if node.has_input() else None
+
+
+def _run_node_isolated(node: Node, inputs: Container, ctx: WorkflowContext, profiling: bool = False):
+    """
+    Runs a node inside a worker process and returns the result together with the node's output, its
+    measurement (if profiling) and the symbols and core commands it added to the context, since changes to
+    the node and the context are not visible to the calling process.
+    """
+    if inputs is not None:
+        node.set_input(_InputNode(inputs))
+
+    symbols = dict(ctx.get_symbols())
+
+    if profiling:
+        res, measurement = measure(node.run, ctx)
+    else:
+        res, measurement = node.run(ctx), None
+
+    changed = {name: value for name, value in ctx.get_symbols().items()
+               if name not in symbols or symbols[name] is not value}
+
+    return res, node.get_output(), measurement, changed, ctx.get_collected_core_commands()
+
 
 def run():
     """
@@ -8,9 +8,11 @@
 import logging
 import re
 from datetime import datetime, timedelta
-from typing import Any
+from collections import ChainMap
+from typing import Any, Callable, Mapping
 
 from atraxiflow.core import WorkflowContext
+from atraxiflow.template import Template, SYNTAX_ANY
 
 __all__ = ['DatetimeProcessor', 'StringValueProcessor']
 
@@ -120,19 +122,36 @@ class StringValueProcessor:
         return self
 
     def parse(self, string: str) -> str:
-        matches = re.findall("{(.+?)}", string)
+        return Template.get(string, SYNTAX_ANY).render(self._get_values(), self._unknown_variable)
 
-        for match in matches:
-            string = string.replace("{" + match + "}", self._get_variable_value(match))
+    def compile(self, string: str) -> Callable[[dict], str]:
+        """
+        Parses the string once for filling it with different values many times. Context variables are
+        resolved right away, all other variables are taken from the dict passed to the returned function
+        (or the variables added to this processor).
+
+        .. code-block:: python
+
+            template = svp.compile('{file.basename}.bak')
+            for name in names:
+                print(template({'file.basename': name}))
+
+        :param str string: The string containing variables
+        :return: A function returning the string with all variables replaced
+        """
+        template = Template.get(string, SYNTAX_ANY).bind(self._ctx.get_symbols())
+        value_map = self._value_map
 
-        return string
+        def fill(values: dict = None) -> str:
+            return template.render(value_map if values is None else ChainMap(values, value_map),
+                                   self._unknown_variable)
 
-    def _get_variable_value(self, var: str) -> Any:
-        # Context lookup
-        if self._ctx.has_symbol(var):
-            return self._ctx.get_symbol(var)
+        return fill
 
-        if var in self._value_map:
-            return self._value_map[var]
+    def _get_values(self) -> Mapping[str, Any]:
+        # context symbols take precedence
+        return ChainMap(self._ctx.get_symbols(), self._value_map)
 
-        raise Exception('Unknown variable: %s' % var)
+    @staticmethod
+    def _unknown_variable(name: str) -> str:
+        raise Exception('Unknown variable: %s' % name)
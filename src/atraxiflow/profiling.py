@@ -0,0 +1,198 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+"""
+Measures the time and memory nodes need, see :py:meth:`atraxiflow.core.Workflow.set_profiling`.
+"""
+import os
+import sys
+import threading
+import time
+from typing import List
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+__all__ = ['Measurement', 'measure', 'format_profile', 'to_chrome_trace']
+
+_active = threading.local()
+
+
+def _peak_rss():
+    if resource is None:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _thread_time():
+    # time.thread_time() was added in Python 3.7
+    return time.thread_time() if hasattr(time, 'thread_time') else None
+
+
+class Measurement:
+    """
+    Wall time, CPU time and increase of the process' peak memory (RSS) of code run between :py:meth:`start` and
+    :py:meth:`stop`, possibly in several parts (e.g. for each resource of a stream).
+
+    Measurements started while another one is running in the same thread are subtracted from the outer one,
+    so a streaming node does not include the time spent in the nodes it pulls its resources from.
+    """
+
+    def __init__(self):
+        self.started = None
+        self.wall_time = 0.0
+        self.cpu_time = 0.0 if _thread_time() is not None else None
+        self.memory_delta = 0 if resource is not None else None
+        self.pid = os.getpid()
+        self.thread_id = threading.get_ident()
+        self._part = None
+        self._children = None
+
+    def start(self, shared_thread: bool = False):
+        """
+
+        :param bool shared_thread: True, if the thread runs other code in between (e.g. coroutines), so only wall
+                                   time and memory can be measured
+        """
+        if not hasattr(_active, 'stack'):
+            _active.stack = []
+
+        if shared_thread:
+            self.cpu_time = None
+
+        self._part = (time.perf_counter(), _thread_time(), _peak_rss(), shared_thread)
+        self._children = [0.0, 0.0, 0]
+        if self.started is None:
+            self.started = self._part[0]
+
+        if not shared_thread:
+            _active.stack.append(self)
+
+    def stop(self):
+        wall = time.perf_counter() - self._part[0]
+        cpu = _thread_time() - self._part[1] if self.cpu_time is not None else None
+        memory = _peak_rss() - self._part[2] if self.memory_delta is not None else None
+
+        self.wall_time += wall - self._children[0]
+        if cpu is not None:
+            self.cpu_time += cpu - self._children[1]
+        if memory is not None:
+            self.memory_delta += memory - self._children[2]
+
+        if self._part[3]:
+            return
+
+        _active.stack.pop()
+
+        if len(_active.stack) > 0:
+            parent = _active.stack[-1]._children
+            parent[0] += wall
+            parent[1] += cpu if cpu is not None else 0.0
+            parent[2] += memory if memory is not None else 0
+
+    def to_dict(self) -> dict:
+        return {
+            'started': self.started,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'memory_delta': self.memory_delta,
+            'pid': self.pid,
+            'thread_id': self.thread_id
+        }
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_part'] = None
+        state['_children'] = None
+        return state
+
+
+def measure(func, *args):
+    """
+    Calls a function and measures it
+
+    :return: The function's result and the measurement
+    """
+    measurement = Measurement()
+    measurement.start()
+
+    try:
+        result = func(*args)
+    finally:
+        measurement.stop()
+
+    return result, measurement
+
+
+def _format_bytes(size) -> str:
+    if size is None:
+        return '-'
+
+    for unit in ['B', 'KB', 'MB']:
+        if abs(size) < 1024:
+            return '%d %s' % (size, unit) if unit == 'B' else '%.1f %s' % (size, unit)
+
+        size /= 1024
+
+    return '%.1f GB' % size
+
+
+def format_profile(records: List[dict]) -> str:
+    """
+    Creates a table of node profiles, the slowest node first
+
+    :param list records: The profiles passed with EVENT_NODE_RUN_FINISHED
+    :return: The table
+    """
+    total = sum(r['wall_time'] for r in records)
+    lines = ['{:<30} {:>10} {:>10} {:>7} {:>10} {:>8} {:>8}'.format('Node', 'Wall (s)', 'CPU (s)', 'Share',
+                                                                      'Memory', 'In', 'Out')]
+
+    for r in sorted(records, key=lambda r: r['wall_time'], reverse=True):
+        lines.append('{:<30} {:>10.4f} {:>10} {:>6.1f}% {:>10} {:>8} {:>8}'.format(
+            r['name'][:30], r['wall_time'],
+            '-' if r['cpu_time'] is None else '%.4f' % r['cpu_time'],
+            100 * r['wall_time'] / total if total > 0 else 0.0,
+            _format_bytes(r['memory_delta']),
+            '-' if r['inputs'] is None else r['inputs'],
+            '-' if r['outputs'] is None else r['outputs']))
+
+    lines.append('{:<30} {:>10.4f}'.format('Total', total))
+    return '\n'.join(lines)
+
+
+def to_chrome_trace(records: List[dict], category: str = 'node') -> dict:
+    """
+    Converts node profiles to the trace event format, that can be viewed in chrome://tracing or Perfetto.
+    Events start when the node was started and last as long as the node's own wall time, so streaming nodes
+    appear shorter than the stream.
+
+    :param list records: The profiles passed with EVENT_NODE_RUN_FINISHED
+    :param str category: The category of the events (e.g. the workflow's name)
+    :return: A dict to be saved as JSON
+    """
+    events = []
+    origin = min([r['started'] for r in records]) if len(records) > 0 else 0
+
+    for r in records:
+        events.append({
+            'name': r['name'],
+            'cat': r.get('category', category),
+            'ph': 'X',
+            'ts': (r['started'] - origin) * 1e6,
+            'dur': r['wall_time'] * 1e6,
+            'pid': r['pid'],
+            'tid': r['thread_id'],
+            'args': {k: r[k] for k in ('cpu_time', 'memory_delta', 'inputs', 'outputs')}
+        })
+
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
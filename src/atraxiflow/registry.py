@@ -0,0 +1,236 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+
+from atraxiflow.exceptions import ExtensionException
+from atraxiflow.preferences import PreferencesProvider
+
+__all__ = ['NodeRegistry', 'get_registry']
+
+
+class NodeRegistry:
+    """
+    Holds the nodes published by the registered extensions, shared by all contexts of a process.
+
+    Extensions are booted only when the nodes are requested for the first time. The published node names are
+    saved to a cache file next to the settings, so later processes don't have to boot the extensions as long
+    as their files did not change. Running a workflow never requests the nodes.
+
+    :py:meth:`get_node_names` returns the names without importing anything, :py:meth:`get_nodes` imports all
+    published node classes (but not the other modules of the extensions).
+
+    If the nodes are cached, the extensions' ``boot()`` functions are not called. Extensions must not rely on
+    other side effects of ``boot()``.
+    """
+
+    CACHE_FILE = 'node_cache.json'
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_file: str = None):
+        """
+
+        :param str cache_file: The cache file to use instead of the one in the settings directory
+        """
+        self._cache_file = cache_file
+        self._names = {}
+        self._classes = {}
+        self._lock = threading.RLock()
+
+    def get_logger(self) -> logging.Logger:
+        return logging.getLogger('core')
+
+    def get_cache_file(self) -> str:
+        if self._cache_file is None:
+            # the settings file may be set by an environment variable, the cache is placed next to it
+            settings_dir = os.path.dirname(PreferencesProvider().get_settings_file('settings.json'))
+            self._cache_file = os.path.join(settings_dir, self.CACHE_FILE)
+
+        return self._cache_file
+
+    def get_node_names(self, ctx) -> dict:
+        """
+        Returns the published node groups, holding the full class names instead of the classes
+
+        :param WorkflowContext ctx: The context used to boot the extensions, if they are not cached
+        :return: The published node groups
+        """
+        extensions = tuple(ctx.get_registered_extensions())
+
+        with self._lock:
+            if extensions not in self._names:
+                self._names[extensions] = self._load(ctx, extensions)
+
+            return self._names[extensions]
+
+    def get_nodes(self, ctx) -> dict:
+        """
+        Returns the published node groups as passed to :py:meth:`WorkflowContext.publish_nodes`. All node classes
+        are imported, use :py:meth:`get_node_names` to avoid this.
+
+        :param WorkflowContext ctx: The context used to boot the extensions, if they are not cached
+        :return: The published node groups
+        """
+        return self._map(self.get_node_names(ctx), self.get_node_class)
+
+    def get_node_class(self, name: str) -> type:
+        """
+        Imports a node class
+
+        :param str name: The full class name (module.Class)
+        :return: The node class
+        """
+        with self._lock:
+            if name not in self._classes:
+                modname, _, clsname = name.rpartition('.')
+
+                try:
+                    self._classes[name] = getattr(importlib.import_module(modname), clsname)
+                except (ImportError, AttributeError):
+                    raise ExtensionException('Could not find node class: %s' % name)
+
+            return self._classes[name]
+
+    def clear(self):
+        """
+        Forgets all nodes, so the extensions are booted or read from the cache again.
+        """
+        with self._lock:
+            self._names.clear()
+            self._classes.clear()
+
+    def _load(self, ctx, extensions: tuple) -> dict:
+        key = self._get_cache_key(extensions)
+        cache = self._read_cache()
+
+        if key is not None and cache.get(key) is not None:
+            self.get_logger().debug('Using cached nodes for %s' % ', '.join(extensions))
+            return cache[key]
+
+        # boot the extensions on a separate context to collect only their nodes, exactly the extensions of the
+        # cache key are booted
+        boot_ctx = type(ctx)(ctx.preferences)
+        boot_ctx.load_extensions(list(extensions))
+        nodes = boot_ctx.get_nodes()
+
+        names = self._map(nodes, lambda cls: cls.__module__ + '.' + cls.__name__)
+        self._classes.update(self._flatten(names, nodes))
+
+        if key is not None:
+            # entries of other extension lists are kept, outdated ones are replaced by their new key
+            self._write_cache({k: v for k, v in cache.items() if not k.startswith(self._key_prefix(extensions))},
+                              key, names)
+
+        return names
+
+    def _map(self, groups: dict, func) -> dict:
+        result = {}
+
+        for group, nodes in groups.items():
+            if isinstance(nodes, dict):
+                result[group] = self._map(nodes, func)
+            else:
+                result[group] = [func(node) for node in nodes]
+
+        return result
+
+    def _flatten(self, names: dict, nodes: dict) -> dict:
+        result = {}
+
+        for group in names:
+            if isinstance(names[group], dict):
+                result.update(self._flatten(names[group], nodes[group]))
+            else:
+                result.update(zip(names[group], nodes[group]))
+
+        return result
+
+    def _key_prefix(self, extensions: tuple) -> str:
+        return ','.join(extensions) + ':'
+
+    def _get_cache_key(self, extensions: tuple):
+        """
+        Creates a key from the extension names and the size and modification time of their files, so the cache
+        is renewed on updates. Extensions are only located, not imported.
+
+        :return: The key or None, if an extension can't be found
+        """
+        digest = hashlib.sha1()
+        digest.update(repr((self.CACHE_VERSION, sys.version_info[:2])).encode('utf-8'))
+
+        for ext in extensions:
+            try:
+                spec = importlib.util.find_spec(ext)
+            except (ImportError, ValueError):
+                spec = None
+
+            if spec is None:
+                return None
+
+            if spec.submodule_search_locations is None:
+                files = [spec.origin]
+            else:
+                files = []
+                for location in spec.submodule_search_locations:
+                    for root, dirs, filenames in os.walk(location):
+                        dirs.sort()
+                        files += [os.path.join(root, f) for f in sorted(filenames) if f.endswith('.py')]
+
+            for f in files:
+                try:
+                    st = os.stat(f)
+                except OSError:
+                    return None
+
+                digest.update(repr((f, st.st_size, st.st_mtime_ns)).encode('utf-8'))
+
+        return self._key_prefix(extensions) + digest.hexdigest()
+
+    def _read_cache(self) -> dict:
+        try:
+            with open(self.get_cache_file(), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_cache(self, cache: dict, key: str, names: dict):
+        cache[key] = names
+        tmp_file = self.get_cache_file() + '.%s.tmp' % os.getpid()
+
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(cache, f)
+
+            os.replace(tmp_file, self.get_cache_file())
+        except OSError as e:
+            self.get_logger().debug('Could not write node cache: %s' % e)
+
+            if os.path.exists(tmp_file):
+                os.unlink(tmp_file)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> NodeRegistry:
+    """
+    Returns the node registry of the current process
+    """
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = NodeRegistry()
+
+        return _registry
@@ -0,0 +1,108 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+import functools
+import re
+from typing import Any, Callable, Mapping
+
+__all__ = ['Template', 'SYNTAX_SYMBOL', 'SYNTAX_NAME', 'SYNTAX_ANY']
+
+#: Variable names made of word characters and @, used by WorkflowContext.process_str
+SYNTAX_SYMBOL = r'\{([\w@]+)\}'
+
+#: Like SYNTAX_SYMBOL, but names may contain dots (e.g. {file.basename}), used by ShellExecNode
+SYNTAX_NAME = r'\{([\w@.]+)\}'
+
+#: Any text between curly braces, used by StringValueProcessor
+SYNTAX_ANY = r'\{(.+?)\}'
+
+
+class Template:
+    """
+    A string with variables in curly braces, split into literal text and variable names.
+
+    Templates are parsed once and cached, so strings that are filled many times (e.g. per file or per
+    command) are only scanned the first time.
+
+    .. code-block:: python
+
+        template = Template.get('{file.basename}.bak', SYNTAX_ANY)
+        print(template.render({'file.basename': 'notes'}))
+    """
+
+    def __init__(self, parts: tuple):
+        """
+
+        :param tuple parts: Literal text at even and variable names at odd indexes
+        """
+        self._parts = parts
+
+    @staticmethod
+    def get(string: str, syntax: str = SYNTAX_SYMBOL) -> 'Template':
+        """
+        Returns the parsed template for a string
+
+        :param str string: The string containing variables
+        :param str syntax: A regular expression with one group matching the variable name
+        :return: The (cached) template
+        """
+        return _parse(string, syntax)
+
+    def get_variables(self) -> list:
+        """
+
+        :return: The names of all variables in order of appearance
+        """
+        return list(self._parts[1::2])
+
+    def bind(self, values: Mapping[str, Any]) -> 'Template':
+        """
+        Replaces the variables found in values and keeps all others
+
+        :param values: The known variables
+        :return: A new template
+        """
+        parts = [self._parts[0]]
+
+        for i in range(1, len(self._parts), 2):
+            name = self._parts[i]
+
+            if name in values:
+                # merge the value into the preceding literal
+                parts[-1] += str(values[name]) + self._parts[i + 1]
+            else:
+                parts.extend([name, self._parts[i + 1]])
+
+        return Template(tuple(parts))
+
+    def render(self, values: Mapping[str, Any], unknown: Callable[[str], str]) -> str:
+        """
+        Returns the string with all variables replaced
+
+        :param values: The variable values
+        :param unknown: Called with the name of each variable missing in values, returns the text to insert or
+                        raises an exception
+        :return: The filled string
+        """
+        if len(self._parts) == 1:
+            return self._parts[0]
+
+        result = list(self._parts)
+
+        for i in range(1, len(result), 2):
+            name = result[i]
+
+            if name in values:
+                result[i] = str(values[name])
+            else:
+                result[i] = unknown(name)
+
+        return ''.join(result)
+
+
+@functools.lru_cache(maxsize=512)
+def _parse(string: str, syntax: str) -> Template:
+    return Template(tuple(re.split(syntax, string)))
@@ -98,3 +98,119 @@ def test_copy_dir_dest_exists(make_fixtures):
 
     src = LoadFilesNode({'paths': [str(make_fixtures)]})
     assert not Workflow.create([src, cp]).run()
+
+
+def test_copy_streaming(make_fixtures):
+    make_fixtures.join('testfile2.txt').write('Hello world')
+    dest = str(make_fixtures.join('folder'))
+
+    src = LoadFilesNode({'paths': [str(make_fixtures.join('*.txt'))]})
+    filter_node = FileFilterNode({'filter': [['filename', 'startswith', 'testfile2']]})
+    cp = FSCopyNode({'dest': dest})
+
+    wf = Workflow.create([src, filter_node, cp])
+    wf.set_streaming(True)
+
+    assert wf.run()
+    assert os.path.exists(os.path.join(dest, 'testfile2.txt'))
+    assert not os.path.exists(os.path.join(dest, 'testfile.txt'))
+
+
+def test_copy_streaming_failure(make_fixtures, caplog):
+    src = LoadFilesNode({'paths': [str(make_fixtures.join('folder'))]})
+    # copying a folder to an existing destination fails
+    cp = FSCopyNode({'dest': str(make_fixtures)})
+
+    wf = Workflow.create([src, cp])
+    wf.set_streaming(True)
+
+    # the node fails like when running it normally
+    assert not wf.run()
+    assert 'Destination directory already exists' in caplog.text
+    assert 'unexpected exception' not in caplog.text
+
+
+def test_copy_parallel(make_fixtures):
+    for n in range(10):
+        make_fixtures.join('file_%s.log' % n).write('Log %s' % n)
+
+    dest = str(make_fixtures.join('_temp3'))
+    src = LoadFilesNode({'paths': [str(make_fixtures.join('*.log'))]})
+    cp = FSCopyNode({'dest': dest, 'workers': 4})
+
+    progress = []
+    wf = Workflow.create([src, cp])
+    wf.add_listener(Workflow.EVENT_NODE_PROGRESS, lambda data: progress.append(data))
+    assert wf.run()
+
+    for n in range(10):
+        with open(os.path.join(dest, 'file_%s.log' % n)) as f:
+            assert f.read() == 'Log %s' % n
+
+    assert len(cp.get_output().find('*')) == 10
+    assert len(progress) == 10
+    assert progress[-1]['node'] is cp
+    assert progress[-1]['files_done'] == progress[-1]['files_total'] == 10
+    assert progress[-1]['bytes_done'] == progress[-1]['bytes_total']
+
+
+def test_copy_dir_parallel(make_fixtures):
+    make_fixtures.join('folder', 'sub.txt').write('Sub')
+    os.utime(str(make_fixtures.join('folder')), (1000000, 1000000))
+    dest = str(make_fixtures.join('_temp3'))
+
+    src = LoadFilesNode({'paths': [str(make_fixtures.join('folder'))]})
+    cp = FSCopyNode({'dest': dest, 'workers': 4})
+    assert Workflow.create([src, cp]).run()
+
+    with open(os.path.join(dest, 'sub.txt')) as f:
+        assert f.read() == 'Sub'
+
+    assert os.path.getmtime(dest) == 1000000
+
+
+def test_copy_incremental(make_fixtures):
+    make_fixtures.join('folder', 'sub.txt').write('Sub')
+    dest = str(make_fixtures.join('_temp4'))
+
+    def run_copy(compare_content=False):
+        src = LoadFilesNode({'paths': [str(make_fixtures.join('folder'))]})
+        cp = FSCopyNode({'dest': dest, 'incremental': True, 'compare_content': compare_content})
+        progress = []
+        wf = Workflow.create([src, cp])
+        wf.add_listener(Workflow.EVENT_NODE_PROGRESS, lambda data: progress.append(data['source']))
+        assert wf.run()
+        assert cp.get_output().first().get_absolute_path() == dest
+        return progress
+
+    assert run_copy() == [str(make_fixtures.join('folder', 'sub.txt'))]
+    assert run_copy() == []
+
+    # destination exists, new files are merged
+    make_fixtures.join('folder', 'new.txt').write('New')
+    assert run_copy() == [str(make_fixtures.join('folder', 'new.txt'))]
+
+    # same size, different modification time
+    make_fixtures.join('folder', 'sub.txt').write('Bus')
+    os.utime(str(make_fixtures.join('folder', 'sub.txt')), (1000000, 1000000))
+    assert run_copy(compare_content=True) == [str(make_fixtures.join('folder', 'sub.txt'))]
+    os.utime(os.path.join(dest, 'sub.txt'), (2000000, 2000000))
+    assert run_copy(compare_content=True) == []
+    assert run_copy() == [str(make_fixtures.join('folder', 'sub.txt'))]
+
+    with open(os.path.join(dest, 'sub.txt')) as f:
+        assert f.read() == 'Bus'
+
+
+def test_copy_file_incremental(make_fixtures):
+    dest = str(make_fixtures.join('folder'))
+
+    for expected in [1, 0]:
+        src = LoadFilesNode({'paths': [str(make_fixtures.join('testfile.txt'))]})
+        cp = FSCopyNode({'dest': dest, 'incremental': True})
+        progress = []
+        wf = Workflow.create([src, cp])
+        wf.add_listener(Workflow.EVENT_NODE_PROGRESS, lambda data: progress.append(data))
+        assert wf.run()
+        assert len(progress) == expected
+        assert cp.get_output().first().get_absolute_path() == os.path.join(dest, 'testfile.txt')
@@ -7,7 +7,7 @@
 
 import pytest
 import re
-from atraxiflow.base.filesystem import FileFilterNode, LoadFilesNode
+from atraxiflow.base.filesystem import FileFilter, FileFilterNode, LoadFilesNode
 from atraxiflow.core import *
 
 @pytest.fixture(scope="module")
@@ -165,3 +165,71 @@ def test_filter_filetype(file_fixture):
     ])
     assert Workflow.create([fin, fn]).run()
     assert fn.get_output().size() == 1
+
+    fn.property("filter").set_value([
+        ['type', '=', 'dir']
+    ])
+    assert not Workflow.create([fin, fn]).run()
+
+
+def test_filter_date_modified(file_fixture):
+    fin = LoadFilesNode({'paths': [str(file_fixture.join('file_*'))]})
+
+    for op, value, expected in [('=', 'today', 4), ('<', 'today', 0), ('>=', 'today', 4), ('>', 'yesterday', 4),
+                                ('<=', 'yesterday', 0), ('!=', 'tomorrow', 4)]:
+        fn = FileFilterNode({'filter': [['date_modified', op, value]]})
+        assert Workflow.create([fin, fn]).run()
+        assert fn.get_output().size() == expected
+
+
+def test_filter_plan_order(file_fixture):
+    fn = FileFilterNode({
+        'filter': [
+            ['file_size', '>', '120K'],
+            ['filename', 'matches', re.compile(r'file_\w+_\d+_end')],
+            ['filename', 'endswith', '_end']
+        ]
+    })
+    fn.ctx = Workflow().get_context()
+
+    plan = fn.compile_filters()
+    assert [f.cost for f in plan] == [FileFilter.COST_STRING, FileFilter.COST_REGEX, FileFilter.COST_STAT]
+
+
+def test_filter_short_circuit(file_fixture):
+    fn = FileFilterNode({
+        'filter': [
+            ['file_size', '>', '120K'],
+            ['filename', 'contains', 'these']
+        ]
+    })
+
+    fin = LoadFilesNode({'paths': [str(file_fixture.join('file_*'))]})
+    assert Workflow.create([fin, fn]).run()
+    assert fn.get_output().size() == 1
+
+    # only the resource passing the filename filter had to be stat'ed
+    stated = [res for res in fin.get_output().items() if res._stat_loaded]
+    assert stated == fn.get_output().items()
+
+
+def test_filter_columns(file_fixture):
+    pytest.importorskip('numpy')
+
+    filters = [
+        [['file_size', '>', '120K'], ['file_size', '<', '4M']],
+        [['type', '=', 'file'], ['filename', 'endswith', '_end']],
+        [['date_modified', '!=', 'today']],
+        [['date_created', '=', 'today'], ['file_size', '<=', '578K']],
+    ]
+
+    for filter in filters:
+        fin = LoadFilesNode({'paths': [str(file_fixture.join('*'))]})
+        fn_rows = FileFilterNode({'filter': filter})
+        fn_columns = FileFilterNode({'filter': filter})
+        fn_columns.BATCH_THRESHOLD = 0
+
+        assert Workflow.create([fin, fn_rows]).run()
+        assert Workflow.create([fin, fn_columns]).run()
+        assert [str(res) for res in fn_rows.get_output().items()] == \
+               [str(res) for res in fn_columns.get_output().items()]
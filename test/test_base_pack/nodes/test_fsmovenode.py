@@ -104,4 +104,40 @@ def test_move_single_file_opt_dry(make_fixtures, tmpdir):
     assert Workflow.create([src, move_node]).run()
 
     assert not os.path.exists(dest_dir + '/' + 'testfile0.txt')
-    assert os.path.exists(str(make_fixtures.join('testfile0.txt')))
\ No newline at end of file
+    assert os.path.exists(str(make_fixtures.join('testfile0.txt')))
+
+
+def test_move_across_filesystems(make_fixtures, tmpdir, monkeypatch):
+    import errno
+
+    def rename(src, dst):
+        raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+    monkeypatch.setattr(os, 'rename', rename)
+
+    make_fixtures.join('folder', 'sub').mkdir()
+    make_fixtures.join('folder', 'sub', 'file.txt').write('Sub')
+    make_fixtures.join('folder', 'link').mksymlinkto('sub')
+    os.utime(str(make_fixtures.join('folder', 'sub')), (1000000, 1000000))
+
+    dest_dir = str(tmpdir)
+    src = LoadFilesNode({'paths': [str(make_fixtures.join('testfile*.txt')), str(make_fixtures.join('folder'))]})
+    move_node = FSMoveNode({'dest': dest_dir, 'workers': 2})
+
+    progress = []
+    wf = Workflow.create([src, move_node])
+    wf.add_listener(Workflow.EVENT_NODE_PROGRESS, lambda data: progress.append(data))
+    assert wf.run()
+
+    for n in range(0, 5):
+        assert os.path.exists(os.path.join(dest_dir, 'testfile%s.txt' % n))
+        assert not os.path.exists(str(make_fixtures.join('testfile%s.txt' % n)))
+
+    assert not os.path.exists(str(make_fixtures.join('folder')))
+    with open(os.path.join(dest_dir, 'folder', 'sub', 'file.txt')) as f:
+        assert f.read() == 'Sub'
+
+    assert os.readlink(os.path.join(dest_dir, 'folder', 'link')) == 'sub'
+    assert os.path.getmtime(os.path.join(dest_dir, 'folder', 'sub')) == 1000000
+    assert len(progress) == 6
+    assert move_node.get_output().size() == 6
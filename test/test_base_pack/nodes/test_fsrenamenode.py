@@ -81,3 +81,83 @@ def test_rename_by_repl_and_name_prop(tmpdir):
     assert os.path.exists(str(tmpdir.join('foobar.ext')))
 
     assert str(tmpdir.join('foobar.ext')) == node.get_output().first().get_absolute_path()
+
+
+def test_rename_swap(tmpdir):
+    # a.b -> b.a and b.a -> a.b
+    for s in ['a.b', 'b.a', 'c.d']:
+        tmpdir.join(s).write(s)
+
+    res = LoadFilesNode({'paths': [str(tmpdir.join('*'))]})
+    node = FSRenameNode({'name': '{file.path}/{file.extension}.{file.basename}'})
+
+    assert Workflow.create([res, node]).run()
+    assert tmpdir.join('b.a').read() == 'a.b'
+    assert tmpdir.join('a.b').read() == 'b.a'
+    assert tmpdir.join('d.c').read() == 'c.d'
+    assert sorted(os.listdir(str(tmpdir))) == ['a.b', 'b.a', 'd.c']
+
+
+def test_rename_chain(tmpdir):
+    for n in range(1, 4):
+        tmpdir.join('file%s' % n).write(str(n))
+
+    # file1 -> file2 -> file3 -> file4, file3 has to be renamed first
+    res = LoadFilesNode({'paths': [str(tmpdir.join('file*'))]})
+    node = FSRenameNode({'replace': {
+        re.compile(r'3$'): '4',
+        re.compile(r'2$'): '3',
+        re.compile(r'1$'): '2',
+    }})
+
+    assert Workflow.create([res, node]).run()
+    assert sorted(os.listdir(str(tmpdir))) == ['file2', 'file3', 'file4']
+    assert tmpdir.join('file4').read() == '3'
+    assert tmpdir.join('file2').read() == '1'
+
+
+def test_rename_collision(tmpdir, caplog):
+    for s in ['a.txt', 'b.txt', 'c.log', 'd.log']:
+        tmpdir.join(s).write(s)
+
+    res = LoadFilesNode({'paths': [str(tmpdir.join('*.txt'))]})
+    node = FSRenameNode({'name': '{file.path}/same.txt'})
+
+    assert not Workflow.create([res, node]).run()
+    assert 'are both renamed to' in caplog.text
+
+    res = LoadFilesNode({'paths': [str(tmpdir.join('*'))]})
+    node = FSRenameNode({'replace': {'c.log': 'd.log', 'a.txt': 'e.txt'}})
+
+    assert not Workflow.create([res, node]).run()
+    assert 'd.log already exists' in caplog.text
+
+    # nothing has been renamed
+    assert sorted(os.listdir(str(tmpdir))) == ['a.txt', 'b.txt', 'c.log', 'd.log']
+
+
+def test_rename_parallel(tmpdir):
+    for folder in ['one', 'two', 'three']:
+        tmpdir.mkdir(folder)
+        for n in range(5):
+            tmpdir.join(folder, 'file%s.txt' % n).write(str(n))
+
+    res = LoadFilesNode({'paths': [str(tmpdir.join('*', '*.txt'))]})
+    node = FSRenameNode({'name': '{file.path}/{file.basename}.bak', 'workers': 3})
+
+    assert Workflow.create([res, node]).run()
+    assert node.get_output().size() == 15
+
+    for folder in ['one', 'two', 'three']:
+        assert sorted(os.listdir(str(tmpdir.join(folder)))) == ['file%s.bak' % n for n in range(5)]
+
+
+def test_rename_dry(tmpdir):
+    tmpdir.join('a.txt').write('a')
+
+    res = LoadFilesNode({'paths': [str(tmpdir.join('a.txt'))]})
+    node = FSRenameNode({'name': '{file.path}/b.txt', 'dry': True})
+
+    assert Workflow.create([res, node]).run()
+    assert os.listdir(str(tmpdir)) == ['a.txt']
+    assert node.get_output().first().get_absolute_path() == str(tmpdir.join('b.txt'))
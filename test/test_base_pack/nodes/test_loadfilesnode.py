@@ -8,6 +8,7 @@ from atraxiflow.base.filesystem import LoadFilesNode
 from atraxiflow.core import *
 
 import os
+import pytest
 
 
 def test_node(tmpdir):
@@ -29,3 +30,72 @@ def test_node(tmpdir):
     assert node.get_output().size() == 4
 
 
+@pytest.fixture
+def tree(tmpdir):
+    for path in ['a/one.txt', 'a/two.log', 'a/b/three.txt', 'a/b/c/four.txt', 'a/skip/five.txt', 'a/.hidden.txt']:
+        p = tmpdir.join(path)
+        p.ensure()
+        p.write('Hello world')
+
+    return tmpdir
+
+
+def get_names(node):
+    return sorted([res.get_filename() for res in node.get_output().items()])
+
+
+def test_scanner_recursive(tree):
+    node = LoadFilesNode({
+        'paths': [str(tree.join('a', '**', '*.txt'))],
+        'use_scanner': True
+    })
+
+    assert Workflow.create([node]).run()
+    assert get_names(node) == ['five.txt', 'four.txt', 'one.txt', 'three.txt']
+    assert node.get_output().first().get_filesize() == 11
+
+
+def test_scanner_same_as_glob(tree):
+    for pattern in [str(tree.join('a', '*')), str(tree.join('*', 'b', '*.txt')), str(tree.join('a'))]:
+        node_glob = LoadFilesNode({'paths': [pattern]})
+        node_scan = LoadFilesNode({'paths': [pattern], 'use_scanner': True})
+        assert Workflow.create([node_glob]).run()
+        assert Workflow.create([node_scan]).run()
+
+        assert sorted([res.get_absolute_path() for res in node_glob.get_output().items()]) == \
+               sorted([res.get_absolute_path() for res in node_scan.get_output().items()])
+
+
+def test_scanner_exclude(tree):
+    node = LoadFilesNode({
+        'paths': [str(tree.join('a', '**', '*.txt'))],
+        'use_scanner': True,
+        'exclude': ['skip', 'b/c']
+    })
+
+    assert Workflow.create([node]).run()
+    assert get_names(node) == ['one.txt', 'three.txt']
+
+
+def test_scanner_max_depth(tree):
+    node = LoadFilesNode({
+        'paths': [str(tree.join('a', '**', '*.txt'))],
+        'use_scanner': True,
+        'max_depth': 1
+    })
+
+    # four.txt is in a/b/c, two levels below a
+    assert Workflow.create([node]).run()
+    assert get_names(node) == ['five.txt', 'one.txt', 'three.txt']
+
+
+def test_scanner_threads(tree):
+    node = LoadFilesNode({
+        'paths': [str(tree.join('**'))],
+        'use_scanner': True,
+        'scan_threads': 4
+    })
+
+    assert Workflow.create([node]).run()
+    assert get_names(node) == sorted(['a', 'b', 'c', 'five.txt', 'four.txt', 'one.txt', 'skip', 'three.txt',
+                                      'two.log', os.path.basename(str(tree))])
@@ -6,8 +6,14 @@
 #
 
 import os
+import shutil
+import sys
+
+import pytest
+
 from atraxiflow.core import *
 from atraxiflow.base.common import ShellExecNode, EchoOutputNode
+from atraxiflow.base.filesystem import LoadFilesNode
 
 
 def test_create_node():
@@ -51,3 +57,131 @@ def test_option_output(capsys):
 
     captured = capsys.readouterr()
     assert captured[0] == 'HelloWorld\n'
+
+
+def python_cmd(code: str) -> str:
+    return '"{0}" -c "{1}"'.format(sys.executable, code)
+
+
+def test_option_output_large(capsys):
+    # more output than fits into the pipe buffers on both pipes
+    n = ShellExecNode({
+        'cmd': python_cmd("import sys; [print('out', i) or print('err', i, file=sys.stderr) for i in range(20000)]"),
+        'echo_output': True
+    })
+
+    assert Workflow.create([n]).run()
+
+    out = n.get_output().items()
+    assert out[0].get_value().splitlines() == ['out %s' % i for i in range(20000)]
+    assert out[1].get_value().splitlines() == ['err %s' % i for i in range(20000)]
+
+    captured = capsys.readouterr()
+    assert len(captured[0].splitlines()) == 40000
+
+
+def test_option_output_lines(caplog):
+    n = ShellExecNode({
+        'cmd': python_cmd("import sys; print('one'); print('warning', file=sys.stderr); sys.stdout.write('two')"),
+        'output_lines': True
+    })
+
+    assert Workflow.create([n]).run()
+    assert [res.get_value() for res in n.get_output().items()] == ['one', 'two']
+    assert 'warning' in caplog.text
+
+
+def test_for_each(tmpdir):
+    for name in ['a.txt', 'b c.txt', 'd.txt']:
+        tmpdir.join(name).write(name)
+
+    src = LoadFilesNode({'paths': [str(tmpdir.join('*.txt'))]})
+    n = ShellExecNode({
+        'cmd': python_cmd("import sys; print(open(sys.argv[1]).read())") + ' {file.absolute_path}',
+        'for_each': True,
+        'max_parallel': 2
+    })
+
+    assert Workflow.create([src, n]).run()
+
+    results = n.get_output().find('atraxiflow.CommandResource')
+    # results are in input order
+    assert [res.get_resource() for res in results] == src.get_output().items()
+    assert [res.get_stdout().strip() for res in results] == [res.get_filename() for res in src.get_output().items()]
+    assert [res.get_exit_code() for res in results] == [0, 0, 0]
+
+
+def test_for_each_on_error(tmpdir):
+    for name in ['1', '2', '3']:
+        tmpdir.join(name).write(name)
+
+    src = LoadFilesNode({'paths': [str(tmpdir.join('*'))]})
+    cmd = python_cmd("import sys; sys.exit(int(sys.argv[1]) % 2)") + ' {file.filename}'
+
+    n = ShellExecNode({'cmd': cmd, 'for_each': True})
+    assert not Workflow.create([src, n]).run()
+    # the output contains the results up to the failed command
+    assert all([res.get_exit_code() == 0 for res in n.get_output().items()])
+    assert n.get_output().size() < 3
+
+    n = ShellExecNode({'cmd': cmd, 'for_each': True, 'on_error': 'collect', 'max_parallel': 3})
+    assert Workflow.create([src, n]).run()
+    assert [res.get_exit_code() for res in n.get_output().items()] == \
+           [int(res.get_filename()) % 2 for res in src.get_output().items()]
+
+
+def test_run_async():
+    wf = Workflow.create([ShellExecNode({'cmd': python_cmd("print('async')")})])
+    wf.set_executor(Workflow.EXECUTOR_ASYNCIO)
+
+    assert wf.run()
+    assert wf.get_nodes()[0].get_output().first().get_value().strip() == 'async'
+
+
+@pytest.mark.skipif(shutil.which('awk') is None or shutil.which('sh') is None, reason='requires awk and sh')
+def test_for_each_braces(tmpdir):
+    tmpdir.join('a b.txt').write('')
+
+    src = LoadFilesNode({'paths': [str(tmpdir.join('*.txt'))]})
+    awk = ShellExecNode({'cmd': "awk 'BEGIN {print ARGV[1]}' {file.filename}", 'for_each': True})
+    sh = ShellExecNode({'cmd': "sh -c 'echo $0 ${AX_TEST_VAR}' {target}", 'for_each': True})
+
+    ctx = WorkflowContext()
+    # context variables are quoted like the resource values
+    ctx.set_symbol('target', 'x y')
+    os.environ['AX_TEST_VAR'] = 'shell'
+
+    try:
+        assert Workflow.create([src, awk, sh], ctx).run()
+    finally:
+        del os.environ['AX_TEST_VAR']
+
+    assert awk.get_output().first().get_stdout().strip() == 'a b.txt'
+    assert sh.get_output().first().get_stdout().strip() == 'x y shell'
+
+
+def test_for_each_unknown_on_error(tmpdir, caplog):
+    tmpdir.join('a.txt').write('')
+
+    src = LoadFilesNode({'paths': [str(tmpdir.join('*.txt'))]})
+    n = ShellExecNode({'cmd': 'echo {resource}', 'for_each': True, 'on_error': 'colect'})
+
+    assert not Workflow.create([src, n]).run()
+    assert 'Unknown value for on_error' in caplog.text
+
+
+def test_quote_windows(monkeypatch):
+    import platform
+    import shlex
+    import subprocess
+
+    monkeypatch.setattr(platform, 'system', lambda: 'Windows')
+
+    for value, cmd_line in [('C:\\data\\', 'type C:\\data\\'), ('a b&c.txt', 'type "a b&c.txt"'),
+                            ('a&calc.txt', 'type a^&calc.txt'), ('%PATH%', 'type ^%PATH^%')]:
+        # the command line cmd.exe gets (see ShellExecNode._start)
+        assert subprocess.list2cmdline(shlex.split('type ' + ShellExecNode._quote(value))) == cmd_line
+
+    # quotes can't be escaped for cmd.exe
+    with pytest.raises(ValueError):
+        ShellExecNode._quote('a" & calc & ".txt')
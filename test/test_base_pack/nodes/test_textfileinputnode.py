@@ -34,3 +34,87 @@ def test_read_textfile(create_testfile):
 
     assert Workflow.create([node]).run()
     assert node.get_output().first().get_value() == get_file_contents()
+
+
+def test_read_lines(tmpdir):
+    file = tmpdir.join('lines.txt')
+    file.write('one\ntwo\nthree\nfour\nfive\n')
+
+    node = TextFileInputNode({'filename': str(file), 'split': 'lines'})
+    assert Workflow.create([node]).run()
+    assert [res.get_value() for res in node.get_output().items()] == ['one', 'two', 'three', 'four', 'five']
+
+    node = TextFileInputNode({'filename': str(file), 'split': 'lines', 'chunk_size': 2})
+    assert Workflow.create([node]).run()
+    assert [res.get_value() for res in node.get_output().items()] == ['one\ntwo', 'three\nfour', 'five']
+
+
+def test_read_bytes(tmpdir):
+    file = tmpdir.join('bytes.txt')
+    file.write_binary('aäöü'.encode('utf-8'))
+
+    # ä is split between the first two chunks
+    node = TextFileInputNode({'filename': str(file), 'split': 'bytes', 'chunk_size': 2, 'encoding': 'utf-8'})
+    assert Workflow.create([node]).run()
+    assert [res.get_value() for res in node.get_output().items()] == ['a', 'ä', 'ö', 'ü']
+
+
+def test_read_unbuffered(tmpdir):
+    file = tmpdir.join('unbuffered.txt')
+    file.write_binary(b'abcd')
+
+    node = TextFileInputNode({'filename': str(file), 'split': 'bytes', 'chunk_size': 2, 'buffering': 0})
+    assert Workflow.create([node]).run()
+    assert [res.get_value() for res in node.get_output().items()] == ['ab', 'cd']
+
+    # text files can't be read unbuffered
+    node = TextFileInputNode({'filename': str(file), 'split': 'lines', 'buffering': 0})
+    assert not Workflow.create([node]).run()
+
+
+def test_read_encoding(tmpdir):
+    file = tmpdir.join('latin1.txt')
+    file.write_binary('Grüße'.encode('latin-1'))
+
+    node = TextFileInputNode({'filename': str(file), 'encoding': 'latin-1'})
+    assert Workflow.create([node]).run()
+    assert node.get_output().first().get_value() == 'Grüße'
+
+
+def test_read_missing_file(tmpdir):
+    node = TextFileInputNode({'filename': str(tmpdir.join('missing.txt')), 'split': 'lines'})
+    assert not Workflow.create([node]).run()
+
+
+def test_read_streaming(tmpdir):
+    src = tmpdir.join('lines.txt')
+    src.write('one\ntwo\nthree\n')
+    dest = tmpdir.join('out.txt')
+
+    wf = Workflow.create([
+        TextFileInputNode({'filename': str(src), 'split': 'lines'}),
+        TextValidatorNode({'rules': {'min_len': {'length': 3}}}),
+    ])
+    wf.set_streaming(True)
+    assert wf.run()
+
+    wf = Workflow.create([
+        TextFileInputNode({'filename': str(src), 'split': 'lines'}),
+        TextValidatorNode({'rules': {'min_len': {'length': 4}}}),
+    ])
+    wf.set_streaming(True)
+    assert not wf.run()
+
+    in_node = TextFileInputNode({'filename': str(src), 'split': 'lines'})
+    wf = Workflow.create([in_node, TextFileOutputNode({'filename': str(dest)})])
+    wf.set_streaming(True)
+    assert wf.run()
+    assert dest.read() == 'one\ntwo\nthree\n'
+
+
+def test_read_mmap(create_testfile):
+    node = TextFileInputNode({'filename': create_testfile, 'mmap': True, 'encoding': 'utf-8'})
+
+    assert Workflow.create([node]).run()
+    assert node.get_output().first().get_buffer() is not None
+    assert node.get_output().first().get_value() == get_file_contents()
@@ -7,6 +7,8 @@
 
 import os
 
+import pytest
+
 from atraxiflow.core import *
 from atraxiflow.base.text import *
 from atraxiflow.base.common import NullNode
@@ -70,3 +72,87 @@ def test_write_multiple_res_no_newline(tmpdir):
 
     with open(file, 'r') as f:
         assert f.read() == 'HelloWorld'
+
+
+def write_resources(values: list, properties: dict) -> bool:
+    out_node = NullNode()
+    for value in values:
+        out_node.output.add(TextResource(value))
+
+    return Workflow.create([out_node, TextFileOutputNode(properties)]).run()
+
+
+def test_write_buffered(tmpdir):
+    file = str(tmpdir.join('buffered.txt'))
+    values = ['Line %s' % n for n in range(1000)]
+
+    assert write_resources(values, {'filename': file, 'buffer_size': 100})
+
+    with open(file, 'r') as f:
+        assert f.read() == '\n'.join(values) + '\n'
+
+
+def test_write_append(tmpdir):
+    file = str(tmpdir.join('append.txt'))
+
+    assert write_resources(['Hello'], {'filename': file})
+    assert write_resources(['World'], {'filename': file, 'append': True})
+    assert write_resources(['!'], {'filename': file, 'append': True, 'atomic': True})
+
+    with open(file, 'r') as f:
+        assert f.read() == 'Hello\nWorld\n!\n'
+
+
+def test_write_atomic(tmpdir):
+    file = str(tmpdir.join('atomic.txt'))
+    tmpdir.join('atomic.txt').write('Old')
+    os.chmod(file, 0o640)
+
+    assert write_resources(['New'], {'filename': file, 'atomic': True})
+
+    with open(file, 'r') as f:
+        assert f.read() == 'New\n'
+
+    assert os.stat(file).st_mode & 0o777 == 0o640
+    assert os.listdir(str(tmpdir)) == ['atomic.txt']
+
+    # nothing is replaced if writing fails
+    class BrokenResource(TextResource):
+        def __init__(self, value):
+            super().__init__(value)
+            self.id = 'atraxiflow.TextResource'
+
+        def get_value(self):
+            raise ValueError('Broken')
+
+    out_node = NullNode()
+    out_node.output.add(TextResource('Hello'))
+    out_node.output.add(BrokenResource('World'))
+    assert not Workflow.create([out_node, TextFileOutputNode({'filename': file, 'atomic': True})]).run()
+
+    with open(file, 'r') as f:
+        assert f.read() == 'New\n'
+
+    assert os.listdir(str(tmpdir)) == ['atomic.txt']
+
+
+def test_write_gzip(tmpdir):
+    import gzip
+
+    file = str(tmpdir.join('compressed.txt.gz'))
+
+    assert write_resources(['Hello', 'World'], {'filename': file, 'compression': 'gzip'})
+    assert write_resources(['!'], {'filename': file, 'compression': 'gzip', 'append': True})
+
+    with gzip.open(file, 'rt') as f:
+        assert f.read() == 'Hello\nWorld\n!\n'
+
+
+def test_write_zstd(tmpdir):
+    zstandard = pytest.importorskip('zstandard')
+    file = str(tmpdir.join('compressed.txt.zst'))
+
+    assert write_resources(['Hello', 'World'], {'filename': file, 'compression': 'zstd'})
+
+    with zstandard.open(file, 'rt') as f:
+        assert f.read() == 'Hello\nWorld\n'
@@ -5,6 +5,8 @@
 # For more information on licensing see LICENSE file
 #
 
+import re
+
 from atraxiflow.core import *
 from atraxiflow.base.text import TextValidatorNode
 from atraxiflow.base.common import NullNode
@@ -106,3 +108,94 @@ def test_rule_regex_must_match():
     out_node.output.add(TextResource('HelloWorld'))
 
     assert not Workflow.create([out_node, node]).run()
+
+
+def test_rule_regex_mapped(tmpdir):
+    file = tmpdir.join('mapped.txt')
+    file.write_binary('Grüße aus Köln'.encode('utf-8'))
+    res = TextResource.from_file(str(file), 'utf-8')
+
+    out_node = NullNode()
+    out_node.output.add(res)
+
+    for pattern, mode, valid in [('Grüße', 'must_match', True), (re.compile(r'\S+ aus'), 'must_match', True),
+                                 ('Köln', 'must_match', False), ('Köln', 'must_not_match', True)]:
+        node = TextValidatorNode({'rules': {'regex': {'pattern': pattern, 'mode': mode}}})
+        assert Workflow.create([out_node, node]).run() == valid
+
+    node = TextValidatorNode({'rules': {'regex': {'pattern': 'Grüße'}, 'max_len': {'length': 14}}})
+    assert Workflow.create([out_node, node]).run()
+
+
+def test_rule_regex_mapped_utf16(tmpdir):
+    file = tmpdir.join('mapped_utf16.txt')
+    file.write_binary('Grüße aus Köln'.encode('utf-16'))
+
+    out_node = NullNode()
+    out_node.output.add(TextResource.from_file(str(file), 'utf-16'))
+
+    # the bytes are decoded, since the pattern can't be encoded in UTF-16
+    for pattern, valid in [('Grüße', True), (r'\w+ aus', True), ('Köln', False)]:
+        node = TextValidatorNode({'rules': {'regex': {'pattern': pattern}}})
+        assert Workflow.create([out_node, node]).run() == valid
+
+
+def test_rule_regex_mapped_same_result(tmpdir):
+    # "." matches single bytes, Shift JIS uses ASCII bytes (here "\\") in multibyte characters
+    cases = [('utf-8', 'äbc', r'^.{3}$'), ('utf-8', 'äbc', r'^\w+$'), ('utf-8', 'Äbc', '(?i)äbc'),
+             ('shift_jis', 'ソ', r'.*\\'), ('latin-1', 'Grüße', r'Gr.+e$'), ('utf-8', 'a b', '^a b$')]
+
+    for n, (encoding, text, pattern) in enumerate(cases):
+        file = tmpdir.join('same_%s.txt' % n)
+        file.write_binary(text.encode(encoding))
+
+        results = []
+        for res in (TextResource.from_file(str(file), encoding), TextResource(text)):
+            out_node = NullNode()
+            out_node.output.add(res)
+            node = TextValidatorNode({'rules': {'regex': {'pattern': pattern}}})
+            results.append(Workflow.create([out_node, node]).run())
+
+        assert results[0] == results[1], (encoding, text, pattern)
+
+
+def test_report_all_failures():
+    node = TextValidatorNode({
+        'rules': {
+            'min_len': {'length': 3},
+            'regex': {'pattern': r'[a-z]+$'},
+            'unknown_rule': {}
+        }
+    })
+
+    out_node = NullNode()
+    for value in ['abc', 'ab', 'ABC', 'A', 'abcd']:
+        out_node.output.add(TextResource(value))
+
+    assert not Workflow.create([out_node, node]).run()
+    assert node.get_failures() == {'min_len': 2, 'regex': 2}
+
+    assert [rule.name for rule in node.compile_rules()] == ['min_len', 'regex']
+
+
+def test_validate_parallel(tmpdir):
+    rules = {
+        'min_len': {'length': 3},
+        'regex': {'pattern': re.compile(r'[a-z]+$')}
+    }
+
+    out_node = NullNode()
+    for n in range(200):
+        out_node.output.add(TextResource(['abc', 'ab', 'ABC', 'A', 'abcd'][n % 5]))
+
+    file = tmpdir.join('mapped.txt')
+    file.write('ABCD')
+    out_node.output.add(TextResource.from_file(str(file)))
+
+    serial = TextValidatorNode({'rules': rules})
+    assert not Workflow.create([out_node, serial]).run()
+
+    parallel = TextValidatorNode({'rules': rules, 'processes': 2, 'parallel_threshold': 20})
+    assert not Workflow.create([out_node, parallel]).run()
+
+    assert parallel.get_failures() == serial.get_failures() == {'min_len': 80, 'regex': 81}
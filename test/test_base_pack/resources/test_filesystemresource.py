@@ -4,6 +4,56 @@
 # Copyright (C) 2019  Sean Mertiens
 # For more information on licensing see LICENSE file
 #
+import os
+
 from atraxiflow.base.resources import FilesystemResource
 
 
+def test_file_info(tmpdir):
+    p = tmpdir.join('testfile.txt')
+    p.write('Hello world')
+
+    res = FilesystemResource(str(p))
+    assert res.exists()
+    assert res.is_file()
+    assert not res.is_folder()
+    assert not res.is_symlink()
+    assert res.get_filesize() == 11
+
+    res = FilesystemResource(str(tmpdir.join('missing.txt')))
+    assert not res.exists()
+    assert not res.is_file()
+
+
+def test_stat_cached(tmpdir, monkeypatch):
+    p = tmpdir.join('testfile.txt')
+    p.write('Hello world')
+    res = FilesystemResource(str(p))
+
+    calls = []
+    lstat = os.lstat
+    monkeypatch.setattr(os, 'lstat', lambda path: calls.append(path) or lstat(path))
+
+    assert res.is_file()
+    assert res.get_filesize() == 11
+    res.get_last_modified()
+    res.get_created()
+    assert len(calls) == 1
+
+    p.write('Hello world, again')
+    assert res.get_filesize() == 11
+
+    res.invalidate()
+    assert res.get_filesize() == 18
+    assert len(calls) == 2
+
+
+def test_from_dir_entry(tmpdir):
+    tmpdir.join('testfile.txt').write('Hello world')
+    tmpdir.mkdir('folder')
+
+    resources = {entry.name: FilesystemResource.from_dir_entry(entry) for entry in os.scandir(str(tmpdir))}
+
+    assert resources['testfile.txt'].is_file()
+    assert resources['testfile.txt'].get_filesize() == 11
+    assert resources['folder'].is_folder()
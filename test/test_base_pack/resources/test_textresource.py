@@ -0,0 +1,42 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+
+import pickle
+
+from atraxiflow.base.resources import TextResource
+
+
+def test_text():
+    res = TextResource('Hello world')
+
+    assert res.get_value() == 'Hello world'
+    assert res.get_buffer() is None
+    assert str(res) == 'Hello world'
+
+
+def test_mapped_text(tmpdir):
+    file = tmpdir.join('mapped.txt')
+    file.write_binary(('Grüße ' * 20).encode('utf-8'))
+
+    res = TextResource.from_file(str(file), 'utf-8')
+
+    assert res.id == 'atraxiflow.TextResource'
+    assert res.get_value() == 'Grüße ' * 20
+    assert res.get_buffer()[:4] == 'Grü'.encode('utf-8')
+    assert str(res) == ('Grüße ' * 10) + '... (160 bytes)'
+
+    copy = pickle.loads(pickle.dumps(res))
+    assert copy.get_value() == res.get_value()
+
+
+def test_mapped_empty_file(tmpdir):
+    file = tmpdir.join('empty.txt')
+    file.write('')
+
+    res = TextResource.from_file(str(file))
+    assert res.get_value() == ''
+    assert str(res) == ''
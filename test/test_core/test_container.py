@@ -30,6 +30,7 @@ class DemoResource3(Resource):
 def test_create_container():
     container = Container([DemoResource1(), DemoResource2()])
     assert isinstance(container, Container)
+    assert container.size() == 2
 
 
 def test_find_nodes():
@@ -53,3 +54,60 @@ def test_add_nodes():
     res = DemoResource1()
     container.add(res)
     assert container.items() == [res]
+
+
+def test_find_mixed_order():
+    items = [DemoResource1(), DemoResource2(), DemoResource1(), DemoResource3(), DemoResource2()]
+    container = Container(*items)
+
+    assert container.find('*Resource1') == [items[0], items[2]]
+    assert container.find('{}.*'.format(DemoResource1.__module__)) == items
+    assert container.find('*Resource2') == [items[1], items[4]]
+    assert container.find('unknown') == []
+    assert container.find('unknown*') == []
+
+
+def test_find_after_clear():
+    container = Container(DemoResource1(), DemoResource2())
+    assert len(container.find('*Resource1')) == 1
+
+    container.clear()
+    assert container.find('*Resource1') == []
+
+    res = DemoResource3()
+    container.add(res)
+    assert container.find('*Resource3') == [res]
+    assert container.find('{}.*'.format(DemoResource3.__module__)) == [res]
+
+
+def test_streaming_container():
+    pulled = []
+
+    def produce():
+        for res in [DemoResource1(), DemoResource2(), DemoResource1()]:
+            pulled.append(res)
+            yield res
+
+    container = Container.from_iterable(produce())
+    assert container.is_streaming()
+    assert pulled == []
+
+    streamed = container.stream('*Resource1')
+    assert next(streamed) is pulled[0]
+    assert len(pulled) == 1
+
+    assert list(streamed) == [pulled[2]]
+    assert not container.is_streaming()
+
+    # streamed resources are not kept
+    assert container.items() == []
+
+
+def test_streaming_container_materialize():
+    test1 = DemoResource1()
+    test2 = DemoResource2()
+    container = Container.from_iterable(iter([test1, test2]))
+
+    assert container.find('*Resource2') == [test2]
+    assert container.size() == 2
+    assert list(container.stream()) == [test1, test2]
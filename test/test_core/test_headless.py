@@ -0,0 +1,36 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+import os
+import subprocess
+import sys
+
+import atraxiflow
+
+HEADLESS_SCRIPT = '''
+import sys
+# importing PySide2 fails from now on
+sys.modules['PySide2'] = None
+
+from atraxiflow.base.common import NullNode
+from atraxiflow.base.filesystem import LoadFilesNode, FileFilterNode, FSRenameNode
+from atraxiflow.base.text import TextFileInputNode
+from atraxiflow.creator.wayfiles import Wayfile
+from atraxiflow.core import Workflow
+
+assert Workflow.create([NullNode(), NullNode()]).run()
+assert 'atraxiflow.base.filesystem_ui' not in sys.modules
+print('ok')
+'''
+
+
+def test_run_without_pyside():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.dirname(os.path.dirname(atraxiflow.__file__))
+    result = subprocess.run([sys.executable, '-c', HEADLESS_SCRIPT], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            env=env, universal_newlines=True)
+
+    assert result.stdout.strip() == 'ok', result.stderr
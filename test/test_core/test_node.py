@@ -64,3 +64,31 @@ def test_fill_properties():
     assert test.property('prop_str').value() == 'Hello World'
     assert test.property('prop_bool').value() == False
     assert test.property('prop_list').value() == ['my_list']
+
+
+class DemoNodeUI(NodeUIAdapter):
+
+    def get_ui(self, node_widget):
+        return 'ui of %s' % self.node.property('prop_str').value()
+
+    def apply_ui_data(self):
+        self.node.property('prop_str').set_value('From ui')
+
+
+class DemoUINode(DemoNode):
+    UI_ADAPTER = __name__ + '.DemoNodeUI'
+
+
+def test_ui_adapter():
+    import pickle
+
+    node = DemoUINode()
+    assert DemoNode().get_ui_adapter() is None
+    assert node.get_ui(None) == 'ui of Default value'
+    assert node.get_ui_adapter() is node.get_ui_adapter()
+
+    node.apply_ui_data()
+    assert node.property('prop_str').value() == 'From ui'
+
+    # the adapter is not pickled
+    assert pickle.loads(pickle.dumps(node)).get_ui_adapter() is not node.get_ui_adapter()
@@ -0,0 +1,124 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+import json
+import time
+
+import pytest
+
+from atraxiflow.base.resources import TextResource
+from atraxiflow.core import *
+from atraxiflow.profiling import format_profile, to_chrome_trace
+
+
+class SleepNode(Node):
+
+    def __init__(self, seconds: float = 0.05, resources: int = 1):
+        super().__init__({}, {})
+        self.seconds = seconds
+        self.resources = resources
+
+    def stream(self, ctx: WorkflowContext):
+        for n in range(self.resources):
+            time.sleep(self.seconds)
+            yield TextResource(str(n))
+
+    def run(self, ctx: WorkflowContext):
+        self.output.clear()
+        for res in self.stream(ctx):
+            self.output.add(res)
+
+        return True
+
+
+class CountNode(Node):
+
+    def __init__(self):
+        super().__init__({}, {})
+
+    def stream(self, ctx: WorkflowContext):
+        for res in self.get_input().stream():
+            yield res
+
+    def run(self, ctx: WorkflowContext):
+        self.output.clear()
+        for res in self.get_input().items():
+            self.output.add(res)
+
+        return True
+
+
+def run_profiled(wf: Workflow) -> list:
+    profiles = []
+    wf.set_profiling(True)
+    wf.add_listener(Workflow.EVENT_NODE_RUN_FINISHED, lambda data: profiles.append(data['profile']))
+
+    assert wf.run()
+    assert profiles == wf.get_profile()
+
+    return profiles
+
+
+def test_no_profile():
+    data = []
+    wf = Workflow.create([SleepNode(0)])
+    wf.add_listener(Workflow.EVENT_NODE_RUN_FINISHED, lambda d: data.append(d))
+
+    assert wf.run()
+    assert 'profile' not in data[0]
+
+
+@pytest.mark.parametrize('executor', [Workflow.EXECUTOR_SEQUENTIAL, Workflow.EXECUTOR_THREADS,
+                                      Workflow.EXECUTOR_PROCESSES, Workflow.EXECUTOR_ASYNCIO])
+def test_profile(executor):
+    source = SleepNode(0.05, 3)
+    count = CountNode()
+    wf = Workflow.create([source, count])
+    wf.set_executor(executor)
+
+    profiles = run_profiled(wf)
+
+    assert [p['node'] for p in profiles] == [source, count]
+    assert profiles[0]['name'] == 'SleepNode'
+    assert profiles[0]['wall_time'] >= 0.15
+    assert profiles[1]['wall_time'] < 0.15
+    assert (profiles[0]['inputs'], profiles[0]['outputs']) == (0, 3)
+    assert (profiles[1]['inputs'], profiles[1]['outputs']) == (3, 3)
+
+    if executor == Workflow.EXECUTOR_ASYNCIO:
+        assert profiles[0]['cpu_time'] is None
+    else:
+        # sleeping does not use the CPU
+        assert profiles[0]['cpu_time'] < 0.1
+
+
+def test_profile_streaming():
+    source = SleepNode(0.05, 3)
+    count = CountNode()
+    wf = Workflow.create([source, count])
+    wf.set_streaming(True)
+
+    profiles = run_profiled(wf)
+
+    # the time spent in the source is not counted for the consuming node
+    assert [p['node'] for p in profiles] == [source, count]
+    assert profiles[0]['wall_time'] >= 0.15
+    assert profiles[1]['wall_time'] < 0.05
+    assert (profiles[1]['inputs'], profiles[1]['outputs']) == (3, 3)
+
+
+def test_reports():
+    profiles = run_profiled(Workflow.create([SleepNode(0.01), CountNode()]))
+
+    table = format_profile(profiles).split('\n')
+    assert table[1].startswith('SleepNode')
+    assert table[-1].startswith('Total')
+
+    trace = json.loads(json.dumps(to_chrome_trace(profiles, 'test')))
+    assert [e['name'] for e in trace['traceEvents']] == ['SleepNode', 'CountNode']
+    assert trace['traceEvents'][0]['ts'] == 0
+    assert trace['traceEvents'][1]['ts'] >= trace['traceEvents'][0]['dur']
+    assert trace['traceEvents'][1]['args']['inputs'] == 1
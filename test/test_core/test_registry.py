@@ -0,0 +1,108 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+import json
+
+import pytest
+
+from atraxiflow.base.common import EchoOutputNode, NullNode
+from atraxiflow.core import *
+from atraxiflow.exceptions import ExtensionException
+from atraxiflow.preferences import PreferencesProvider
+from atraxiflow.registry import NodeRegistry
+
+
+def fail_boot(self, extensions=None):
+    raise AssertionError('Extensions should not be booted')
+
+
+@pytest.fixture
+def registry(tmpdir, monkeypatch):
+    # the developer's cache file is not touched
+    registry = NodeRegistry(str(tmpdir.join('node_cache.json')))
+    monkeypatch.setattr('atraxiflow.registry._registry', registry)
+    return registry
+
+
+def create_extension(tmpdir, monkeypatch, name: str) -> PreferencesProvider:
+    pkg = tmpdir.mkdir(name)
+    pkg.join('__init__.py').write('')
+    pkg.join('flow_extension.py').write(
+        'from atraxiflow.base.common import NullNode\n\n\n'
+        'def boot(ctx):\n'
+        '    ctx.publish_nodes("Test", [NullNode])\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    preferences = PreferencesProvider()
+    preferences.set('extensions', [name])
+    return preferences
+
+
+def test_workflow_does_not_load_extensions(monkeypatch):
+    monkeypatch.setattr(WorkflowContext, 'load_extensions', fail_boot)
+
+    Workflow.create([NullNode()]).run()
+
+
+def test_get_nodes(registry):
+    ctx = WorkflowContext()
+    ctx.publish_nodes('Custom', [NullNode])
+
+    nodes = ctx.get_nodes()
+    assert EchoOutputNode in nodes['AtraxiFlow']['Common']
+    assert nodes['Custom'] == [NullNode]
+
+
+def test_cache(tmpdir, monkeypatch):
+    cache_file = str(tmpdir.join('node_cache.json'))
+    ctx = WorkflowContext()
+
+    nodes = NodeRegistry(cache_file).get_nodes(ctx)
+    assert EchoOutputNode in nodes['AtraxiFlow']['Common']
+
+    with open(cache_file, 'r') as f:
+        cache = json.load(f)
+
+    key = list(cache.keys())[0]
+    assert 'atraxiflow.base.common.EchoOutputNode' in cache[key]['AtraxiFlow']['Common']
+
+    # a new process reads the nodes from the cache
+    monkeypatch.setattr(WorkflowContext, 'load_extensions', fail_boot)
+    registry = NodeRegistry(cache_file)
+    assert registry.get_nodes(ctx) == nodes
+
+    # outdated entries are replaced
+    monkeypatch.undo()
+    with open(cache_file, 'w') as f:
+        json.dump({key[:-1] + 'x': {}}, f)
+
+    assert NodeRegistry(cache_file).get_nodes(ctx) == nodes
+
+    with open(cache_file, 'r') as f:
+        assert list(json.load(f).keys()) == [key]
+
+
+def test_get_node_class(registry):
+    assert registry.get_node_class('atraxiflow.base.common.EchoOutputNode') is EchoOutputNode
+
+    with pytest.raises(ExtensionException):
+        registry.get_node_class('atraxiflow.base.common.MissingNode')
+
+
+def test_custom_extensions(tmpdir, monkeypatch, registry):
+    ctx = WorkflowContext(create_extension(tmpdir, monkeypatch, 'ax_registry_ext'))
+
+    nodes = ctx.get_nodes()
+    assert nodes == {'Test': [NullNode]}
+
+    with open(registry.get_cache_file(), 'r') as f:
+        cache = json.load(f)
+
+    assert list(cache.values()) == [{'Test': ['atraxiflow.base.common.NullNode']}]
+    assert list(cache.keys())[0].startswith('ax_registry_ext:')
+
+    # the default extensions are cached separately
+    assert 'AtraxiFlow' in registry.get_nodes(WorkflowContext())
@@ -0,0 +1,58 @@
+#
+# AtraxiFlow - Flexible python workflow tool
+#
+# Copyright (C) 2019  Sean Mertiens
+# For more information on licensing see LICENSE file
+#
+import pytest
+
+from atraxiflow.core import Workflow
+from atraxiflow.data import StringValueProcessor
+from atraxiflow.template import Template, SYNTAX_ANY
+
+
+def unknown(name):
+    return '?'
+
+
+def test_render():
+    template = Template.get('{a} and {b}, {a}!')
+
+    assert template.get_variables() == ['a', 'b', 'a']
+    assert template.render({'a': 'one', 'b': 2}, unknown) == 'one and 2, one!'
+    assert template.render({'a': 'one'}, unknown) == 'one and ?, one!'
+
+
+def test_cached():
+    assert Template.get('{file.basename}.bak', SYNTAX_ANY) is Template.get('{file.basename}.bak', SYNTAX_ANY)
+    assert Template.get('{file.basename}.bak').get_variables() == []
+
+
+def test_bind():
+    template = Template.get('{a}/{b}/{c}').bind({'b': 'two'})
+
+    assert template.get_variables() == ['a', 'c']
+    assert template.render({'a': 'one', 'c': 'three'}, unknown) == 'one/two/three'
+
+
+def test_process_str_unknown(caplog):
+    ctx = Workflow().get_context()
+    ctx.set_symbol('known', 'yes')
+
+    assert ctx.process_str('{known} {unknown} {known}') == 'yes {unknown} yes'
+    assert 'Unknown variable: unknown' in caplog.text
+
+
+def test_string_value_processor():
+    ctx = Workflow().get_context()
+    ctx.set_symbol('ctx.var', 'context')
+    svp = StringValueProcessor(ctx).add_variable('file.basename', 'notes')
+
+    assert svp.parse('{ctx.var}/{file.basename}.txt') == 'context/notes.txt'
+    assert svp.compile('{ctx.var}/{file.basename}.txt')({'file.basename': 'other'}) == 'context/other.txt'
+
+    with pytest.raises(Exception, match='Unknown variable: missing'):
+        svp.parse('{missing}')
+
+    with pytest.raises(Exception, match='Unknown variable: missing'):
+        svp.compile('{missing}')()
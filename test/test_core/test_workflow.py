@@ -8,6 +8,8 @@
 from atraxiflow.core import *
 from atraxiflow.base.common import *
 from atraxiflow.base.filesystem import LoadFilesNode
+from atraxiflow.base.resources import TextResource
+from atraxiflow.properties import Property
 
 def test_add_nodes():
     wf = Workflow()
@@ -19,3 +21,293 @@ def test_add_nodes():
 def test_run_workflow():
     node = LoadFilesNode({'paths': ['./*']})
     Workflow.create([node, EchoOutputNode()]).run()
+
+
+class RecordingNode(Node):
+
+    def __init__(self, properties=None):
+        node_properties = {
+            'fail': Property(expected_type=bool, required=False, default=False)
+        }
+        super().__init__(node_properties, properties)
+
+    def run(self, ctx: WorkflowContext):
+        self.output.clear()
+
+        if self.has_input():
+            for res in self.get_input().items():
+                self.output.add(res)
+
+        self.output.add(TextResource(self.id))
+        return not self.property('fail').value()
+
+
+def test_run_graph_fan_out():
+    root = RecordingNode()
+    branch1 = RecordingNode()
+    branch2 = RecordingNode()
+    join = RecordingNode()
+
+    root.id = 'root'
+    branch1.id = 'branch1'
+    branch2.id = 'branch2'
+    join.id = 'join'
+
+    branch1.set_input(root)
+    branch2.set_input(root)
+    join.add_input(branch1)
+    join.add_input(branch2)
+
+    started = []
+    wf = Workflow.create([root, branch1, branch2, join])
+    wf.set_executor(Workflow.EXECUTOR_THREADS, max_workers=2)
+    wf.add_listener(Workflow.EVENT_NODE_RUN_STARTED, lambda data: started.append(data['node']))
+
+    assert wf.run()
+    assert started[0] is root
+    assert started[-1] is join
+    assert [res.get_value() for res in join.get_output().items()] == ['root', 'branch1', 'root', 'branch2', 'join']
+
+
+def test_run_graph_implicit_inputs():
+    node1 = RecordingNode()
+    node2 = RecordingNode()
+
+    wf = Workflow.create([node1, node2])
+    wf.set_executor(Workflow.EXECUTOR_THREADS)
+
+    assert wf.run()
+    assert node2.get_inputs() == [node1]
+    assert node2.get_output().size() == 2
+
+
+class BarrierNode(RecordingNode):
+    """
+    Waits until two BarrierNodes are running at the same time
+    """
+    barrier = None
+
+    def run(self, ctx: WorkflowContext):
+        self.barrier.wait(timeout=5)
+        return super().run(ctx)
+
+
+def test_run_graph_independent_roots():
+    import threading
+
+    BarrierNode.barrier = threading.Barrier(2)
+    load_a, copy_a, load_b, copy_b = BarrierNode(), RecordingNode(), BarrierNode(), RecordingNode()
+    copy_a.set_input(load_a)
+    copy_b.set_input(load_b)
+
+    # load_b does not wait for copy_a, although it follows it in the list
+    wf = Workflow.create([load_a, copy_a, load_b, copy_b])
+    wf.set_executor(Workflow.EXECUTOR_THREADS, max_workers=2)
+
+    assert wf.run()
+    assert not load_b.has_input()
+    assert copy_b.get_output().size() == 2
+
+
+def test_run_graph_failure_stops_dependents():
+    finished = []
+    node1 = RecordingNode({'fail': True})
+    node2 = RecordingNode()
+
+    wf = Workflow.create([node1, node2])
+    wf.set_executor(Workflow.EXECUTOR_THREADS)
+    wf.add_listener(Workflow.EVENT_RUN_FINISHED, lambda data: finished.append(data))
+
+    assert not wf.run()
+    assert node2.get_output().size() == 0
+    assert finished == [{'errors': True, 'nodes_processed': 1}]
+
+
+def test_run_graph_cycle():
+    node1 = RecordingNode()
+    node2 = RecordingNode()
+    node1.set_input(node2)
+    node2.set_input(node1)
+
+    wf = Workflow.create([node1, node2])
+    wf.set_executor(Workflow.EXECUTOR_THREADS)
+
+    assert not wf.run()
+
+
+def test_run_graph_processes():
+    node1 = RecordingNode()
+    node2 = RecordingNode()
+
+    wf = Workflow.create([node1, node2])
+    wf.set_executor(Workflow.EXECUTOR_PROCESSES, max_workers=2)
+
+    assert wf.run()
+    assert node2.get_output().size() == 2
+
+
+class SymbolNode(RecordingNode):
+
+    def run(self, ctx: WorkflowContext):
+        ctx.set_symbol('inputs', self.get_input().size())
+        return super().run(ctx)
+
+
+def test_run_graph_processes_isolated():
+    import threading
+
+    node1 = RecordingNode()
+    node2 = SymbolNode()
+
+    wf = Workflow.create([node1, node2])
+    wf.set_executor(Workflow.EXECUTOR_PROCESSES, max_workers=1)
+    # finished nodes can't be copied anymore, so only the input resources are passed to the next node
+    wf.add_listener(Workflow.EVENT_NODE_RUN_FINISHED, lambda data: setattr(data['node'], 'lock', threading.Lock()))
+
+    assert wf.run()
+    assert node2.get_output().size() == 2
+    # symbols set in the worker process are passed back
+    assert wf.get_context().get_symbols()['inputs'] == 1
+
+
+class StreamSourceNode(Node):
+
+    def __init__(self, log):
+        super().__init__({}, {})
+        self.log = log
+
+    def stream(self, ctx: WorkflowContext):
+        for n in range(3):
+            self.log.append('produce %s' % n)
+            yield TextResource(str(n))
+
+
+class StreamSinkNode(Node):
+
+    def __init__(self, log):
+        super().__init__({}, {})
+        self.log = log
+
+    def stream(self, ctx: WorkflowContext):
+        for res in self.get_input().stream('atraxiflow.TextResource'):
+            self.log.append('consume %s' % res.get_value())
+            yield res
+
+
+def test_run_streaming():
+    log = []
+    sink = StreamSinkNode(log)
+    finished = []
+
+    wf = Workflow.create([StreamSourceNode(log), sink])
+    wf.set_streaming(True)
+    wf.add_listener(Workflow.EVENT_NODE_RUN_FINISHED, lambda data: finished.append(data['node']))
+
+    assert wf.run()
+    assert log == ['produce 0', 'consume 0', 'produce 1', 'consume 1', 'produce 2', 'consume 2']
+    assert finished[-1] is sink
+    assert len(finished) == 2
+
+
+class StreamIgnoreInputNode(Node):
+
+    def __init__(self, log):
+        super().__init__({}, {})
+        self.log = log
+
+    def stream(self, ctx: WorkflowContext):
+        self.log.append('ignore input')
+        yield TextResource('own')
+
+
+def test_run_streaming_unread_input():
+    log = []
+    source = StreamSourceNode(log)
+    node = StreamIgnoreInputNode(log)
+    finished = []
+
+    wf = Workflow.create([source, node])
+    wf.set_streaming(True)
+    wf.add_listener(Workflow.EVENT_NODE_RUN_FINISHED, lambda data: finished.append(data['node']))
+
+    assert wf.run()
+    # the source runs, although its output is not read
+    assert log == ['ignore input', 'produce 0', 'produce 1', 'produce 2']
+    assert finished == [source, node]
+
+
+def test_run_streaming_into_regular_node():
+    log = []
+    node = RecordingNode()
+
+    wf = Workflow.create([StreamSourceNode(log), node])
+    wf.set_streaming(True)
+
+    assert wf.run()
+    assert [res.get_value() for res in node.get_output().items()] == ['0', '1', '2', node.id]
+
+
+def test_run_asyncio():
+    root = RecordingNode()
+    branch1 = RecordingNode()
+    branch2 = RecordingNode()
+    join = RecordingNode()
+
+    branch1.set_input(root)
+    branch2.set_input(root)
+    join.add_input(branch1)
+    join.add_input(branch2)
+
+    wf = Workflow.create([root, branch1, branch2, join])
+    wf.set_executor(Workflow.EXECUTOR_ASYNCIO)
+
+    assert wf.run()
+    assert join.get_output().size() == 5
+
+
+def test_run_asyncio_failure_stops_dependents():
+    node1 = RecordingNode({'fail': True})
+    node2 = RecordingNode()
+
+    wf = Workflow.create([node1, node2])
+    wf.set_executor(Workflow.EXECUTOR_ASYNCIO)
+
+    assert not wf.run()
+    assert node2.get_output().size() == 0
+
+
+def test_run_concurrently():
+    import time
+
+    workflows = [Workflow.create([DelayNode({'time': 1}), RecordingNode()]) for n in range(3)]
+
+    start = time.perf_counter()
+    assert run_concurrently(workflows) == [True, True, True]
+    # the delays overlap
+    assert time.perf_counter() - start < 2
+
+    for wf in workflows:
+        assert wf.get_nodes()[1].get_output().size() == 1
+
+
+def test_run_concurrently_subprocesses():
+    import sys
+    import threading
+
+    def create_workflows():
+        return [Workflow.create([ShellExecNode({'cmd': '"%s" -c "print(%s)"' % (sys.executable, n)})])
+                for n in range(2)]
+
+    workflows = create_workflows()
+    assert run_concurrently(workflows) == [True, True]
+    assert [wf.get_nodes()[0].get_output().first().get_value().strip() for wf in workflows] == ['0', '1']
+
+    # also from other threads than the main thread
+    results = []
+    workflows = create_workflows()
+    thread = threading.Thread(target=lambda: results.extend(run_concurrently(workflows)))
+    thread.start()
+    thread.join()
+
+    assert results == [True, True]
+    assert [wf.get_nodes()[0].get_output().first().get_value().strip() for wf in workflows] == ['0', '1']
@@ -5,7 +5,55 @@
 # For more information on licensing see LICENSE file
 #
 
+from atraxiflow.base.common import NullNode
 from atraxiflow.core import *
+from atraxiflow.registry import NodeRegistry
+from test.test_core.test_registry import create_extension
+
+
+def fail_load(self):
+    raise AssertionError('Settings should not be read again')
+
+
+def test_shared_context(monkeypatch):
+    from atraxiflow.preferences import PreferencesProvider
+
+    shared = WorkflowContext()
+    shared.set_symbol('base', 'shared')
+
+    # settings are read only once
+    monkeypatch.setattr(PreferencesProvider, 'load', fail_load)
+
+    wf1 = Workflow(ctx=shared)
+    wf2 = Workflow.create(ctx=shared)
+
+    assert wf1.get_context() is not shared
+    assert wf1.get_context().preferences is shared.preferences
+    assert wf2.get_context().process_str('{base}') == 'shared'
+
+    wf1.get_context().set_symbol('run', 'wf1')
+    wf1.get_context().add_core_command(Workflow.CORE_CMD_GOTO_NODE, {})
+    wf1.get_context().add_listener('event', lambda data: None)
+
+    for ctx in (shared, wf2.get_context()):
+        assert not ctx.has_symbol('run')
+        assert ctx.get_collected_core_commands() == {}
+        assert ctx._listeners.get('event', []) == []
+
+    assert wf1.run()
+    assert wf1.get_context().get_collected_core_commands() == {}
+
+
+def test_derived_context_extensions(tmpdir, monkeypatch):
+    monkeypatch.setattr('atraxiflow.registry._registry', NodeRegistry(str(tmpdir.join('node_cache.json'))))
+    shared = WorkflowContext(create_extension(tmpdir, monkeypatch, 'ax_derived_ext'))
+
+    wf = Workflow.create(ctx=shared)
+    assert wf.run()
+    # the workflow's context boots the extensions of the shared preferences
+    assert wf.get_context().get_nodes() == {'Test': [NullNode]}
+
+    assert shared.derive().get_nodes() == {'Test': [NullNode]}
 
 
 def test_symbol_replacement():